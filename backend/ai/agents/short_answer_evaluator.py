@@ -3,9 +3,8 @@ from backend.core.llm import structured_llm_call
 from backend.ai.schemas.evaluation import ShortAnswerEvaluationOutput
 
 
-async def evaluate_short_answers(questions: list):
-
-    prompt = f"""
+def build_short_answer_prompt(questions: list) -> str:
+    return f"""
 You are a fair but academically rigorous short-answer grading engine.
 
 Your task is to evaluate student responses based on conceptual understanding,
@@ -90,6 +89,12 @@ INPUT QUESTIONS WITH STUDENT ANSWERS:
 {json.dumps(questions, indent=2)}
 
 Return structured evaluation JSON only.
+Return exactly one result per input item, echoing its question_id unchanged.
 """
 
+
+async def evaluate_short_answers(questions: list):
+
+    prompt = build_short_answer_prompt(questions)
+
     return await structured_llm_call(prompt, ShortAnswerEvaluationOutput)
@@ -7,9 +7,12 @@ from backend.models.answer import Answer
 from backend.models.violation import Violation
 from backend.models.result import Result
 from backend.models.attempt import Attempt
-from backend.ai.agents.short_answer_evaluator import evaluate_short_answers
 from backend.ai.agents.answer_key_agent import generate_missing_answers
+from backend.services.answer_key_cache import resolve_answer_keys
+from backend.services.compiled_paper import resolve_attempt_questions
 from backend.services.question_quality import normalize_question_type, normalize_math_text
+from backend.services.regrade_service import apply_answer_key_overrides, load_applied_answer_keys
+from backend.services.short_answer_batching import short_answer_batcher
 
 
 logger = logging.getLogger(__name__)
@@ -31,7 +34,18 @@ def _is_missing_answer_key(value: object) -> bool:
     return token in {"", "answer_unavailable", "null", "none"}
 
 
-async def _build_short_answer_payload(snapshot: list[dict], answers_map: dict[str, str]) -> tuple[list[dict], bool]:
+async def _generate_answer_keys(candidates: list[dict]) -> list[str | None]:
+    generated = await generate_missing_answers(candidates)
+    generated_questions = getattr(generated, "questions", []) or []
+    return [str(getattr(question, "correct_answer", "") or "").strip() for question in generated_questions]
+
+
+async def _build_short_answer_payload(
+    snapshot: list[dict],
+    answers_map: dict[str, str],
+    quiz_id: object = None,
+    db: object = None,
+) -> tuple[list[dict], bool]:
     payload: list[dict] = []
     fallback_candidates: list[dict] = []
     fallback_indexes: list[int] = []
@@ -49,6 +63,7 @@ async def _build_short_answer_payload(snapshot: list[dict], answers_map: dict[st
         if _is_missing_answer_key(payload_item["correct_answer"]):
             fallback_candidates.append(
                 {
+                    "question_id": question_id,
                     "question_text": payload_item["question_text"],
                     "question_type": str(question.get("question_type") or "SHORT_ANSWER"),
                     "correct_answer": None,
@@ -59,10 +74,9 @@ async def _build_short_answer_payload(snapshot: list[dict], answers_map: dict[st
 
     review_required = False
     if fallback_candidates:
-        generated = await generate_missing_answers(fallback_candidates)
-        generated_questions = getattr(generated, "questions", []) or []
-        for idx, generated_question in zip(fallback_indexes, generated_questions):
-            candidate_answer = str(getattr(generated_question, "correct_answer", "") or "").strip()
+        # Generated once per quiz question and shared by every attempt.
+        generated = await resolve_answer_keys(quiz_id, fallback_candidates, _generate_answer_keys, db=db)
+        for idx, candidate_answer in zip(fallback_indexes, generated):
             if _is_missing_answer_key(candidate_answer):
                 review_required = True
                 continue
@@ -96,7 +110,9 @@ async def objective_node(state: ResultGraphState):
             "review_required": True,
         }
 
-    snapshot = list(getattr(attempt, "questions_snapshot", None) or [])
+    snapshot = await resolve_attempt_questions(db, attempt)
+    # Grade against keys corrected by a completed regrade, not the paper's original ones.
+    snapshot = apply_answer_key_overrides(snapshot, await load_applied_answer_keys(db, attempt.quiz_id))
     if not snapshot:
         logger.warning("Attempt %s has no question snapshot; objective grading cannot run", attempt_id)
 
@@ -126,7 +142,12 @@ async def objective_node(state: ResultGraphState):
         elif normalized_qtype in {"SHORT_ANSWER", "LONG_ANSWER"}:
             short_answer_questions.append(question)
 
-    short_answer_payload, short_answer_review_required = await _build_short_answer_payload(short_answer_questions, answers_map)
+    short_answer_payload, short_answer_review_required = await _build_short_answer_payload(
+        short_answer_questions,
+        answers_map,
+        quiz_id=attempt.quiz_id,
+        db=db,
+    )
     review_required = review_required or short_answer_review_required
 
     logger.info(
@@ -150,9 +171,10 @@ async def short_answer_node(state: ResultGraphState):
     if not state["short_answer_payload"]:
         return {"short_answer_scores": []}
 
-    result = await evaluate_short_answers(state["short_answer_payload"])
+    # Batched with the short answers of other attempts graded at the same time.
+    scores = await short_answer_batcher.evaluate(state["attempt_id"], state["short_answer_payload"])
 
-    return {"short_answer_scores": result.results}
+    return {"short_answer_scores": scores}
 
 
 async def aggregate_node(state: ResultGraphState):
@@ -175,6 +197,7 @@ async def aggregate_node(state: ResultGraphState):
     penalty = violation_count // 2
 
     integrity_flag = violation_count > 3
+    raw_score = total_score
     total_score = max(0, total_score - penalty)
 
     status = (
@@ -189,6 +212,7 @@ async def aggregate_node(state: ResultGraphState):
     result = existing_result_result.scalar_one_or_none()
     if result:
         result.final_score = total_score
+        result.raw_score = raw_score
         result.violation_count = violation_count
         result.integrity_flag = integrity_flag
         result.status = "GRADED" if not review_required else status
@@ -196,6 +220,7 @@ async def aggregate_node(state: ResultGraphState):
         result = Result(
             attempt_id=attempt_id,
             final_score=total_score,
+            raw_score=raw_score,
             violation_count=violation_count,
             integrity_flag=integrity_flag,
             status="GRADED" if not review_required else status,
@@ -234,3 +259,17 @@ def build_result_processing_graph():
     graph.add_edge("aggregate", END)
 
     return graph.compile()
+
+
+_result_processing_graph = None
+
+
+def get_result_processing_graph():
+    """
+    Compiled graph shared by every grading run in this process. It holds no
+    per-attempt state, so compiling it once per submission is pure overhead.
+    """
+    global _result_processing_graph
+    if _result_processing_graph is None:
+        _result_processing_graph = build_result_processing_graph()
+    return _result_processing_graph
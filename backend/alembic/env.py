@@ -20,6 +20,8 @@ from backend.models import (
     quiz_section,
     question,
     document,
+    document_chunk,
+    extraction_cache,
     attempt,
     answer,
     violation,
@@ -0,0 +1,39 @@
+"""trim chunk fields from document source indexes
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-18 19:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "a6b7c8d9e0f1"
+down_revision: Union[str, Sequence[str], None] = "f5a6b7c8d9e0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Chunks, tokens and fingerprints are derived from document_chunks at
+    # generation time; keep only the small summary fields in metadata.
+    op.execute(
+        """
+        UPDATE documents
+        SET extracted_metadata = (
+            extracted_metadata::jsonb
+            #- '{source_index,chunks}'
+            #- '{source_index,tokens}'
+            #- '{source_index,fingerprints}'
+        )::json
+        WHERE extracted_metadata IS NOT NULL
+          AND (extracted_metadata::jsonb -> 'source_index') ?| array['chunks', 'tokens', 'fingerprints']
+        """
+    )
+
+
+def downgrade() -> None:
+    # The removed fields are rebuilt from the document text when needed.
+    pass
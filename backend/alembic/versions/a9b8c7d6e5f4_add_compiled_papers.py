@@ -0,0 +1,47 @@
+"""add compiled papers
+
+Revision ID: a9b8c7d6e5f4
+Revises: f3a4b5c6d7e8
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a9b8c7d6e5f4"
+down_revision: Union[str, Sequence[str], None] = "f3a4b5c6d7e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "compiled_papers",
+        sa.Column("quiz_id", sa.UUID(), nullable=False),
+        sa.Column("questions", sa.JSON(), nullable=False),
+        sa.Column("runtime_settings", sa.JSON(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], name=op.f("fk_compiled_papers_quiz_id_quizzes"), ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_compiled_papers")),
+    )
+    op.create_index(op.f("ix_compiled_papers_quiz_id"), "compiled_papers", ["quiz_id"], unique=False)
+    op.alter_column("compiled_papers", "is_active", server_default=None)
+
+    op.add_column("attempts", sa.Column("paper_id", sa.UUID(), nullable=True))
+    op.create_foreign_key(op.f("fk_attempts_paper_id_compiled_papers"), "attempts", "compiled_papers", ["paper_id"], ["id"])
+    op.create_index(op.f("ix_attempts_paper_id"), "attempts", ["paper_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_attempts_paper_id"), table_name="attempts")
+    op.drop_constraint(op.f("fk_attempts_paper_id_compiled_papers"), "attempts", type_="foreignkey")
+    op.drop_column("attempts", "paper_id")
+    op.drop_index(op.f("ix_compiled_papers_quiz_id"), table_name="compiled_papers")
+    op.drop_table("compiled_papers")
@@ -0,0 +1,31 @@
+"""add partial index on unsubmitted attempts
+
+Revision ID: b1c2d3e4f5a6
+Revises: a9b8c7d6e5f4
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b1c2d3e4f5a6"
+down_revision: Union[str, Sequence[str], None] = "a9b8c7d6e5f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_attempts_unsubmitted_created_at",
+        "attempts",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("submitted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attempts_unsubmitted_created_at", table_name="attempts")
@@ -0,0 +1,53 @@
+"""add extraction cache and document content hash
+
+Revision ID: c2d3e4f5a6b7
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-18 14:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c2d3e4f5a6b7"
+down_revision: Union[str, Sequence[str], None] = "b1c2d3e4f5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "extraction_cache",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("extractor_version", sa.String(length=32), nullable=False),
+        sa.Column("file_type", sa.String(length=50), nullable=False),
+        sa.Column("blob_path", sa.String(length=500), nullable=False),
+        sa.Column("blob_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("text_length", sa.Integer(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_extraction_cache")),
+        sa.UniqueConstraint(
+            "content_hash",
+            "extractor_version",
+            "file_type",
+            name="uq_extraction_cache_hash_version_type",
+        ),
+    )
+    op.create_index(op.f("ix_extraction_cache_last_used_at"), "extraction_cache", ["last_used_at"], unique=False)
+    op.alter_column("extraction_cache", "hit_count", server_default=None)
+
+    op.add_column("documents", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index(op.f("ix_documents_content_hash"), "documents", ["content_hash"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_documents_content_hash"), table_name="documents")
+    op.drop_column("documents", "content_hash")
+    op.drop_index(op.f("ix_extraction_cache_last_used_at"), table_name="extraction_cache")
+    op.drop_table("extraction_cache")
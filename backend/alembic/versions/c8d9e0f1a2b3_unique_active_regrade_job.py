@@ -0,0 +1,47 @@
+"""unique active regrade job per quiz
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-18 20:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c8d9e0f1a2b3"
+down_revision: Union[str, Sequence[str], None] = "b7c8d9e0f1a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the newest queued or running regrade of each quiz.
+    op.execute(
+        """
+        UPDATE ai_jobs AS job
+        SET status = 'FAILED'
+        WHERE job.job_type = 'RESULT_REGRADE'
+          AND job.status IN ('PENDING', 'PROCESSING')
+          AND EXISTS (
+              SELECT 1 FROM ai_jobs AS newer
+              WHERE newer.quiz_id = job.quiz_id
+                AND newer.job_type = 'RESULT_REGRADE'
+                AND newer.status IN ('PENDING', 'PROCESSING')
+                AND (newer.created_at, newer.id) > (job.created_at, job.id)
+          )
+        """
+    )
+    op.create_index(
+        "uq_ai_jobs_active_regrade_quiz_id",
+        "ai_jobs",
+        ["quiz_id"],
+        unique=True,
+        postgresql_where=sa.text("job_type = 'RESULT_REGRADE' AND status IN ('PENDING', 'PROCESSING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_ai_jobs_active_regrade_quiz_id", table_name="ai_jobs")
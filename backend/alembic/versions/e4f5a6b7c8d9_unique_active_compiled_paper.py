@@ -0,0 +1,45 @@
+"""unique active compiled paper per quiz
+
+Revision ID: e4f5a6b7c8d9
+Revises: d3e4f5a6b7c8
+Create Date: 2026-10-18 18:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e4f5a6b7c8d9"
+down_revision: Union[str, Sequence[str], None] = "d3e4f5a6b7c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the newest active paper of each quiz before enforcing uniqueness.
+    op.execute(
+        """
+        UPDATE compiled_papers AS paper
+        SET is_active = false
+        WHERE paper.is_active
+          AND EXISTS (
+              SELECT 1 FROM compiled_papers AS newer
+              WHERE newer.quiz_id = paper.quiz_id
+                AND newer.is_active
+                AND (newer.created_at, newer.id) > (paper.created_at, paper.id)
+          )
+        """
+    )
+    op.create_index(
+        "uq_compiled_papers_active_quiz_id",
+        "compiled_papers",
+        ["quiz_id"],
+        unique=True,
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_compiled_papers_active_quiz_id", table_name="compiled_papers")
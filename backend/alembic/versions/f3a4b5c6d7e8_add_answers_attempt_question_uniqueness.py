@@ -0,0 +1,41 @@
+"""add answers attempt/question uniqueness
+
+Revision ID: f3a4b5c6d7e8
+Revises: c9f8e7d6b5a4
+Create Date: 2026-10-18 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f3a4b5c6d7e8"
+down_revision: Union[str, Sequence[str], None] = "c9f8e7d6b5a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the most recently updated answer per (attempt, question) before enforcing uniqueness.
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY attempt_id, question_id
+                       ORDER BY updated_at DESC, created_at DESC, id DESC
+                   ) AS row_num
+            FROM answers
+        )
+        DELETE FROM answers
+        USING ranked
+        WHERE answers.id = ranked.id
+          AND ranked.row_num > 1
+        """
+    )
+    op.create_unique_constraint("uq_answers_attempt_id_question_id", "answers", ["attempt_id", "question_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_answers_attempt_id_question_id", "answers", type_="unique")
@@ -12,13 +12,24 @@ from sqlalchemy import select
 
 from backend.api.deps import get_current_user
 from backend.api.quizzes import generate_ai_quiz
+from backend.core.config import settings
 from backend.core.database import get_db
 from backend.core.redis import cache_get_json, cache_set_json
 from backend.models.document import Document
 from backend.models.quiz import Quiz
 from backend.models.user import User
-from backend.utils.file_utils import save_upload_file
-from backend.services.task_dispatcher import dispatch_document_task
+from backend.services.document_store import list_document_summaries, load_document_text
+from backend.utils.file_utils import SavedUpload, discard_saved_upload, save_upload_file
+from backend.services.task_dispatcher import dispatch_document_tasks
+from backend.workers.quiz_creation_task import (
+    assemble_source_index,
+    build_source_entry,
+    complete_source_entry,
+    is_current_source_entry,
+    is_current_source_summary,
+    source_text_digest,
+    store_source_index,
+)
 from backend.integrations.youtube import (
     is_youtube_url,
     extract_video_id,
@@ -73,6 +84,21 @@ async def _save_sources(quiz_id: str, sources: dict) -> None:
     await cache_set_json(_cache_key(quiz_id), sources, ttl_seconds=6 * 60 * 60)
 
 
+async def _indexed_source(source: dict) -> dict:
+    """Attaches the pre-processed index entry so generation never re-parses this source."""
+    source["index"] = await asyncio.to_thread(build_source_entry, source.get("text") or "")
+    return source
+
+
+async def _source_entry(text: str, cached: object) -> dict:
+    if is_current_source_entry(cached, text):
+        return cached
+    # Document summaries stay valid when the text was cut to the source budget.
+    if is_current_source_summary(cached):
+        return await asyncio.to_thread(complete_source_entry, cached, text)
+    return await asyncio.to_thread(build_source_entry, text)
+
+
 def _fetch_url_content(url: str) -> str:
     with urllib.request.urlopen(url, timeout=10) as response:
         raw = response.read().decode("utf-8", errors="ignore")
@@ -193,11 +219,13 @@ async def add_text_source(
     sources = await _load_sources(str(quiz_uuid))
     source_id = str(uuid.uuid4())
     sources["text_sources"].append(
-        {
-            "id": source_id,
-            "text": text,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
+        await _indexed_source(
+            {
+                "id": source_id,
+                "text": text,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
     )
     await _save_sources(str(quiz_uuid), sources)
     return {"source_id": source_id, "status": "stored"}
@@ -260,16 +288,18 @@ async def add_url_source(
                 # Store directly as a normal source
                 source_id = str(uuid.uuid4())
                 sources["url_sources"].append(
-                    {
-                        "id": source_id,
-                        "url": url,
-                        "text": full_text,
-                        "title": metadata["title"],
-                        "duration_seconds": metadata["duration_seconds"],
-                        "video_id": video_id,
-                        "source_type": "youtube_direct",
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                    }
+                    await _indexed_source(
+                        {
+                            "id": source_id,
+                            "url": url,
+                            "text": full_text,
+                            "title": metadata["title"],
+                            "duration_seconds": metadata["duration_seconds"],
+                            "video_id": video_id,
+                            "source_type": "youtube_direct",
+                            "created_at": datetime.now(timezone.utc).isoformat(),
+                        }
+                    )
                 )
                 await _save_sources(str(quiz_uuid), sources)
                 added.append(source_id)
@@ -293,12 +323,14 @@ async def add_url_source(
                 raise HTTPException(status_code=400, detail=f"Failed to fetch {url}: {exc}") from exc
             source_id = str(uuid.uuid4())
             sources["url_sources"].append(
-                {
-                    "id": source_id,
-                    "url": url,
-                    "text": content[:60000],
-                    "created_at": datetime.now(timezone.utc).isoformat(),
-                }
+                await _indexed_source(
+                    {
+                        "id": source_id,
+                        "url": url,
+                        "text": content[:60000],
+                        "created_at": datetime.now(timezone.utc).isoformat(),
+                    }
+                )
             )
             added.append(source_id)
 
@@ -385,17 +417,19 @@ async def confirm_youtube_source(
     sources = await _load_sources(str(quiz_uuid))
     source_id = str(uuid.uuid4())
     sources["url_sources"].append(
-        {
-            "id": source_id,
-            "url": youtube_url,
-            "text": text,
-            "title": metadata["title"],
-            "duration_seconds": metadata["duration_seconds"],
-            "video_id": video_id,
-            "source_type": source_type,
-            "note": note,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
+        await _indexed_source(
+            {
+                "id": source_id,
+                "url": youtube_url,
+                "text": text,
+                "title": metadata["title"],
+                "duration_seconds": metadata["duration_seconds"],
+                "video_id": video_id,
+                "source_type": source_type,
+                "note": note,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
     )
     await _save_sources(str(quiz_uuid), sources)
     return {"source_id": source_id, "status": "stored"}
@@ -415,35 +449,73 @@ async def add_file_sources(
         raise HTTPException(status_code=400, detail="Invalid quiz_id") from exc
     await _get_quiz_or_404(quiz_uuid, db, current_user)
 
-    documents: list[dict] = []
-    for upload in files:
-        extension = upload.filename.split(".")[-1].lower()
-        if extension not in ["pdf", "docx", "pptx", "txt", "png", "jpg", "jpeg"]:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
+    extensions = [upload.filename.split(".")[-1].lower() for upload in files]
+    if any(extension not in ["pdf", "docx", "pptx", "txt", "png", "jpg", "jpeg"] for extension in extensions):
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+
+    # Stream every file to storage first; a rejected file discards the ones already saved.
+    saved_uploads: list[SavedUpload] = []
+    try:
+        for upload in files:
+            saved_uploads.append(await asyncio.to_thread(save_upload_file, upload, str(quiz_uuid)))
+    except Exception:
+        for saved in saved_uploads:
+            discard_saved_upload(saved)
+        raise
 
-        saved_path = save_upload_file(upload, str(quiz_uuid))
-        document = Document(
+    rows = [
+        Document(
+            id=uuid.uuid4(),
             quiz_id=quiz_uuid,
             file_name=upload.filename,
             file_type=extension,
-            storage_path=saved_path,
+            storage_path=saved.path,
+            content_hash=saved.sha256,
             extraction_status="PENDING",
         )
-        db.add(document)
-        await db.commit()
-        await db.refresh(document)
-
-        # Dispatch document processing task
-        await dispatch_document_task(str(document.id))
-
-        documents.append({"id": str(document.id), "file_name": document.file_name})
+        for upload, extension, saved in zip(files, extensions, saved_uploads)
+    ]
+    db.add_all(rows)
+    await db.commit()
 
+    documents = [{"id": str(row.id), "file_name": row.file_name} for row in rows]
     sources = await _load_sources(str(quiz_uuid))
     sources["file_sources"].extend([doc["id"] for doc in documents])
     await _save_sources(str(quiz_uuid), sources)
+
+    await dispatch_document_tasks([doc["id"] for doc in documents])
     return {"documents": documents}
 
 
+@router.delete("/source/{quiz_id}/{source_id}")
+async def remove_source(
+    quiz_id: uuid.UUID,
+    source_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await _get_quiz_or_404(quiz_id, db, current_user)
+    sources = await _load_sources(str(quiz_id))
+    for kind in ("text_sources", "url_sources"):
+        kept = [entry for entry in sources.get(kind, []) if entry.get("id") != source_id]
+        if len(kept) != len(sources.get(kind, [])):
+            sources[kind] = kept
+            await _save_sources(str(quiz_id), sources)
+            return {"source_id": source_id, "status": "removed"}
+
+    try:
+        document = await db.get(Document, uuid.UUID(source_id))
+    except ValueError:
+        document = None
+    if document is None or document.quiz_id != quiz_id:
+        raise HTTPException(status_code=404, detail="Source not found")
+    await db.delete(document)
+    await db.commit()
+    sources["file_sources"] = [doc_id for doc_id in sources.get("file_sources", []) if doc_id != source_id]
+    await _save_sources(str(quiz_id), sources)
+    return {"source_id": source_id, "status": "removed"}
+
+
 @router.get("/source/files/{quiz_id}")
 async def list_file_sources(
     quiz_id: uuid.UUID,
@@ -451,9 +523,7 @@ async def list_file_sources(
     current_user: User = Depends(get_current_user),
 ):
     await _get_quiz_or_404(quiz_id, db, current_user)
-    result = await db.execute(select(Document).where(Document.quiz_id == quiz_id))
-    documents = result.scalars().all()
-    return {"documents": documents}
+    return {"documents": await list_document_summaries(db, quiz_id)}
 
 
 @router.post("/generate")
@@ -473,24 +543,43 @@ async def generate_quiz_from_sources(
     await _get_quiz_or_404(quiz_uuid, db, current_user)
 
     sources = await _load_sources(str(quiz_uuid))
-    texts: list[str] = []
-    texts.extend([entry.get("text", "") for entry in sources.get("text_sources", [])])
-    texts.extend([entry.get("text", "") for entry in sources.get("url_sources", [])])
+    # (text, stored index entry) per source, in the order the texts are joined.
+    indexed: list[tuple[str, object]] = [
+        (entry.get("text", ""), entry.get("index"))
+        for entry in [*sources.get("text_sources", []), *sources.get("url_sources", [])]
+    ]
 
+    metadata = Document.extracted_metadata
     documents = (
-        await db.execute(select(Document).where(Document.quiz_id == quiz_uuid))
-    ).scalars().all()
+        await db.execute(
+            select(
+                Document.id,
+                Document.extraction_status,
+                metadata["extracted_text"].as_string().label("legacy_text"),
+                metadata["source_index"].label("source_index"),
+            )
+            .where(Document.quiz_id == quiz_uuid)
+            .order_by(Document.created_at)
+        )
+    ).all()
     pending = [doc for doc in documents if doc.extraction_status != "COMPLETED"]
     if pending and source_mode == "files":
         raise HTTPException(status_code=409, detail="Documents still processing")
+    # Document text is read from its chunks, only as far as the source budget reaches.
+    remaining = settings.QUIZ_SOURCE_MAX_CHARS - sum(len(text) + 2 for text, _ in indexed if text)
     for doc in documents:
-        extracted = (doc.extracted_metadata or {}).get("extracted_text")
+        if doc.extraction_status != "COMPLETED" or remaining <= 0:
+            continue
+        extracted = (doc.legacy_text or await load_document_text(db, doc.id, remaining))[:remaining]
         if extracted:
-            texts.append(str(extracted))
+            indexed.append((extracted, doc.source_index))
+            remaining -= len(extracted) + 2
 
-    extracted_text = "\n\n".join([text for text in texts if text]).strip()
+    extracted_text = "\n\n".join([text for text, _ in indexed if text]).strip()
     if not extracted_text:
         raise HTTPException(status_code=400, detail="No source content available")
+    entries = [await _source_entry(text, cached) for text, cached in indexed if text]
+    await store_source_index(quiz_uuid, assemble_source_index(entries, source_text_digest(extracted_text)))
 
     blueprint = dict(blueprint)
     blueprint["sections"] = _normalize_blueprint_sections(blueprint)
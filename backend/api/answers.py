@@ -1,24 +1,29 @@
 import uuid
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from backend.core.database import get_db
 from backend.models.answer import Answer
-from backend.models.attempt import Attempt
-from backend.models.question import Question
-from backend.schemas.answer import SaveAnswerRequest, SaveAnswerResponse
-from backend.core.redis import exam_expired
+from backend.core.config import settings
+from backend.schemas.answer import (
+    BatchSaveAnswerRequest,
+    BatchSaveAnswerResponse,
+    SaveAnswerRequest,
+    SaveAnswerResponse,
+)
+from backend.core.redis import buffer_answers, discard_buffered_answer
+from backend.services.attempt_session import AttemptSession, load_attempt_session
 
 
 router = APIRouter(prefix="/answers", tags=["Answers"])
 
 
-def _validate_attempt_token(attempt: Attempt, provided_token: str | None) -> None:
-    if not provided_token or provided_token != attempt.attempt_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid attempt token",
-        )
+def _ensure_attempt_writable(session: AttemptSession) -> None:
+    if session.submitted:
+        raise HTTPException(status_code=409, detail="Attempt already submitted")
+
+    if session.expired:
+        raise HTTPException(status_code=410, detail="Exam time expired")
 
 
 @router.post("/{attempt_id}", response_model=SaveAnswerResponse)
@@ -29,28 +34,10 @@ async def save_answer(
     db: AsyncSession = Depends(get_db),
 ):
 
-    result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
-    attempt = result.scalar_one_or_none()
-
-    if not attempt:
-        raise HTTPException(status_code=404, detail="Attempt not found")
-    _validate_attempt_token(attempt, x_attempt_token)
-
-    if attempt.submitted_at:
-        raise HTTPException(status_code=409, detail="Attempt already submitted")
+    session = await load_attempt_session(db, attempt_id, x_attempt_token)
+    _ensure_attempt_writable(session)
 
-    if await exam_expired(str(attempt_id)):
-        raise HTTPException(status_code=410, detail="Exam time expired")
-
-    question_result = await db.execute(
-        select(Question).where(
-            Question.id == payload.question_id,
-            Question.quiz_id == attempt.quiz_id,
-        )
-    )
-    question = question_result.scalar_one_or_none()
-
-    if not question:
+    if str(payload.question_id) not in session.question_ids:
         raise HTTPException(status_code=404, detail="Question not found for this attempt")
 
     # Upsert behavior
@@ -73,5 +60,41 @@ async def save_answer(
         db.add(answer)
 
     await db.commit()
+    # A direct save supersedes anything still waiting in the write-behind buffer.
+    await discard_buffered_answer(str(attempt_id), str(payload.question_id))
 
     return SaveAnswerResponse(message="Answer saved", question_id=payload.question_id)
+
+
+@router.post("/{attempt_id}/batch", response_model=BatchSaveAnswerResponse)
+async def save_answers_batch(
+    attempt_id: uuid.UUID,
+    payload: BatchSaveAnswerRequest,
+    x_attempt_token: str | None = Header(default=None, alias="X-Attempt-Token"),
+    db: AsyncSession = Depends(get_db),
+):
+    if len(payload.answers) > settings.ANSWER_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail="Too many answers in one batch")
+
+    session = await load_attempt_session(db, attempt_id, x_attempt_token)
+    _ensure_attempt_writable(session)
+
+    if any(str(item.question_id) not in session.question_ids for item in payload.answers):
+        raise HTTPException(status_code=404, detail="Question not found for this attempt")
+
+    # Answers are persisted by the periodic flusher (and on submit), not here.
+    buffered = await buffer_answers(
+        str(attempt_id),
+        [item.model_dump() for item in payload.answers],
+    )
+    if buffered is None:
+        # A submit sealed the buffer after this request loaded the session.
+        raise HTTPException(status_code=409, detail="Attempt already submitted")
+    accepted = set(buffered)
+    submitted_ids = list(dict.fromkeys(item.question_id for item in payload.answers))
+
+    return BatchSaveAnswerResponse(
+        message="Answers buffered",
+        accepted=[question_id for question_id in submitted_ids if str(question_id) in accepted],
+        stale=[question_id for question_id in submitted_ids if str(question_id) not in accepted],
+    )
@@ -1,17 +1,17 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
 
+from backend.core.config import settings
 from backend.core.database import get_db
 from backend.models.quiz import Quiz
 from backend.models.attempt import Attempt
-from backend.models.question import Question
-from backend.models.quiz_settings import QuizSettings
 from backend.models.student_profile import StudentProfile
 from backend.schemas.attempt import (
+    AdmissionQueuedResponse,
     ExamEntryConfigResponse,
     StartPublicAttemptRequest,
     StartAttemptRequest,
@@ -19,81 +19,65 @@ from backend.schemas.attempt import (
     SubmitAttemptResponse,
 )
 from backend.core.redis import (
+    get_grading_progress,
     get_remaining_time,
     start_exam_timer,
-    set_heartbeat,
     lock_attempt_session,
     exam_expired,
 )
-from backend.ai.graphs.result_processing_graph import build_result_processing_graph
-from backend.services.verification import (
-    normalize_verification_schema,
-    validate_verification_submission,
+from backend.services.answer_buffer import flush_attempt_answers
+from backend.services.attempt_expiry import expire_attempts
+from backend.services.attempt_session import (
+    SESSION_GRACE_SECONDS,
+    forget_attempt_session,
+    load_attempt_session,
+    remember_attempt_session,
 )
+from backend.services.compiled_paper import (
+    PaperArtifact,
+    get_current_paper,
+    load_paper_questions,
+    resolve_attempt_questions,
+    serialize_question_snapshot,
+)
+from backend.services.exam_admission import ExamQuizSnapshot, admit_exam_start, load_exam_entry
+from backend.services.grading import GRADING_COMPLETED, GRADING_QUEUED
+from backend.services.task_dispatcher import dispatch_result_tasks
+from backend.services.verification import validate_verification_submission
 
 
 router = APIRouter(prefix="/attempts", tags=["Attempts"])
 
 
-def _load_legacy_runtime_settings(quiz: Quiz) -> dict:
-    raw = quiz.settings_json if isinstance(quiz.settings_json, dict) else {}
-    verification = raw.get("verification") if isinstance(raw.get("verification"), dict) else None
-    return {
-        "require_fullscreen": bool(raw.get("require_fullscreen", True)),
-        "violation_limit": max(1, int(raw.get("violation_limit", 3) or 3)),
-        "verification": normalize_verification_schema(verification, quiz.academic_type),
-    }
-
-
-async def _load_runtime_settings(db: AsyncSession, quiz: Quiz) -> dict:
-    defaults = _load_legacy_runtime_settings(quiz)
-    try:
-        result = await db.execute(
-            select(QuizSettings).where(
-                QuizSettings.quiz_id == quiz.id,
-                QuizSettings.owner_user_id == quiz.created_by,
-            )
-        )
-        settings_record = result.scalar_one_or_none()
-    except SQLAlchemyError:
-        await db.rollback()
-        return defaults
-
-    if not settings_record:
-        return defaults
-
-    return {
-        "require_fullscreen": settings_record.require_fullscreen,
-        "violation_limit": max(1, int(settings_record.violation_limit or defaults["violation_limit"])),
-        "verification": defaults["verification"],
-    }
+_QUEUED_RESPONSES = {status.HTTP_202_ACCEPTED: {"model": AdmissionQueuedResponse}}
 
 
-async def _load_attempt_questions(db: AsyncSession, quiz_id: uuid.UUID) -> list[Question]:
-    questions_result = await db.execute(
-        select(Question)
-        .where(Question.quiz_id == quiz_id, Question.status == "APPROVED")
-        .order_by(Question.created_at.asc())
+async def _load_exam_paper(db: AsyncSession, quiz: Quiz) -> PaperArtifact:
+    paper = await get_current_paper(db, quiz)
+    if paper is None or not paper.questions:
+        raise HTTPException(status_code=410, detail="Exam has ended")
+    return paper
+
+
+async def _admit_or_queue(quiz_id: uuid.UUID, ticket: str | None) -> JSONResponse | None:
+    """Returns a 202 queue-position response when the quiz's start rate is exhausted."""
+    decision = await admit_exam_start(str(quiz_id), ticket)
+    if decision.admitted:
+        return None
+    body = AdmissionQueuedResponse(
+        admission_ticket=decision.ticket,
+        queue_position=decision.queue_position,
+        retry_after_seconds=decision.retry_after_seconds,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=body.model_dump(),
+        headers={"Retry-After": str(decision.retry_after_seconds)},
     )
-    return questions_result.scalars().all()
-
-
-def _serialize_question_snapshot(questions: list[Question]) -> list[dict]:
-    return [
-        {
-            "id": str(question.id),
-            "question_text": question.question_text,
-            "question_type": question.question_type,
-            "options": question.options,
-            "marks": int(question.marks or 1),
-            "correct_answer": question.correct_answer,
-        }
-        for question in questions
-    ]
 
 
-async def _build_attempt_response(db: AsyncSession, attempt: Attempt, quiz: Quiz) -> StartAttemptResponse:
-    questions = attempt.questions_snapshot or _serialize_question_snapshot(await _load_attempt_questions(db, quiz.id))
+async def _build_attempt_response(db: AsyncSession, attempt: Attempt, quiz: Quiz | ExamQuizSnapshot) -> StartAttemptResponse:
+    questions = await resolve_attempt_questions(db, attempt) or serialize_question_snapshot(await load_paper_questions(db, quiz.id))
     duration_seconds = max(300, int((getattr(quiz, "duration_minutes", 60) or 60) * 60))
     started_at = getattr(attempt, "created_at", None) or datetime.now(timezone.utc)
     if started_at.tzinfo is None:
@@ -113,35 +97,15 @@ async def _build_attempt_response(db: AsyncSession, attempt: Attempt, quiz: Quiz
     )
 
 
-async def _grade_attempt(db: AsyncSession, attempt_id: str) -> None:
-    graph = build_result_processing_graph()
-    await graph.ainvoke(
-        {
-            "db": db,
-            "attempt_id": attempt_id,
-            "objective_score": 0,
-            "short_answer_payload": [],
-            "short_answer_scores": [],
-            "violation_count": 0,
-            "final_score": 0,
-            "review_required": False,
-        }
-    )
-
-
 async def _create_attempt(
     *,
     db: AsyncSession,
-    quiz: Quiz,
+    quiz: ExamQuizSnapshot,
+    paper: PaperArtifact,
     verification_context: str,
     verification_data: dict,
 ) -> StartAttemptResponse:
-    questions = await _load_attempt_questions(db, quiz.id)
-    if not questions:
-        raise HTTPException(status_code=410, detail="Exam has ended")
-
-    runtime_settings = await _load_runtime_settings(db, quiz)
-    verification = validate_verification_submission(runtime_settings["verification"], verification_data)
+    verification = validate_verification_submission(paper.verification_schema, verification_data)
 
     existing_attempt_result = await db.execute(
         select(Attempt).where(
@@ -154,24 +118,32 @@ async def _create_attempt(
         if existing_attempt.submitted_at or existing_attempt.status in {"SUBMITTED", "GRADED"}:
             raise HTTPException(status_code=409, detail="You have already started or completed this exam.")
         if await exam_expired(str(existing_attempt.id)):
-            existing_attempt.status = "SUBMITTED"
-            existing_attempt.submitted_at = datetime.now(timezone.utc)
-            await db.commit()
+            await dispatch_result_tasks(
+                await expire_attempts(db, [str(existing_attempt.id)]),
+                priority=settings.GRADING_BACKLOG_PRIORITY,
+            )
             raise HTTPException(status_code=409, detail="You have already started or completed this exam.")
-        return await _build_attempt_response(db, existing_attempt, quiz)
+        response = await _build_attempt_response(db, existing_attempt, quiz)
+        await remember_attempt_session(
+            existing_attempt,
+            ttl_seconds=response.duration_seconds + SESSION_GRACE_SECONDS,
+            question_ids=[str(question.id) for question in response.questions],
+        )
+        return response
 
     duration_seconds = max(300, int((getattr(quiz, "duration_minutes", 60) or 60) * 60))
     attempt_token = str(uuid.uuid4())
     started_at = datetime.now(timezone.utc)
     expires_at = started_at + timedelta(seconds=duration_seconds)
 
+    # The attempt points at the immutable compiled paper rather than copying it.
     attempt = Attempt(
         quiz_id=quiz.id,
         attempt_token=attempt_token,
         enrollment_number=verification.identity_key,
         status="IN_PROGRESS",
         final_score=0,
-        questions_snapshot=_serialize_question_snapshot(questions),
+        paper_id=uuid.UUID(paper.paper_id),
     )
 
     db.add(attempt)
@@ -204,12 +176,17 @@ async def _create_attempt(
         )
 
     await start_exam_timer(str(attempt.id), duration_seconds)
+    await remember_attempt_session(
+        attempt,
+        ttl_seconds=duration_seconds + SESSION_GRACE_SECONDS,
+        question_ids=list(paper.question_ids),
+    )
     return StartAttemptResponse(
         attempt_id=attempt.id,
         attempt_token=attempt_token,
         duration_seconds=duration_seconds,
         duration=duration_seconds,
-        questions=questions,
+        questions=list(paper.questions),
         academic_type=quiz.academic_type,
         quiz_title=quiz.title,
         start_time=started_at,
@@ -225,37 +202,45 @@ def _validate_attempt_token(attempt: Attempt, provided_token: str | None) -> Non
         )
 
 
-@router.post("/{quiz_id}/start", response_model=StartAttemptResponse)
+@router.post("/{quiz_id}/start", response_model=StartAttemptResponse, responses=_QUEUED_RESPONSES)
 async def start_attempt(
     quiz_id: uuid.UUID,
     payload: StartAttemptRequest,
     db: AsyncSession = Depends(get_db),
 ):
 
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+    entry = await load_exam_entry(quiz_id=quiz_id)
+    quiz = entry.quiz
 
     if not quiz or not quiz.is_published:
         raise HTTPException(status_code=404, detail="Quiz not available")
-    runtime_settings = await _load_runtime_settings(db, quiz)
-    verification_schema = runtime_settings["verification"]
+    if entry.paper is None or not entry.paper.questions:
+        raise HTTPException(status_code=410, detail="Exam has ended")
+
+    queued = await _admit_or_queue(quiz.id, payload.admission_ticket)
+    if queued is not None:
+        return queued
+
+    paper = entry.paper
+    verification_schema = paper.runtime_settings["verification"]
     verification_context = verification_schema.get("context") or str(payload.verification_context or quiz.academic_type or "college").lower()
 
     return await _create_attempt(
         db=db,
         quiz=quiz,
+        paper=paper,
         verification_context=verification_context,
         verification_data=payload.verification_data,
     )
 
 
-@router.post("/start", response_model=StartAttemptResponse)
+@router.post("/start", response_model=StartAttemptResponse, responses=_QUEUED_RESPONSES)
 async def start_public_attempt(
     payload: StartPublicAttemptRequest,
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Quiz).where(Quiz.public_id == payload.public_exam_id))
-    quiz = result.scalar_one_or_none()
+    entry = await load_exam_entry(public_exam_id=payload.public_exam_id)
+    quiz = entry.quiz
 
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -266,12 +251,20 @@ async def start_public_attempt(
     if str(quiz.ai_generation_status or "").upper() == "CLOSED":
         raise HTTPException(status_code=410, detail="Exam has ended")
 
-    runtime_settings = await _load_runtime_settings(db, quiz)
-    verification_schema = runtime_settings["verification"]
+    if entry.paper is None or not entry.paper.questions:
+        raise HTTPException(status_code=410, detail="Exam has ended")
+
+    queued = await _admit_or_queue(quiz.id, payload.admission_ticket)
+    if queued is not None:
+        return queued
+
+    paper = entry.paper
+    verification_schema = paper.runtime_settings["verification"]
     verification_context = verification_schema.get("context") or str(payload.verification_context or quiz.academic_type or "college").lower()
     return await _create_attempt(
         db=db,
         quiz=quiz,
+        paper=paper,
         verification_context=verification_context,
         verification_data=payload.verification_data,
     )
@@ -288,7 +281,7 @@ async def get_attempt_entry_config(
     if not quiz or not quiz.is_published:
         raise HTTPException(status_code=404, detail="Quiz not available")
 
-    runtime_settings = await _load_runtime_settings(db, quiz)
+    runtime_settings = (await _load_exam_paper(db, quiz)).runtime_settings
     return ExamEntryConfigResponse(
         quiz_id=quiz.id,
         quiz_title=quiz.title,
@@ -314,7 +307,7 @@ async def get_public_attempt_entry_config(
     if str(quiz.ai_generation_status or "").upper() == "CLOSED":
         raise HTTPException(status_code=410, detail="Exam has ended")
 
-    runtime_settings = await _load_runtime_settings(db, quiz)
+    runtime_settings = (await _load_exam_paper(db, quiz)).runtime_settings
     return ExamEntryConfigResponse(
         quiz_id=quiz.id,
         quiz_title=quiz.title,
@@ -347,15 +340,20 @@ async def submit_attempt(
         )
 
     # Mark submission timestamp
-    attempt.submitted_at = datetime.now(timezone.utc)
+    submitted_at = datetime.now(timezone.utc)
+    attempt.submitted_at = submitted_at
     attempt.status = "SUBMITTED"
     await db.commit()
-    await _grade_attempt(db, str(attempt_id))
-    await db.refresh(attempt)
+    await forget_attempt_session(str(attempt_id))
+    # Batched saves are write-behind; drain them so grading sees every answer.
+    await flush_attempt_answers(db, str(attempt_id), seal=True)
+    # Grading (including LLM calls) runs on the grading queue, not in this request.
+    await dispatch_result_tasks([str(attempt_id)])
 
     return SubmitAttemptResponse(
         message="Exam submitted successfully",
-        submitted_at=attempt.submitted_at,
+        submitted_at=submitted_at,
+        grading_status=GRADING_QUEUED,
     )
 
 
@@ -365,25 +363,19 @@ async def heartbeat_attempt(
     x_attempt_token: str | None = Header(default=None, alias="X-Attempt-Token"),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
-    attempt = result.scalar_one_or_none()
+    session = await load_attempt_session(db, attempt_id, x_attempt_token, refresh_heartbeat=True)
 
-    if not attempt:
-        raise HTTPException(status_code=404, detail="Attempt not found")
-
-    _validate_attempt_token(attempt, x_attempt_token)
-
-    if attempt.submitted_at:
+    if session.submitted:
         raise HTTPException(status_code=409, detail="Attempt already submitted")
 
-    if await exam_expired(str(attempt_id)):
+    if session.expired:
         raise HTTPException(status_code=410, detail="Exam time expired")
 
-    await set_heartbeat(str(attempt_id))
-    remaining_time = await get_remaining_time(str(attempt_id))
-    normalized_remaining = remaining_time if remaining_time and remaining_time > 0 else 0
-
-    return {"message": "Heartbeat received", "remaining_time": normalized_remaining}
+    return {
+        "message": "Heartbeat received",
+        "remaining_time": session.remaining_time,
+        "violation_count": session.violation_count,
+    }
 
 
 @router.get("/{attempt_id}/status")
@@ -392,31 +384,33 @@ async def get_attempt_status(
     x_attempt_token: str | None = Header(default=None, alias="X-Attempt-Token"),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
-    attempt = result.scalar_one_or_none()
+    session = await load_attempt_session(db, attempt_id, x_attempt_token)
+
+    if not session.submitted:
+        # Live attempts are answered from the session cache without touching Postgres.
+        return {
+            "attempt_id": session.attempt_id,
+            "remaining_time": session.remaining_time,
+            "status": "EXPIRED" if session.expired else "IN_PROGRESS",
+            "submitted_at": None,
+            "final_score": 0,
+        }
 
+    result = await db.execute(
+        select(Attempt.id, Attempt.status, Attempt.submitted_at, Attempt.final_score).where(Attempt.id == attempt_id)
+    )
+    attempt = result.one_or_none()
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
 
-    _validate_attempt_token(attempt, x_attempt_token)
-
-    remaining_time = await get_remaining_time(str(attempt_id))
-    normalized_remaining = remaining_time if remaining_time and remaining_time > 0 else 0
-    is_submitted = attempt.submitted_at is not None
-
-    if attempt.status == "GRADED":
-        attempt_status = "GRADED"
-    elif is_submitted:
-        attempt_status = "SUBMITTED"
-    elif normalized_remaining <= 0:
-        attempt_status = "EXPIRED"
-    else:
-        attempt_status = "IN_PROGRESS"
+    progress = await get_grading_progress(str(attempt.id))
+    grading_stage = progress.get("stage") or (GRADING_COMPLETED if attempt.status == "GRADED" else GRADING_QUEUED)
 
     return {
         "attempt_id": str(attempt.id),
-        "remaining_time": normalized_remaining,
-        "status": attempt_status,
+        "remaining_time": session.remaining_time,
+        "status": "GRADED" if attempt.status == "GRADED" else "SUBMITTED",
         "submitted_at": attempt.submitted_at,
         "final_score": attempt.final_score,
+        "grading_stage": grading_stage,
     }
@@ -1,14 +1,14 @@
 import asyncio
 import logging
 import uuid
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from backend.core.database import get_db
 from backend.api.deps import require_staff
 from backend.models.quiz import Quiz
 from backend.models.document import Document
+from backend.services.document_store import get_document_summary, list_document_summaries, load_document_chunks
 from backend.utils.file_utils import save_upload_file
 from backend.services.task_dispatcher import dispatch_document_task
 
@@ -41,13 +41,14 @@ async def upload_document(
             detail="Unsupported file type",
         )
 
-    saved_path = save_upload_file(file, str(quiz_id))
+    saved = await asyncio.to_thread(save_upload_file, file, str(quiz_id))
 
     document = Document(
         quiz_id=quiz_id,
         file_name=file.filename,
         file_type=extension,
-        storage_path=saved_path,
+        storage_path=saved.path,
+        content_hash=saved.sha256,
         extraction_status="PENDING",
     )
 
@@ -75,11 +76,7 @@ async def list_documents(
     current_user = Depends(require_staff),
 ):
 
-    result = await db.execute(
-        select(Document).where(Document.quiz_id == quiz_id)
-    )
-
-    return result.scalars().all()
+    return await list_document_summaries(db, quiz_id)
 
 
 # --------------------------------------------------
@@ -93,7 +90,7 @@ async def get_document(
     current_user = Depends(require_staff),
 ):
 
-    document = await db.get(Document, document_id)
+    document = await get_document_summary(db, document_id)
 
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -101,6 +98,28 @@ async def get_document(
     return document
 
 
+# --------------------------------------------------
+# Get Document Text (paged chunks)
+# --------------------------------------------------
+
+@router.get("/detail/{document_id}/chunks")
+async def get_document_chunks(
+    document_id: uuid.UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_staff),
+):
+
+    if await get_document_summary(db, document_id) is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return {
+        "document_id": document_id,
+        "chunks": await load_document_chunks(db, document_id, offset, limit),
+    }
+
+
 # --------------------------------------------------
 # Delete Document
 # --------------------------------------------------
@@ -3,13 +3,18 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.api.deps import get_current_user
+from backend.api.deps import get_current_user, require_staff
 from backend.core.database import get_db
+from backend.core.llm import LLM_METRICS_GROUP, llm_client_stats
+from backend.core.llm_governor import LLM_GOVERNOR_METRICS_GROUP, LLM_PRIORITY_NAMES
+from backend.core.redis import get_metrics
 from backend.models.attempt import Attempt
 from backend.models.quiz import Quiz
 from backend.models.user import User
 from backend.models.violation import Violation
 from backend.models.student_profile import StudentProfile
+from backend.services.grading_cache import ANSWER_CACHE_METRICS_GROUP
+from backend.services.short_answer_batching import SHORT_ANSWER_METRICS_GROUP
 
 
 router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
@@ -63,3 +68,52 @@ async def list_quiz_attempts(
         )
 
     return data
+
+
+@router.get("/metrics/grading")
+async def get_grading_metrics(
+    current_user: User = Depends(require_staff),
+):
+    short_answer = await get_metrics(SHORT_ANSWER_METRICS_GROUP)
+    answers = short_answer.get("answers", 0.0)
+    tokens = short_answer.get("input_tokens", 0.0) + short_answer.get("output_tokens", 0.0)
+    elapsed = short_answer.get("elapsed_seconds", 0.0)
+    answer_cache = await get_metrics(ANSWER_CACHE_METRICS_GROUP)
+    lookups = answer_cache.get("lookups", 0.0)
+    cache_hits = answer_cache.get("exact_hits", 0.0) + answer_cache.get("fuzzy_hits", 0.0)
+    return {
+        "short_answer": {
+            **short_answer,
+            "answers_per_llm_call": round(answers / short_answer["llm_calls"], 2) if short_answer.get("llm_calls") else 0.0,
+            "tokens_per_answer": round(tokens / answers, 1) if answers else 0.0,
+            "answers_per_second": round(answers / elapsed, 2) if elapsed else 0.0,
+        },
+        "answer_cache": {
+            **answer_cache,
+            "hit_rate": round(cache_hits / lookups, 3) if lookups else 0.0,
+        },
+    }
+
+
+@router.get("/metrics/llm")
+async def get_llm_metrics(
+    current_user: User = Depends(require_staff),
+):
+    calls = await get_metrics(LLM_METRICS_GROUP)
+    total = calls.get("calls", 0.0)
+    governor = await get_metrics(LLM_GOVERNOR_METRICS_GROUP)
+    queue_wait = {
+        name: round(governor.get(f"{name}_wait_seconds", 0.0) / governor[f"{name}_calls"], 3)
+        for name in LLM_PRIORITY_NAMES.values()
+        if governor.get(f"{name}_calls")
+    }
+    return {
+        "calls": {
+            **calls,
+            "failure_rate": round(calls.get("failures", 0.0) / total, 3) if total else 0.0,
+            "avg_latency_seconds": round(calls.get("elapsed_seconds", 0.0) / total, 3) if total else 0.0,
+        },
+        "governor": {**governor, "avg_queue_wait_seconds": queue_wait},
+        # Client pool state of the API process serving this request.
+        "clients": llm_client_stats(),
+    }
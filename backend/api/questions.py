@@ -4,13 +4,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from backend.core.database import get_db
-from backend.core.llm import structured_llm_call
+from backend.core.llm import invalidate_llm_response, structured_llm_call
 from backend.api.deps import get_current_user
 from backend.ai.schemas.generation import GeneratedQuestion
 from backend.models.user import User
 from backend.models.quiz import Quiz
 from backend.models.quiz_section import QuizSection
 from backend.models.question import Question
+from backend.services.compiled_paper import invalidate_quiz_paper
 from backend.services.question_quality import sanitize_question_candidate, normalize_question_type
 
 
@@ -56,6 +57,7 @@ async def _mark_quiz_needs_republish(quiz_id: uuid.UUID, db: AsyncSession) -> No
     quiz = await db.get(Quiz, quiz_id)
     if not quiz:
         return
+    await invalidate_quiz_paper(db, quiz_id)
     quiz.is_published = False
     if quiz.ai_generation_status != "PROCESSING":
         quiz.ai_generation_status = "GENERATED"
@@ -235,6 +237,7 @@ async def duplicate_question(
 @router.post("/{question_id}/regenerate")
 async def regenerate_question(
     question_id: uuid.UUID,
+    fresh: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -272,7 +275,7 @@ Return one strict JSON object matching the schema.
 """
 
     try:
-        regenerated = await structured_llm_call(prompt, GeneratedQuestion)
+        regenerated = await structured_llm_call(prompt, GeneratedQuestion, use_cache=not fresh)
     except Exception as exc:
         raise HTTPException(status_code=502, detail="AI regeneration failed") from exc
 
@@ -284,6 +287,7 @@ Return one strict JSON object matching the schema.
         marks=int(question.marks or 1),
     )
     if not sanitized:
+        await invalidate_llm_response(prompt, GeneratedQuestion)
         raise HTTPException(status_code=422, detail="Regenerated content was invalid")
 
     question.question_text = sanitized.question_text
@@ -5,6 +5,7 @@ import time
 import asyncio
 import logging
 from collections.abc import AsyncIterator
+from contextlib import aclosing
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,16 +23,21 @@ from backend.models.ai_job import AIJob
 from backend.models.user import User
 from backend.services.task_dispatcher import dispatch_quiz_task
 from backend.workers.quiz_creation_task import (
-    parse_questions_from_source,
+    get_source_index,
     infer_blueprint_sections_from_source,
     pick_from_source,
     generate_quiz_questions_batched,
+    normalize_question_type,
+    question_text_key,
     sanitize_generated_questions,
-    detect_content_type,
+    stream_quiz_questions,
+    source_index_content_type,
+    source_questions_from_index,
     should_replace_blueprint_with_inferred_sections,
 )
 from backend.core.config import settings
 from backend.core.redis import cache_delete
+from backend.services.compiled_paper import compile_paper, invalidate_quiz_paper, warm_paper_cache
 from backend.services.question_quality import sanitize_question_candidate
 from backend.services.verification import VerificationSchema, normalize_verification_schema
 
@@ -516,6 +522,7 @@ async def update_quiz_settings(
 
             quiz.settings_json = normalized
             quiz.duration_minutes = normalized["duration"]
+            await invalidate_quiz_paper(db, quiz_id)
 
             await db.commit()
             await db.refresh(quiz)
@@ -572,6 +579,7 @@ async def update_quiz_settings(
 
         quiz.duration_minutes = normalized["duration"]
         quiz.settings_json = normalized
+        await invalidate_quiz_paper(db, quiz_id)
 
         await db.commit()
         await db.refresh(settings_record)
@@ -622,6 +630,7 @@ async def update_quiz(
         quiz.is_archived = bool(payload.get("is_archived"))
         if quiz.is_archived:
             quiz.is_published = False
+            await invalidate_quiz_paper(db, quiz_id)
             if quiz.ai_generation_status == "PUBLISHED":
                 quiz.ai_generation_status = "APPROVED"
 
@@ -920,6 +929,7 @@ async def stream_ai_quiz_generation(
     async def event_stream() -> AsyncIterator[str]:
         start = time.perf_counter()
         generated_count = 0
+        first_question_ms: int | None = None
         total_required = sum(section["number_of_questions"] for section in blueprint_sections)
         disconnected = False
 
@@ -939,8 +949,9 @@ async def stream_ai_quiz_generation(
         logger.info("quiz_stream_start request_id=%s quiz_id=%s job_id=%s", request_id, quiz_id, job_id)
 
         try:
-            source_questions = parse_questions_from_source(extracted_text)
-            content_type = detect_content_type(extracted_text)
+            source_index = await get_source_index(quiz_id, extracted_text)
+            source_questions = source_questions_from_index(source_index)
+            content_type = source_index_content_type(source_index)
             default_5_mcq = (
                 len(blueprint_sections) == 1
                 and blueprint_sections[0]["number_of_questions"] == 5
@@ -978,81 +989,49 @@ async def stream_ai_quiz_generation(
                 if strict_source_alignment and len(selected_pairs) < counts_needed:
                     raise ValueError("Strict source alignment is ON and source did not satisfy required counts.")
 
-                remaining_total = max(0, counts_needed - len(selected_pairs))
-                generated_remaining: list[object] = []
-                if remaining_total > 0:
-                    if await request.is_disconnected():
-                        disconnected = True
-                        raise asyncio.CancelledError()
-
-                    progress_chunk = safe_emit(
-                        "progress",
-                        {
-                            "request_id": request_id,
-                            "status": "building_prompt",
-                            "generated_count": generated_count,
-                            "target_count": total_required,
-                            "percent": 15,
-                        },
-                    )
-                    if progress_chunk:
-                        yield progress_chunk
-                    generated_remaining = sanitize_generated_questions(
-                        await generate_quiz_questions_batched(
-                            extracted_text=extracted_text,
-                            blueprint_sections=blueprint_sections,
-                            professor_note=(professor_note or "") + f" content_type={content_type}",
-                            source_questions=source_questions,
-                            retry_feedback="streaming_generation",
-                        )
-                    )
-                    if generated_remaining:
-                        ai_pairs, _feedback = pick_from_source(generated_remaining, blueprint_sections), None
-                        if selected_pairs:
-                            needed = counts_needed - len(selected_pairs)
-                            if needed > 0:
-                                selected_pairs.extend(ai_pairs[:needed])
-                        else:
-                            selected_pairs = ai_pairs[:counts_needed]
-                    if await request.is_disconnected():
-                        disconnected = True
-                        raise asyncio.CancelledError()
-
-                await db.execute(delete(Question).where(Question.quiz_id == quiz_id))
-                await db.commit()
-
-                section_result = await db.execute(
-                    select(QuizSection).where(QuizSection.quiz_id == quiz_id).order_by(QuizSection.created_at.asc())
-                )
-                db_sections = section_result.scalars().all()
-                if len(db_sections) < len(blueprint_sections):
-                    for idx in range(len(db_sections), len(blueprint_sections)):
-                        spec = blueprint_sections[idx]
-                        missing = QuizSection(
-                            quiz_id=quiz_id,
-                            title=spec["title"],
-                            total_marks=spec["number_of_questions"] * spec["marks_per_question"],
-                        )
-                        db.add(missing)
+                db_sections: list[QuizSection] = []
+                generated_per_section: dict[int, int] = {section["index"]: 0 for section in blueprint_sections}
+                # Stems already sent; streamed items are sanitized one at a
+                # time, so repeats are dropped here as _dedupe_questions_by_text would.
+                seen_texts: set[str] = set()
+
+                async def prepare_quiz() -> None:
+                    # Existing questions are only replaced once the first new one is ready.
+                    nonlocal db_sections
+                    await db.execute(delete(Question).where(Question.quiz_id == quiz_id))
                     await db.commit()
+
                     section_result = await db.execute(
                         select(QuizSection).where(QuizSection.quiz_id == quiz_id).order_by(QuizSection.created_at.asc())
                     )
                     db_sections = section_result.scalars().all()
+                    if len(db_sections) < len(blueprint_sections):
+                        for idx in range(len(db_sections), len(blueprint_sections)):
+                            spec = blueprint_sections[idx]
+                            missing = QuizSection(
+                                quiz_id=quiz_id,
+                                title=spec["title"],
+                                total_marks=spec["number_of_questions"] * spec["marks_per_question"],
+                            )
+                            db.add(missing)
+                        await db.commit()
+                        section_result = await db.execute(
+                            select(QuizSection).where(QuizSection.quiz_id == quiz_id).order_by(QuizSection.created_at.asc())
+                        )
+                        db_sections = section_result.scalars().all()
 
-                generated_per_section: dict[int, int] = {section["index"]: 0 for section in blueprint_sections}
-
-                # Stream source-aligned questions first.
-                for section_spec, source_q in selected_pairs:
+                async def store_question(section_spec: dict, candidate: object) -> Question:
+                    if not db_sections:
+                        await prepare_quiz()
                     section_index = section_spec["index"]
                     target_section = db_sections[section_index]
                     q_type = section_spec["question_type"]
                     marks = section_spec["marks_per_question"]
                     sanitized = sanitize_question_candidate(
-                        question_text=getattr(source_q, "question_text", ""),
+                        question_text=getattr(candidate, "question_text", ""),
                         question_type=q_type,
-                        options=getattr(source_q, "options", None),
-                        correct_answer=getattr(source_q, "correct_answer", None),
+                        options=getattr(candidate, "options", None),
+                        correct_answer=getattr(candidate, "correct_answer", None),
                         marks=marks,
                     )
                     if not sanitized:
@@ -1087,44 +1066,154 @@ async def stream_ai_quiz_generation(
                     db.add(question)
                     await db.commit()
                     await db.refresh(question)
+                    generated_per_section[section_index] += 1
+                    seen_texts.add(question_text_key(question))
+                    return question
 
+                def question_events(question: Question, status_name: str) -> list[str]:
+                    nonlocal generated_count, first_question_ms
                     generated_count += 1
-                    generated_per_section[section_index] += 1
+                    if first_question_ms is None:
+                        first_question_ms = int((time.perf_counter() - start) * 1000)
+                        logger.info(
+                            "quiz_stream_first_question request_id=%s quiz_id=%s job_id=%s time_to_first_question_ms=%s",
+                            request_id,
+                            quiz_id,
+                            job_id,
+                            first_question_ms,
+                        )
                     percent = min(99, 20 + int((generated_count / max(total_required, 1)) * 75))
-
-                    question_chunk = safe_emit(
-                        "question",
-                        {
-                            "request_id": request_id,
-                            "generated_count": generated_count,
-                            "target_count": total_required,
-                            "question": {
-                                "id": str(question.id),
-                                "section_id": str(question.section_id),
-                                "question_text": question.question_text,
-                                "question_type": question.question_type,
-                                "difficulty": question.difficulty,
-                                "options": question.options,
-                                "correct_answer": question.correct_answer,
-                                "marks": question.marks,
-                                "status": question.status,
+                    chunks = [
+                        safe_emit(
+                            "question",
+                            {
+                                "request_id": request_id,
+                                "generated_count": generated_count,
+                                "target_count": total_required,
+                                "question": {
+                                    "id": str(question.id),
+                                    "section_id": str(question.section_id),
+                                    "question_text": question.question_text,
+                                    "question_type": question.question_type,
+                                    "difficulty": question.difficulty,
+                                    "options": question.options,
+                                    "correct_answer": question.correct_answer,
+                                    "marks": question.marks,
+                                    "status": question.status,
+                                },
                             },
-                        },
-                    )
-                    if question_chunk:
-                        yield question_chunk
-                    per_question_progress = safe_emit(
+                        ),
+                        safe_emit(
+                            "progress",
+                            {
+                                "request_id": request_id,
+                                "status": status_name,
+                                "generated_count": generated_count,
+                                "target_count": total_required,
+                                "percent": percent,
+                            },
+                        ),
+                    ]
+                    return [chunk for chunk in chunks if chunk]
+
+                def open_section_for(candidate: object) -> dict | None:
+                    qtype = normalize_question_type(getattr(candidate, "question_type", None))
+                    for section in blueprint_sections:
+                        if section["question_type"] == qtype and generated_per_section[section["index"]] < section["number_of_questions"]:
+                            return section
+                    return None
+
+                # Stream source-aligned questions first.
+                for section_spec, source_q in selected_pairs:
+                    question = await store_question(section_spec, source_q)
+                    for chunk in question_events(question, "streaming_source_questions"):
+                        yield chunk
+
+                remaining_total = max(0, counts_needed - len(selected_pairs))
+                if remaining_total > 0:
+                    if await request.is_disconnected():
+                        disconnected = True
+                        raise asyncio.CancelledError()
+
+                    progress_chunk = safe_emit(
                         "progress",
                         {
                             "request_id": request_id,
-                            "status": "streaming_source_questions",
+                            "status": "building_prompt",
                             "generated_count": generated_count,
                             "target_count": total_required,
-                            "percent": percent,
+                            "percent": 15,
                         },
                     )
-                    if per_question_progress:
-                        yield per_question_progress
+                    if progress_chunk:
+                        yield progress_chunk
+
+                    generation_note = (professor_note or "") + f" content_type={content_type}"
+                    streamed_any = False
+                    try:
+                        # Each question is stored and sent as soon as its JSON object closes.
+                        async with aclosing(
+                            stream_quiz_questions(
+                                extracted_text=extracted_text,
+                                blueprint_sections=blueprint_sections,
+                                professor_note=generation_note,
+                                retry_feedback="streaming_generation",
+                            )
+                        ) as generated_stream:
+                            async for generated in generated_stream:
+                                streamed_any = True
+                                candidates = sanitize_generated_questions([generated])
+                                if not candidates or question_text_key(candidates[0]) in seen_texts:
+                                    continue
+                                section_spec = open_section_for(candidates[0])
+                                if section_spec is None:
+                                    continue
+                                question = await store_question(section_spec, candidates[0])
+                                for chunk in question_events(question, "streaming_generated_questions"):
+                                    yield chunk
+                                if await request.is_disconnected():
+                                    disconnected = True
+                                    raise asyncio.CancelledError()
+                                if generated_count >= counts_needed:
+                                    break
+                    except (asyncio.CancelledError, asyncio.TimeoutError):
+                        raise
+                    except Exception:
+                        if streamed_any:
+                            raise
+                        logger.warning(
+                            "quiz_stream_provider_stream_failed request_id=%s quiz_id=%s job_id=%s",
+                            request_id,
+                            quiz_id,
+                            job_id,
+                            exc_info=True,
+                        )
+
+                    if not streamed_any:
+                        # Provider did not stream parseable items; fall back to one full response.
+                        generated_remaining = sanitize_generated_questions(
+                            await generate_quiz_questions_batched(
+                                extracted_text=extracted_text,
+                                blueprint_sections=blueprint_sections,
+                                professor_note=generation_note,
+                                source_questions=source_questions,
+                                retry_feedback="streaming_generation",
+                            )
+                        )
+                        for generated in generated_remaining:
+                            if question_text_key(generated) in seen_texts:
+                                continue
+                            section_spec = open_section_for(generated)
+                            if section_spec is None:
+                                continue
+                            question = await store_question(section_spec, generated)
+                            for chunk in question_events(question, "streaming_generated_questions"):
+                                yield chunk
+                            if generated_count >= counts_needed:
+                                break
+                    if await request.is_disconnected():
+                        disconnected = True
+                        raise asyncio.CancelledError()
 
                 if generated_count < counts_needed:
                     raise ValueError("Generated questions did not satisfy blueprint counts.")
@@ -1135,17 +1224,20 @@ async def stream_ai_quiz_generation(
                     **(job.meta or {}),
                     "generated_count": generated_count,
                     "completed_at": int(time.time()),
+                    "time_to_first_question_ms": first_question_ms,
                 }
                 await db.commit()
 
                 elapsed_ms = int((time.perf_counter() - start) * 1000)
                 logger.info(
-                    "quiz_stream_complete request_id=%s quiz_id=%s job_id=%s generated=%s elapsed_ms=%s",
+                    "quiz_stream_complete request_id=%s quiz_id=%s job_id=%s generated=%s elapsed_ms=%s "
+                    "time_to_first_question_ms=%s",
                     request_id,
                     quiz_id,
                     job_id,
                     generated_count,
                     elapsed_ms,
+                    first_question_ms,
                 )
                 complete_chunk = safe_emit(
                     "complete",
@@ -1154,6 +1246,7 @@ async def stream_ai_quiz_generation(
                         "generated_count": generated_count,
                         "target_count": total_required,
                         "elapsed_ms": elapsed_ms,
+                        "time_to_first_question_ms": first_question_ms,
                     },
                 )
                 if complete_chunk:
@@ -1314,6 +1407,8 @@ async def publish_quiz(
         quiz.is_published = True
         quiz.ai_generation_status = "PUBLISHED"
         public_link = _serialize_public_link(quiz)
+        # Build the exam paper once here instead of per student at exam start.
+        paper = await compile_paper(db, quiz)
 
         await db.commit()
         await db.refresh(quiz)
@@ -1328,6 +1423,8 @@ async def publish_quiz(
         logger.exception("Failed publishing quiz", extra={"quiz_id": str(quiz_id), "user_id": str(current_user.id)})
         raise HTTPException(status_code=500, detail="Failed to publish quiz due to a database error") from exc
 
+    if paper is not None:
+        await warm_paper_cache(paper)
     await _invalidate_dashboard_cache(current_user.id)
 
     return {
@@ -1346,6 +1443,7 @@ async def archive_quiz(
     quiz = await _get_owned_quiz(quiz_id, db, current_user)
     quiz.is_archived = True
     quiz.is_published = False
+    await invalidate_quiz_paper(db, quiz_id)
     if quiz.ai_generation_status == "PUBLISHED":
         quiz.ai_generation_status = "APPROVED"
     await db.commit()
@@ -1385,6 +1483,7 @@ async def unpublish_quiz(
         )
 
     quiz.is_published = False
+    await invalidate_quiz_paper(db, quiz_id)
 
     if quiz.ai_generation_status == "PUBLISHED":
         quiz.ai_generation_status = "APPROVED"
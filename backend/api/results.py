@@ -5,11 +5,14 @@ from celery.result import AsyncResult
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.core.database import get_db
 from backend.services.export_service import load_export_file
-from backend.services.task_dispatcher import dispatch_export_task
+from backend.services.regrade_service import REGRADE_JOB_TYPE, expire_stale_regrade_jobs
+from backend.services.task_dispatcher import dispatch_export_task, dispatch_regrade_task
+from backend.models.ai_job import AIJob
 from backend.models.attempt import Attempt
 from backend.models.result import Result
 from backend.models.student_profile import StudentProfile
@@ -108,6 +111,44 @@ async def export_quiz_results(
     }
 
 
+@router.post("/{quiz_id}/regrade", status_code=202)
+async def regrade_quiz_results(
+    quiz_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_staff),
+):
+    quiz = await db.get(Quiz, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if quiz.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to regrade this quiz")
+
+    if await expire_stale_regrade_jobs(db, quiz_id):
+        await db.commit()
+
+    job = AIJob(
+        quiz_id=quiz_id,
+        job_type=REGRADE_JOB_TYPE,
+        status="PENDING",
+        meta={"stage": "queued", "progress": 0},
+    )
+    db.add(job)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # uq_ai_jobs_active_regrade_quiz_id: another regrade is queued or running.
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="A regrade is already running for this quiz")
+    await db.refresh(job)
+
+    await dispatch_regrade_task(str(job.id), str(quiz_id))
+
+    return {
+        "message": "Regrade started",
+        "job_id": str(job.id),
+    }
+
+
 @export_router.get("/status/{task_id}")
 async def get_export_status(
     task_id: str,
@@ -11,6 +11,7 @@ from backend.models.question import Question
 from backend.models.quiz import Quiz
 from backend.models.quiz_section import QuizSection
 from backend.models.user import User
+from backend.services.compiled_paper import invalidate_quiz_paper
 from backend.services.question_quality import sanitize_question_candidate
 
 
@@ -90,6 +91,7 @@ async def approve_question(
         raise HTTPException(status_code=400, detail="Question is malformed and cannot be approved")
 
     question.status = "APPROVED"
+    await invalidate_quiz_paper(db, question.quiz_id)
     await db.commit()
 
     return {"message": "Question approved"}
@@ -131,6 +133,8 @@ async def approve_many_questions(
             raise HTTPException(status_code=400, detail="One or more questions are malformed and cannot be approved")
         question.status = "APPROVED"
 
+    for quiz_id in {question.quiz_id for question in questions}:
+        await invalidate_quiz_paper(db, quiz_id)
     await db.commit()
     return {"message": "Questions approved"}
 
@@ -174,11 +178,14 @@ async def move_many_questions(
     if len(questions) != len(parsed_ids):
         raise HTTPException(status_code=404, detail="One or more questions not found")
 
+    affected_quiz_ids = {question.quiz_id for question in questions} | {target_section.quiz_id}
     for question in questions:
         await _ensure_question_owner(question, db, current_user)
         question.section_id = target_section.id
         question.quiz_id = target_section.quiz_id
 
+    for quiz_id in affected_quiz_ids:
+        await invalidate_quiz_paper(db, quiz_id)
     await db.commit()
     return {"message": "Questions moved"}
 
@@ -219,5 +226,7 @@ async def update_many_question_marks(
         await _ensure_question_owner(question, db, current_user)
         question.marks = marks_value
 
+    for quiz_id in {question.quiz_id for question in questions}:
+        await invalidate_quiz_paper(db, quiz_id)
     await db.commit()
     return {"message": "Marks updated"}
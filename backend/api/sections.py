@@ -9,6 +9,7 @@ from backend.models.quiz import Quiz
 from backend.models.quiz_section import QuizSection
 from backend.models.question import Question
 from backend.models.user import User
+from backend.services.compiled_paper import invalidate_quiz_paper
 
 
 router = APIRouter(prefix="/sections", tags=["Sections"])
@@ -46,6 +47,7 @@ async def update_section(
             question.status = "DRAFT"
 
         quiz.is_published = False
+        await invalidate_quiz_paper(db, quiz.id)
         if quiz.ai_generation_status != "PROCESSING":
             quiz.ai_generation_status = "GENERATED"
 
@@ -1,25 +1,16 @@
 import uuid
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from backend.core.database import get_db
-from backend.models.attempt import Attempt
 from backend.models.violation import Violation
-from backend.core.redis import increment_violation
+from backend.core.exam_state import record_violation
+from backend.services.attempt_session import load_attempt_session
 
 
 router = APIRouter(prefix="/violations", tags=["Violations"])
 
 
-def _validate_attempt_token(attempt: Attempt, provided_token: str | None) -> None:
-    if not provided_token or provided_token != attempt.attempt_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid attempt token",
-        )
-
-
 # --------------------------------------------------
 # Report Violation (Student Runtime)
 # --------------------------------------------------
@@ -40,20 +31,9 @@ async def report_violation(
             detail="violation_type required",
         )
 
-    result = await db.execute(
-        select(Attempt).where(Attempt.id == attempt_id)
-    )
-
-    attempt = result.scalar_one_or_none()
-
-    if not attempt:
-        raise HTTPException(
-            status_code=404,
-            detail="Attempt not found",
-        )
-    _validate_attempt_token(attempt, x_attempt_token)
+    session = await load_attempt_session(db, attempt_id, x_attempt_token)
 
-    if attempt.submitted_at:
+    if session.submitted:
         raise HTTPException(status_code=409, detail="Attempt already submitted")
 
     # Persist violation
@@ -65,7 +45,7 @@ async def report_violation(
     db.add(violation)
     await db.commit()
 
-    # Increment Redis counter
-    await increment_violation(str(attempt_id), violation_type)
+    # Increment Redis counter and read back the running total in one call
+    violation_count = await record_violation(str(attempt_id), violation_type)
 
-    return {"message": "Violation recorded"}
+    return {"message": "Violation recorded", "violation_count": violation_count}
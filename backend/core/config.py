@@ -71,8 +71,30 @@ class Settings(BaseSettings):
     LLM_PROVIDER: str = "openrouter"
     LLM_MODEL: str
     LLM_API_KEY: str
+    LLM_HTTP_MAX_CONNECTIONS: int = 50
+    LLM_HTTP_MAX_KEEPALIVE: int = 20
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 60.0
+    # Shared provider concurrency across API processes and workers.
+    LLM_GOVERNOR_ENABLED: bool = True
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_SLOT_LEASE_SECONDS: int = 180
+    LLM_QUEUE_TIMEOUT_SECONDS: int = 300
+    LLM_RATE_LIMIT_RETRIES: int = 3
+    # Response cache: "none", "redis" or "sqlite" (local development).
+    LLM_CACHE_BACKEND: str = "none"
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_SQLITE_PATH: str = ".cache/llm_responses.sqlite3"
     OPENROUTER_BASE_URL: str | None = None
     QUIZ_STREAM_TIMEOUT_SECONDS: int = 300
+    # Blueprints above this many questions (or with several sections) are
+    # generated as concurrent per-section chunks.
+    QUIZ_GENERATION_FANOUT_MIN_QUESTIONS: int = 15
+    QUIZ_GENERATION_CHUNK_SIZE: int = 10
+    QUIZ_GENERATION_CONCURRENCY: int = 4
+    QUIZ_GENERATION_SECTION_RETRIES: int = 2
+    # Most source text (all sources together) read for one generation request.
+    QUIZ_SOURCE_MAX_CHARS: int = 200000
     LANGSMITH_TRACING: bool = False
     LANGSMITH_ENDPOINT: str | None = None
     LANGSMITH_API_KEY: str | None = None
@@ -94,6 +116,55 @@ class Settings(BaseSettings):
     # ----------------------
     USE_CELERY: bool = False  # Set to True when using Celery worker (GCP/Paid tier)
 
+    # ----------------------
+    # Document Extraction
+    # ----------------------
+    # PDFs longer than one shard are split across a process pool (capped at the CPU count).
+    PDF_EXTRACTION_WORKERS: int = 4
+    # Document tasks run on their own queue, consumed by a worker started with
+    # --pool threads so extraction can start its PDF process pool.
+    DOCUMENT_QUEUE_NAME: str = "documents"
+    PDF_PAGES_PER_SHARD: int = 50
+    # Pages with no usable text layer are OCRed, up to OCR_MAX_PAGES per document.
+    TESSERACT_CMD: str | None = None
+    OCR_DPI: int = 200
+    OCR_MAX_WORKERS: int = 4
+    OCR_MAX_PAGES: int = 50
+    OCR_MIN_PAGE_CHARS: int = 20
+    # Extracted text shared by uploads with identical bytes; least recently
+    # used blobs are evicted beyond EXTRACTION_CACHE_MAX_BYTES.
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_DIR: str = ".cache/extractions"
+    EXTRACTION_CACHE_MAX_BYTES: int = 2 * 1024**3
+
+    # ----------------------
+    # Exam Runtime
+    # ----------------------
+    ANSWER_FLUSH_INTERVAL_SECONDS: int = 5
+    ANSWER_BATCH_MAX_ITEMS: int = 200
+    EXAM_ADMISSION_ENABLED: bool = True
+    EXAM_ADMISSION_RATE_PER_SECOND: float = 20.0
+    EXAM_ADMISSION_BURST: int = 40
+    EXAM_ADMISSION_TICKET_TTL_SECONDS: int = 30
+    EXAM_ENTRY_CACHE_SECONDS: float = 2.0
+    EXAM_EXPIRY_SWEEP_INTERVAL_SECONDS: int = 30
+    EXAM_EXPIRY_SWEEP_BATCH_SIZE: int = 200
+    GRADING_QUEUE_NAME: str = "grading"
+    GRADING_CONCURRENCY: int = 4
+    GRADING_TASK_PRIORITY: int = 3  # 0 (highest) - 9 (lowest)
+    GRADING_BACKLOG_PRIORITY: int = 6
+    GRADING_TASK_CHUNK_SIZE: int = 10
+    GRADING_COALESCE_WINDOW_MS: int = 500  # 0 dispatches every live submit on its own
+    SHORT_ANSWER_BATCH_MAX_ITEMS: int = 25
+    SHORT_ANSWER_BATCH_WINDOW_MS: int = 300
+    GRADING_CACHE_ENABLED: bool = True
+    GRADING_CACHE_FUZZY_ENABLED: bool = False
+    GRADING_CACHE_FUZZY_THRESHOLD: float = 0.9
+    ANSWER_KEY_WRITE_BACK: bool = False
+    # A regrade job whose progress has not moved for this long is treated as
+    # crashed, so a new regrade of the quiz can start.
+    REGRADE_JOB_STALE_SECONDS: int = 900
+
     # ----------------------
     # YouTube Integration
     # ----------------------
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+
+from backend.core.redis import redis_client
+
+
+# -------------------------------------------------
+# ATOMIC EXAM STATE
+# -------------------------------------------------
+#
+# Every runtime call of a live exam needs the same handful of keys: the
+# cached attempt session, the authoritative timer, the heartbeat marker and
+# the violation counters. The scripts below read and update them in one
+# server-side step so there is a single round-trip and no window between
+# the expiry check and the heartbeat write.
+
+HEARTBEAT_TTL_SECONDS = 60
+
+
+def _exam_keys(attempt_id: str) -> list[str]:
+    return [
+        f"exam:session:{attempt_id}",
+        f"exam:timer:{attempt_id}",
+        f"exam:heartbeat:{attempt_id}",
+        f"exam:violations:{attempt_id}",
+    ]
+
+
+# KEYS: session, timer, heartbeat, violations
+# ARGV: token hash ('' to skip the write), refresh flag, heartbeat ttl
+# The heartbeat is only written for a cached, unsubmitted session whose token
+# hash matches and whose timer is still running.
+_EXAM_RUNTIME_SCRIPT = redis_client.register_script(
+    """
+    local session = redis.call('HGETALL', KEYS[1])
+    local ttl = redis.call('TTL', KEYS[2])
+
+    local violations = 0
+    for _, count in ipairs(redis.call('HVALS', KEYS[4])) do
+        violations = violations + (tonumber(count) or 0)
+    end
+
+    local wrote = 0
+    if ARGV[2] == '1' and ttl > 0 and #session > 0 then
+        local token_hash = nil
+        local submitted = nil
+        for i = 1, #session, 2 do
+            if session[i] == 'token_hash' then token_hash = session[i + 1] end
+            if session[i] == 'submitted' then submitted = session[i + 1] end
+        end
+        if submitted ~= '1' and token_hash ~= nil and token_hash == ARGV[1] then
+            redis.call('SET', KEYS[3], 'alive', 'EX', tonumber(ARGV[3]))
+            wrote = 1
+        end
+    end
+
+    return {session, ttl, violations, wrote}
+    """
+)
+
+# KEYS: violations; ARGV: violation type. Returns the new total across types.
+_RECORD_VIOLATION_SCRIPT = redis_client.register_script(
+    """
+    redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+    local total = 0
+    for _, count in ipairs(redis.call('HVALS', KEYS[1])) do
+        total = total + (tonumber(count) or 0)
+    end
+    return total
+    """
+)
+
+
+@dataclass
+class ExamRuntimeState:
+    session: dict[str, str] = field(default_factory=dict)
+    remaining_time: int = 0
+    violation_count: int = 0
+    heartbeat_written: bool = False
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining_time <= 0
+
+
+def _pairs_to_dict(values: list) -> dict[str, str]:
+    return {str(values[i]): str(values[i + 1]) for i in range(0, len(values) - 1, 2)}
+
+
+async def read_exam_state(
+    attempt_id: str,
+    *,
+    token_hash: str = "",
+    refresh_heartbeat: bool = False,
+) -> ExamRuntimeState:
+    """
+    One atomic call: loads the cached session, checks the timer, optionally
+    refreshes the heartbeat and returns the remaining TTL with violation totals.
+    """
+    session, ttl, violations, wrote = await _EXAM_RUNTIME_SCRIPT(
+        keys=_exam_keys(attempt_id),
+        args=[token_hash, "1" if refresh_heartbeat else "0", HEARTBEAT_TTL_SECONDS],
+    )
+    ttl = int(ttl or 0)
+    return ExamRuntimeState(
+        session=_pairs_to_dict(list(session or [])),
+        remaining_time=ttl if ttl > 0 else 0,
+        violation_count=int(violations or 0),
+        heartbeat_written=bool(wrote),
+    )
+
+
+async def record_violation(attempt_id: str, violation_type: str) -> int:
+    """Increments one violation counter and returns the attempt's total in the same call."""
+    total = await _RECORD_VIOLATION_SCRIPT(
+        keys=[f"exam:violations:{attempt_id}"],
+        args=[violation_type],
+    )
+    return int(total or 0)
@@ -0,0 +1,67 @@
+import json
+
+
+class IncrementalJSONArrayParser:
+    """
+    Pulls complete objects out of the first JSON array in a streamed model
+    response as soon as each one closes, e.g. the items of
+    ``{"questions": [{...}, {...}]}`` or of a bare ``[{...}]``. Text outside
+    the array (markdown fences, preamble) is ignored. Only the object being
+    read is buffered, so feeding a long response stays linear.
+    """
+
+    def __init__(self):
+        self._in_string = False
+        self._escaped = False
+        self._depth = 0
+        self._array_depth: int | None = None
+        self._done = False
+        self._item: list[str] | None = None
+        self.skipped = 0
+
+    def feed(self, text: str) -> list[dict]:
+        items: list[dict] = []
+        if self._done or not text:
+            return items
+        for char in text:
+            if self._item is not None:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif char == "{" and self._item is None and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item = [char]
+            elif char in "}]":
+                if char == "}" and self._item is not None and self._depth == self._array_depth + 1:
+                    self._finish_item(items)
+                elif char == "]" and self._depth == self._array_depth:
+                    self._done = True
+                    break
+                self._depth -= 1
+        return items
+
+    def _finish_item(self, items: list[dict]) -> None:
+        raw = "".join(self._item or [])
+        self._item = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            self.skipped += 1
+            return
+        if isinstance(value, dict):
+            items.append(value)
+        else:
+            self.skipped += 1
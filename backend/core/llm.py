@@ -1,4 +1,14 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator
 from typing import Type, TypeVar
+
+import httpx
+import openai
 from pydantic import BaseModel
 
 from langchain_openai import ChatOpenAI
@@ -10,28 +20,214 @@ except Exception:  # pragma: no cover
     OutputFixingParser = None  # type: ignore
 
 from backend.core.config import settings
+from backend.core.json_stream import IncrementalJSONArrayParser
+from backend.core.llm_cache import (
+    get_cached_response,
+    invalidate_cached_response,
+    llm_cache_key,
+    store_cached_response,
+)
+from backend.core.llm_governor import back_off_after_rate_limit, llm_slot
+from backend.core.redis import record_metrics
+
 
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
+LLM_METRICS_GROUP = "llm:calls"
+LLM_TIMEOUT_SECONDS = 60
+
 
-def get_llm() -> ChatOpenAI:
-    return ChatOpenAI(
-        api_key=settings.LLM_API_KEY,
-        model=settings.LLM_MODEL,
-        base_url=settings.OPENROUTER_BASE_URL,
-        temperature=0.7,
-        timeout=60,
-        max_retries=2,
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS,
     )
 
 
-async def structured_llm_call(prompt: str, output_schema: Type[T]) -> T:
+class _LoopClients:
+    """Async connection pool and chat clients bound to one event loop."""
+
+    def __init__(self):
+        self.http_async_client = httpx.AsyncClient(limits=_http_limits(), timeout=LLM_TIMEOUT_SECONDS)
+        self.llms: dict[tuple[str, float, str], ChatOpenAI] = {}
+
+
+class _LLMClientRegistry:
+    """
+    Process-wide ChatOpenAI clients, one per (model, temperature, base_url),
+    sharing a keep-alive connection pool. httpx async pools cannot cross
+    event loops, so clients are kept per running loop; Celery tasks that
+    start a fresh loop per job reuse clients within the job and release them
+    with close_llm_clients(). Forked children (Celery prefork) start with an
+    empty registry instead of inheriting the parent's sockets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._http_client: httpx.Client | None = None
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients] = weakref.WeakKeyDictionary()
+        self._sync_llms: dict[tuple[str, float, str], ChatOpenAI] = {}
+        self._created = 0
+        self._reused = 0
+
+    def after_fork(self) -> None:
+        # Never close here: the sockets still belong to the parent process.
+        self._lock = threading.Lock()
+        self._reset()
+
+    def get(self, model: str, temperature: float, base_url: str) -> ChatOpenAI:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=_http_limits(), timeout=LLM_TIMEOUT_SECONDS)
+            key = (model, temperature, base_url)
+            if loop is None:
+                # Sync callers only ever use the thread-safe sync pool.
+                llms, http_async_client = self._sync_llms, None
+            else:
+                clients = self._loops.get(loop)
+                if clients is None:
+                    clients = _LoopClients()
+                    self._loops[loop] = clients
+                llms, http_async_client = clients.llms, clients.http_async_client
+            llm = llms.get(key)
+            if llm is None:
+                llm = self._build(model, temperature, base_url, self._http_client, http_async_client)
+                llms[key] = llm
+            else:
+                self._reused += 1
+            return llm
+
+    def _build(
+        self,
+        model: str,
+        temperature: float,
+        base_url: str,
+        http_client: httpx.Client,
+        http_async_client: httpx.AsyncClient | None,
+    ) -> ChatOpenAI:
+        self._created += 1
+        return ChatOpenAI(
+            api_key=settings.LLM_API_KEY,
+            model=model,
+            base_url=base_url,
+            temperature=temperature,
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=2,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+
+    async def close_current_loop(self) -> None:
+        with self._lock:
+            clients = self._loops.pop(asyncio.get_running_loop(), None)
+        if clients is not None:
+            await clients.http_async_client.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            loops = list(self._loops.values())
+            return {
+                "pid": self._pid,
+                "event_loops": len(loops),
+                "clients": len(self._sync_llms) + sum(len(clients.llms) for clients in loops),
+                "clients_created": self._created,
+                "clients_reused": self._reused,
+            }
+
+
+_registry = _LLMClientRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_registry.after_fork)
+
+
+def get_llm(model: str | None = None, temperature: float = 0.7) -> ChatOpenAI:
+    return _registry.get(model or settings.LLM_MODEL, temperature, settings.OPENROUTER_BASE_URL)
+
+
+async def close_llm_clients() -> None:
+    """Closes the connection pool of the running loop. Celery tasks call this before asyncio.run() returns."""
+    await _registry.close_current_loop()
+
+
+def llm_client_stats() -> dict:
+    return _registry.stats()
+
+
+async def _record_call(started_at: float, *, failed: bool) -> None:
+    try:
+        await record_metrics(
+            LLM_METRICS_GROUP,
+            calls=1,
+            failures=int(failed),
+            elapsed_seconds=float(time.perf_counter() - started_at),
+        )
+    except Exception:
+        logger.warning("Could not record LLM call metrics", exc_info=True)
+
+
+async def _invoke_structured(llm: ChatOpenAI, parser: JsonOutputParser, full_prompt: str):
+    chain = llm | parser
+    try:
+        return await chain.ainvoke(full_prompt)
+    except OutputParserException:
+        # Fallback: get raw text and repair to valid JSON
+        raw_msg = await llm.ainvoke(full_prompt)
+        raw_text = raw_msg.content if hasattr(raw_msg, "content") else str(raw_msg)
+        if OutputFixingParser is None:
+            raise
+        fixer = OutputFixingParser.from_llm(llm, parser)
+        return await fixer.aparse(raw_text)
+
+
+async def _governed_invoke(llm: ChatOpenAI, parser: JsonOutputParser, full_prompt: str):
+    """Runs the call inside a shared provider slot, retrying 429s after the provider's Retry-After."""
+    rate_limited = 0
+    while True:
+        try:
+            async with llm_slot():
+                return await _invoke_structured(llm, parser, full_prompt)
+        except openai.RateLimitError as exc:
+            if rate_limited >= settings.LLM_RATE_LIMIT_RETRIES:
+                raise
+            rate_limited += 1
+            delay = await back_off_after_rate_limit(exc)
+            if not settings.LLM_GOVERNOR_ENABLED:
+                await asyncio.sleep(delay)
+
+
+async def structured_llm_call(prompt: str, output_schema: Type[T], *, use_cache: bool = True) -> T:
     """
     Always return a validated Pydantic model instance.
     Never return raw dict.
+
+    Identical (model, prompt, schema) calls are answered from the response
+    cache when LLM_CACHE_BACKEND is set; pass use_cache=False for a fresh
+    completion.
     """
 
+    cache_key = llm_cache_key(settings.LLM_MODEL, prompt, output_schema.__name__) if use_cache else None
+    if cache_key is not None:
+        cached = await get_cached_response(cache_key)
+        if cached is not None:
+            try:
+                return output_schema.model_validate_json(cached)
+            except ValueError:
+                await invalidate_cached_response(cache_key)
+
+    started_at = time.perf_counter()
     llm = get_llm()
     parser = JsonOutputParser(pydantic_object=output_schema)
 
@@ -43,17 +239,80 @@ async def structured_llm_call(prompt: str, output_schema: Type[T]) -> T:
     {format_instructions}
     """
 
-    chain = llm | parser
+    try:
+        raw = await _governed_invoke(llm, parser, full_prompt)
+        result = output_schema.model_validate(raw)
+    except Exception:
+        await _record_call(started_at, failed=True)
+        raise
+
+    await _record_call(started_at, failed=False)
+    if cache_key is not None:
+        await store_cached_response(cache_key, result.model_dump_json())
+    return result
+
+
+async def stream_structured_items(
+    prompt: str,
+    output_schema: Type[BaseModel],
+    item_schema: Type[T],
+    *,
+    use_cache: bool = True,
+) -> AsyncIterator[T]:
+    """
+    Streams the completion of a prompt whose output_schema wraps a single
+    list of item_schema objects, yielding each validated item as soon as its
+    JSON object closes. Items that fail validation are skipped. A complete
+    output (nothing skipped) is cached under the same key structured_llm_call
+    would use.
+    """
+    array_field = next(iter(output_schema.model_fields))
+    cache_key = llm_cache_key(settings.LLM_MODEL, prompt, output_schema.__name__) if use_cache else None
+    if cache_key is not None:
+        cached = await get_cached_response(cache_key)
+        if cached is not None:
+            try:
+                for item in getattr(output_schema.model_validate_json(cached), array_field):
+                    yield item
+                return
+            except ValueError:
+                await invalidate_cached_response(cache_key)
 
+    started_at = time.perf_counter()
+    llm = get_llm()
+    parser = JsonOutputParser(pydantic_object=output_schema)
+    full_prompt = f"""
+    {prompt}
+
+    {parser.get_format_instructions()}
+    """
+
+    stream_parser = IncrementalJSONArrayParser()
+    items: list[T] = []
     try:
-        raw = await chain.ainvoke(full_prompt)
-    except OutputParserException:
-        # Fallback: get raw text and repair to valid JSON
-        raw_msg = await llm.ainvoke(full_prompt)
-        raw_text = raw_msg.content if hasattr(raw_msg, "content") else str(raw_msg)
-        if OutputFixingParser is None:
-            raise
-        fixer = OutputFixingParser.from_llm(llm, parser)
-        raw = await fixer.aparse(raw_text)
+        async with llm_slot():
+            async for chunk in llm.astream(full_prompt):
+                content = chunk.content if isinstance(chunk.content, str) else ""
+                for raw in stream_parser.feed(content):
+                    try:
+                        item = item_schema.model_validate(raw)
+                    except ValueError:
+                        stream_parser.skipped += 1
+                        continue
+                    items.append(item)
+                    yield item
+    except Exception:
+        await _record_call(started_at, failed=True)
+        raise
+
+    await _record_call(started_at, failed=False)
+    if stream_parser.skipped:
+        # A partial list must never answer a later structured_llm_call.
+        logger.warning("Skipped %s malformed streamed %s items", stream_parser.skipped, item_schema.__name__)
+    elif cache_key is not None and items:
+        await store_cached_response(cache_key, output_schema(**{array_field: items}).model_dump_json())
+
 
-    return output_schema.model_validate(raw)
+async def invalidate_llm_response(prompt: str, output_schema: type[BaseModel]) -> None:
+    """Drops a cached response the caller rejected so the next identical call asks the model again."""
+    await invalidate_cached_response(llm_cache_key(settings.LLM_MODEL, prompt, output_schema.__name__))
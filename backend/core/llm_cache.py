@@ -0,0 +1,183 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from backend.core.config import settings
+from backend.core.redis import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_PREFIX = "llm:cache:"
+LLM_CACHE_INDEX_KEY = "llm:cache:index"
+
+# Hit/miss counters of the job currently running, see track_llm_cache().
+_job_cache_stats: contextvars.ContextVar[dict | None] = contextvars.ContextVar("llm_cache_stats", default=None)
+
+
+def llm_cache_key(model: str, prompt: str, schema_name: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, schema_name, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def track_llm_cache() -> dict:
+    """Starts counting cache hits and misses for LLM calls made from the current task."""
+    stats = {"hits": 0, "misses": 0}
+    _job_cache_stats.set(stats)
+    return stats
+
+
+def _count(outcome: str) -> None:
+    stats = _job_cache_stats.get()
+    if stats is not None:
+        stats[outcome] += 1
+
+
+class _RedisBackend:
+    """Entries expire by TTL; a sorted index by write time trims the oldest beyond max_entries."""
+
+    async def get(self, key: str) -> str | None:
+        return await redis_client.get(f"{LLM_CACHE_PREFIX}{key}")
+
+    async def set(self, key: str, value: str) -> None:
+        now = time.time()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(f"{LLM_CACHE_PREFIX}{key}", value, ex=settings.LLM_CACHE_TTL_SECONDS)
+            pipe.zadd(LLM_CACHE_INDEX_KEY, {key: now})
+            pipe.zremrangebyscore(LLM_CACHE_INDEX_KEY, "-inf", now - settings.LLM_CACHE_TTL_SECONDS)
+            pipe.zcard(LLM_CACHE_INDEX_KEY)
+            *_, size = await pipe.execute()
+        excess = int(size) - settings.LLM_CACHE_MAX_ENTRIES
+        if excess > 0:
+            evicted = await redis_client.zpopmin(LLM_CACHE_INDEX_KEY, excess)
+            if evicted:
+                await redis_client.delete(*(f"{LLM_CACHE_PREFIX}{member}" for member, _ in evicted))
+
+    async def delete(self, key: str) -> None:
+        await redis_client.delete(f"{LLM_CACHE_PREFIX}{key}")
+        await redis_client.zrem(LLM_CACHE_INDEX_KEY, key)
+
+
+class _SQLiteBackend:
+    """On-disk cache for local development; least recently read entries are evicted first."""
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND stored_at >= ?",
+                (key, now - settings.LLM_CACHE_TTL_SECONDS),
+            ).fetchone()
+            if row is not None:
+                connection.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                connection.commit()
+            return row[0] if row else None
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            connection.execute("DELETE FROM llm_cache WHERE stored_at < ?", (now - settings.LLM_CACHE_TTL_SECONDS,))
+            connection.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (settings.LLM_CACHE_MAX_ENTRIES,),
+            )
+            connection.commit()
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            connection.commit()
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+
+_backend: _RedisBackend | _SQLiteBackend | None = None
+_backend_name: str | None = None
+
+
+def _get_backend() -> _RedisBackend | _SQLiteBackend | None:
+    global _backend, _backend_name
+    name = (settings.LLM_CACHE_BACKEND or "none").strip().lower()
+    if name != _backend_name:
+        if name == "redis":
+            _backend = _RedisBackend()
+        elif name == "sqlite":
+            _backend = _SQLiteBackend(settings.LLM_CACHE_SQLITE_PATH)
+        else:
+            _backend = None
+        _backend_name = name
+    return _backend
+
+
+async def get_cached_response(key: str) -> str | None:
+    backend = _get_backend()
+    if backend is None:
+        return None
+    try:
+        value = await backend.get(key)
+    except Exception:
+        logger.warning("LLM cache lookup failed", exc_info=True)
+        value = None
+    _count("hits" if value is not None else "misses")
+    return value
+
+
+async def store_cached_response(key: str, value: str) -> None:
+    backend = _get_backend()
+    if backend is None:
+        return
+    try:
+        await backend.set(key, value)
+    except Exception:
+        logger.warning("LLM cache store failed", exc_info=True)
+
+
+async def invalidate_cached_response(key: str) -> None:
+    backend = _get_backend()
+    if backend is None:
+        return
+    try:
+        await backend.delete(key)
+    except Exception:
+        logger.warning("LLM cache invalidation failed", exc_info=True)
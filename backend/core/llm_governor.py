@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import email.utils
+import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+from redis.exceptions import RedisError
+
+from backend.core.config import settings
+from backend.core.redis import acquire_llm_slot, record_metrics, release_llm_slot, set_llm_backoff
+
+
+logger = logging.getLogger(__name__)
+
+LLM_GOVERNOR_METRICS_GROUP = "llm:governor"
+
+# Lower values are served first.
+LLM_PRIORITY_GRADING = 0
+LLM_PRIORITY_INTERACTIVE = 1
+LLM_PRIORITY_BULK = 2
+LLM_PRIORITY_NAMES = {
+    LLM_PRIORITY_GRADING: "grading",
+    LLM_PRIORITY_INTERACTIVE: "interactive",
+    LLM_PRIORITY_BULK: "bulk",
+}
+
+DEFAULT_RATE_LIMIT_BACKOFF_SECONDS = 5.0
+_WAITER_TTL_MS = 10_000
+_MIN_POLL_SECONDS = 0.05
+_MAX_POLL_SECONDS = 0.5
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "llm_priority", default=LLM_PRIORITY_INTERACTIVE
+)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Sets the priority class of LLM calls made inside the block."""
+    reset_token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(reset_token)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+async def _record(**counters) -> None:
+    try:
+        await record_metrics(LLM_GOVERNOR_METRICS_GROUP, **counters)
+    except Exception:
+        logger.warning("Could not record LLM governor metrics", exc_info=True)
+
+
+async def _wait_for_slot(token: str, priority: int) -> bool:
+    # Score orders the queue by priority class, then by arrival.
+    queue_score = priority * 10**13 + _now_ms()
+    deadline = time.monotonic() + settings.LLM_QUEUE_TIMEOUT_SECONDS
+    delay = _MIN_POLL_SECONDS
+    while True:
+        acquired, backoff_ms = await acquire_llm_slot(
+            token,
+            now_ms=_now_ms(),
+            limit=settings.LLM_MAX_CONCURRENCY,
+            lease_ms=settings.LLM_SLOT_LEASE_SECONDS * 1000,
+            queue_score=queue_score,
+            waiter_ttl_ms=_WAITER_TTL_MS,
+        )
+        if acquired:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        if backoff_ms:
+            await asyncio.sleep(min(backoff_ms / 1000, max(0.0, deadline - time.monotonic())))
+        else:
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(_MAX_POLL_SECONDS, delay * 1.5)
+
+
+@asynccontextmanager
+async def llm_slot(priority: int | None = None):
+    """
+    Holds one of LLM_MAX_CONCURRENCY provider slots shared by every API
+    process and worker. Waiters are served by priority class (grading,
+    interactive, bulk) and wait out any Retry-After backoff. Slots are
+    leased so a crashed holder frees its slot; when Redis is unavailable or
+    the wait exceeds LLM_QUEUE_TIMEOUT_SECONDS the call proceeds unthrottled.
+    """
+    if not settings.LLM_GOVERNOR_ENABLED:
+        yield
+        return
+
+    priority = _current_priority.get() if priority is None else priority
+    name = LLM_PRIORITY_NAMES.get(priority, "interactive")
+    token = uuid.uuid4().hex
+    started_at = time.perf_counter()
+    try:
+        try:
+            acquired = await _wait_for_slot(token, priority)
+        except RedisError:
+            logger.warning("LLM governor unavailable; calling the provider unthrottled", exc_info=True)
+            acquired = False
+        else:
+            if not acquired:
+                logger.warning("Waited %ss for an LLM slot (%s); proceeding", settings.LLM_QUEUE_TIMEOUT_SECONDS, name)
+        await _record(
+            **{
+                f"{name}_calls": 1,
+                f"{name}_wait_seconds": float(time.perf_counter() - started_at),
+                f"{name}_timeouts": int(not acquired),
+            }
+        )
+        yield
+    finally:
+        try:
+            await release_llm_slot(token)
+        except RedisError:
+            logger.warning("Could not release LLM slot %s", token, exc_info=True)
+
+
+def retry_after_seconds(exc: Exception) -> float:
+    """Provider-requested delay of a rate-limit error, from retry-after-ms or Retry-After."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return DEFAULT_RATE_LIMIT_BACKOFF_SECONDS
+
+
+async def back_off_after_rate_limit(exc: Exception) -> float:
+    """Pauses every caller until the provider's Retry-After has passed. Returns the delay."""
+    delay = retry_after_seconds(exc)
+    now_ms = _now_ms()
+    try:
+        await set_llm_backoff(now_ms + int(delay * 1000), now_ms)
+    except RedisError:
+        logger.warning("Could not share LLM rate-limit backoff", exc_info=True)
+    await _record(rate_limited=1, backoff_seconds=float(delay))
+    return delay
@@ -1,9 +1,60 @@
 import redis.asyncio as redis
+import asyncio
 import json
+import os
+import threading
+import time
+import weakref
+from redis.commands.core import AsyncScript
 from backend.core.config import settings
 
 
-redis_client = redis.from_url(
+class _LoopBoundRedis:
+    """
+    Stands in for a redis.asyncio client and hands out one client (and so one
+    connection pool) per running event loop. asyncio connections cannot cross
+    loops, and Celery tasks, also when run inline on a thread, start a fresh
+    loop per job; each releases only its own loop's client with
+    reset_redis_connections(). Forked children start with no clients.
+    """
+
+    def __init__(self, url: str, **options):
+        self._url = url
+        self._options = options
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis] = weakref.WeakKeyDictionary()
+
+    def _client(self) -> redis.Redis:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            client = self._clients.get(loop)
+            if client is None:
+                client = redis.from_url(self._url, **self._options)
+                self._clients[loop] = client
+            return client
+
+    def register_script(self, script: str) -> AsyncScript:
+        # Scripts resolve the client on every call, so they work on any loop.
+        # Pre-encoded so hashing the script needs no connection pool.
+        return AsyncScript(self, script.encode("utf-8"))
+
+    def __getattr__(self, name: str):
+        return getattr(self._client(), name)
+
+    async def close_current_loop(self) -> None:
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+redis_client = _LoopBoundRedis(
     settings.REDIS_URL,
     decode_responses=True,
     max_connections=50,
@@ -21,7 +72,10 @@ async def start_exam_timer(attempt_id: str, duration_seconds: int):
     TTL becomes single source of truth.
     """
     key = f"exam:timer:{attempt_id}"
-    await redis_client.set(key, "running", ex=duration_seconds)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(key, "running", ex=duration_seconds)
+        pipe.zadd(EXAM_DEADLINE_INDEX_KEY, {attempt_id: time.time() + duration_seconds})
+        await pipe.execute()
 
 
 async def get_remaining_time(attempt_id: str) -> int:
@@ -35,6 +89,36 @@ async def exam_expired(attempt_id: str) -> bool:
     return ttl is None or ttl <= 0
 
 
+# -------------------------------------------------
+# EXAM DEADLINE INDEX
+# -------------------------------------------------
+
+# Sorted set of live attempts scored by their deadline (epoch seconds), so the
+# expiry sweeper can find timed-out attempts without scanning Postgres.
+EXAM_DEADLINE_INDEX_KEY = "exam:deadlines"
+
+# KEYS: deadline index; ARGV: cutoff epoch seconds, batch size
+# Pops due attempts atomically so concurrent sweepers never claim the same id.
+_CLAIM_EXPIRED_SCRIPT = redis_client.register_script(
+    """
+    local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+    if #due > 0 then
+        redis.call('ZREM', KEYS[1], unpack(due))
+    end
+    return due
+    """
+)
+
+
+async def claim_expired_attempts(cutoff: float, limit: int) -> list[str]:
+    due = await _CLAIM_EXPIRED_SCRIPT(keys=[EXAM_DEADLINE_INDEX_KEY], args=[cutoff, limit])
+    return list(due or [])
+
+
+async def clear_exam_deadline(attempt_id: str) -> None:
+    await redis_client.zrem(EXAM_DEADLINE_INDEX_KEY, attempt_id)
+
+
 # -------------------------------------------------
 # HEARTBEAT
 # -------------------------------------------------
@@ -68,6 +152,21 @@ async def lock_attempt_session(attempt_id: str) -> bool:
     return await redis_client.set(key, "locked", nx=True, ex=7200)
 
 
+_RELEASE_LOCK_SCRIPT = redis_client.register_script(
+    """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+)
+
+
+async def release_lock(key: str, token: str) -> bool:
+    """Deletes ``key`` only if it still holds ``token``, so an expired lock taken over by another worker is kept."""
+    return bool(await _RELEASE_LOCK_SCRIPT(keys=[key], args=[token]))
+
+
 async def cache_get_json(key: str) -> dict | list | None:
     payload = await redis_client.get(key)
     if not payload:
@@ -84,3 +183,459 @@ async def cache_set_json(key: str, value: dict | list, ttl_seconds: int) -> None
 
 async def cache_delete(key: str) -> None:
     await redis_client.delete(key)
+
+
+_SET_IF_GENERATION_SCRIPT = redis_client.register_script(
+    """
+    if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+    """
+)
+
+
+async def set_if_generation(key: str, value: str, ttl_seconds: int, generation_key: str, generation: str) -> bool:
+    """
+    Sets ``key`` only while ``generation_key`` still holds ``generation``
+    (missing counts as "0"). Writers that bump the generation after their
+    change commits make a value computed from older reads a no-op.
+    """
+    return bool(
+        await _SET_IF_GENERATION_SCRIPT(keys=[key, generation_key], args=[generation, value, ttl_seconds])
+    )
+
+
+# -------------------------------------------------
+# ANSWER WRITE-BEHIND BUFFER
+# -------------------------------------------------
+
+ANSWER_BUFFER_DIRTY_KEY = "exam:answers:dirty"
+
+# ARGV[1] is the attempt id, followed by (question_id, client_seq, payload)
+# triples. A buffered entry is only replaced by a write with a client_seq
+# greater than or equal to the stored one, so late retries never win. Once
+# the attempt is sealed (KEYS[3]) nothing is buffered and -1 is returned.
+_BUFFER_ANSWERS_SCRIPT = redis_client.register_script(
+    """
+    if redis.call('EXISTS', KEYS[3]) == 1 then
+        return -1
+    end
+    local accepted = {}
+    for i = 2, #ARGV, 3 do
+        local field = ARGV[i]
+        local seq = tonumber(ARGV[i + 1])
+        local current = redis.call('HGET', KEYS[1], field)
+        local current_seq = -1
+        if current then
+            current_seq = tonumber(cjson.decode(current)['client_seq']) or -1
+        end
+        if seq >= current_seq then
+            redis.call('HSET', KEYS[1], field, ARGV[i + 2])
+            table.insert(accepted, field)
+        end
+    end
+    if #accepted > 0 then
+        redis.call('SADD', KEYS[2], ARGV[1])
+    end
+    return accepted
+    """
+)
+
+# ARGV[1] is the attempt id, followed by (question_id, payload) pairs. Only
+# fields still holding the flushed payload are removed, so answers buffered
+# while a flush was running survive until the next cycle.
+_CLEAR_FLUSHED_ANSWERS_SCRIPT = redis_client.register_script(
+    """
+    for i = 2, #ARGV, 2 do
+        if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        end
+    end
+    local remaining = redis.call('HLEN', KEYS[1])
+    if remaining == 0 then
+        redis.call('SREM', KEYS[2], ARGV[1])
+    end
+    return remaining
+    """
+)
+
+
+def _answer_buffer_key(attempt_id: str) -> str:
+    return f"exam:answers:{attempt_id}"
+
+
+def _answer_buffer_sealed_key(attempt_id: str) -> str:
+    return f"exam:answers:{attempt_id}:sealed"
+
+
+async def seal_answer_buffer(attempt_id: str, ttl_seconds: int = 7200) -> None:
+    """
+    Closes the buffer of a submitted attempt. Called before the final flush so
+    a batch save racing the submit is either flushed or rejected, never left
+    behind in Redis.
+    """
+    await redis_client.set(_answer_buffer_sealed_key(attempt_id), "1", ex=ttl_seconds)
+
+
+async def buffer_answers(attempt_id: str, entries: list[dict], ttl_seconds: int = 7200) -> list[str] | None:
+    """
+    Buffers answers for an attempt and marks it dirty for the flusher.
+    Returns the question ids whose entries were accepted (not stale), or
+    None when the buffer was sealed by a submit.
+    """
+    if not entries:
+        return []
+
+    args: list[str] = [attempt_id]
+    for entry in entries:
+        client_seq = int(entry.get("client_seq") or 0)
+        payload = {"answer_text": entry["answer_text"], "client_seq": client_seq}
+        args.extend([str(entry["question_id"]), str(client_seq), json.dumps(payload)])
+
+    key = _answer_buffer_key(attempt_id)
+    accepted = await _BUFFER_ANSWERS_SCRIPT(
+        keys=[key, ANSWER_BUFFER_DIRTY_KEY, _answer_buffer_sealed_key(attempt_id)],
+        args=args,
+    )
+    if accepted == -1:
+        return None
+    await redis_client.expire(key, ttl_seconds)
+    return [str(item) for item in accepted or []]
+
+
+async def get_buffered_answers(attempt_id: str) -> dict[str, str]:
+    return await redis_client.hgetall(_answer_buffer_key(attempt_id))
+
+
+async def clear_flushed_answers(attempt_id: str, flushed: dict[str, str]) -> int:
+    args: list[str] = [attempt_id]
+    for question_id, raw_payload in flushed.items():
+        args.extend([question_id, raw_payload])
+    return await _CLEAR_FLUSHED_ANSWERS_SCRIPT(keys=[_answer_buffer_key(attempt_id), ANSWER_BUFFER_DIRTY_KEY], args=args)
+
+
+async def discard_buffered_answer(attempt_id: str, question_id: str) -> None:
+    await redis_client.hdel(_answer_buffer_key(attempt_id), question_id)
+
+
+async def list_dirty_answer_buffers(limit: int = 500) -> list[str]:
+    return list(await redis_client.srandmember(ANSWER_BUFFER_DIRTY_KEY, limit) or [])
+
+
+async def reset_redis_connections() -> None:
+    """
+    Closes the running loop's client. Celery tasks call this before their
+    asyncio.run() loop closes; clients of other loops (the API loop, sibling
+    inline tasks) are left alone.
+    """
+    await redis_client.close_current_loop()
+
+
+# -------------------------------------------------
+# ATTEMPT SESSION CACHE
+# -------------------------------------------------
+
+def _attempt_session_key(attempt_id: str) -> str:
+    return f"exam:session:{attempt_id}"
+
+
+async def cache_attempt_session(attempt_id: str, session: dict[str, str], ttl_seconds: int) -> None:
+    key = _attempt_session_key(attempt_id)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        pipe.hset(key, mapping=session)
+        pipe.expire(key, max(1, ttl_seconds))
+        await pipe.execute()
+
+
+async def invalidate_attempt_session(attempt_id: str) -> None:
+    await redis_client.delete(_attempt_session_key(attempt_id))
+
+
+# -------------------------------------------------
+# GRADING COALESCING BUFFER
+# -------------------------------------------------
+
+GRADING_BUFFER_KEY = "exam:grading:pending"
+GRADING_DRAIN_SCHEDULED_KEY = "exam:grading:drain_scheduled"
+
+# ARGV[1] is the drain-flag ttl, followed by attempt ids. Returns 1 when the
+# caller set the flag and must schedule the drain.
+_BUFFER_GRADING_SCRIPT = redis_client.register_script(
+    """
+    for i = 2, #ARGV do
+        redis.call('RPUSH', KEYS[1], ARGV[i])
+    end
+    if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[1]) then
+        return 1
+    end
+    return 0
+    """
+)
+
+# Pops up to ARGV[1] attempt ids and returns {remaining, ids...}. The drain
+# flag is cleared in the same step once the buffer is empty, so a concurrent
+# push either lands in this drain or schedules the next one.
+_DRAIN_GRADING_SCRIPT = redis_client.register_script(
+    """
+    local limit = tonumber(ARGV[1])
+    local items = redis.call('LRANGE', KEYS[1], 0, limit - 1)
+    redis.call('LTRIM', KEYS[1], limit, -1)
+    local remaining = redis.call('LLEN', KEYS[1])
+    if remaining == 0 then
+        redis.call('DEL', KEYS[2])
+    end
+    local out = {remaining}
+    for _, item in ipairs(items) do
+        table.insert(out, item)
+    end
+    return out
+    """
+)
+
+
+async def buffer_grading_attempts(attempt_ids: list[str], flag_ttl_seconds: int = 60) -> bool:
+    """
+    Queues attempts for the next coalesced grading batch. Returns True when
+    no drain is pending yet and the caller has to schedule one.
+    """
+    if not attempt_ids:
+        return False
+    args = [str(max(1, flag_ttl_seconds)), *[str(attempt_id) for attempt_id in attempt_ids]]
+    scheduled = await _BUFFER_GRADING_SCRIPT(keys=[GRADING_BUFFER_KEY, GRADING_DRAIN_SCHEDULED_KEY], args=args)
+    return bool(scheduled)
+
+
+async def drain_grading_attempts(limit: int) -> tuple[list[str], int]:
+    """Pops up to ``limit`` buffered attempt ids; returns them with the number still waiting."""
+    result = await _DRAIN_GRADING_SCRIPT(
+        keys=[GRADING_BUFFER_KEY, GRADING_DRAIN_SCHEDULED_KEY],
+        args=[max(1, limit)],
+    )
+    remaining, *attempt_ids = result or [0]
+    return [str(attempt_id) for attempt_id in attempt_ids], int(remaining)
+
+
+# -------------------------------------------------
+# GRADING PROGRESS
+# -------------------------------------------------
+
+GRADING_PROGRESS_TTL_SECONDS = 24 * 3600
+
+
+def _grading_progress_key(attempt_id: str) -> str:
+    return f"exam:grading:{attempt_id}"
+
+
+async def set_grading_progress(attempt_id: str, stage: str, **fields: str) -> None:
+    key = _grading_progress_key(attempt_id)
+    mapping = {"stage": stage, "updated_at": str(int(time.time())), **fields}
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, GRADING_PROGRESS_TTL_SECONDS)
+        await pipe.execute()
+
+
+async def get_grading_progress(attempt_id: str) -> dict[str, str]:
+    return dict(await redis_client.hgetall(_grading_progress_key(attempt_id)) or {})
+
+
+# -------------------------------------------------
+# OPERATIONAL METRICS (cross-process counters)
+# -------------------------------------------------
+
+def _metrics_key(group: str) -> str:
+    return f"metrics:{group}"
+
+
+async def record_metrics(group: str, **counters: int | float) -> None:
+    """Adds to shared counters so API and worker processes report one total."""
+    if not counters:
+        return
+    key = _metrics_key(group)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for name, value in counters.items():
+            if isinstance(value, float):
+                pipe.hincrbyfloat(key, name, value)
+            else:
+                pipe.hincrby(key, name, int(value))
+        await pipe.execute()
+
+
+async def get_metrics(group: str) -> dict[str, float]:
+    raw = await redis_client.hgetall(_metrics_key(group)) or {}
+    return {name: float(value) for name, value in raw.items()}
+
+
+# -------------------------------------------------
+# EXAM ADMISSION (per-quiz token bucket + FIFO queue)
+# -------------------------------------------------
+
+# KEYS: bucket hash, waiting zset (score = arrival), seen zset (score = last poll)
+# ARGV: now_ms, refill rate per second, burst, ticket, ticket ttl seconds
+# A ticket is admitted when it is new and nobody is waiting, or when its
+# position in the waiting set is within the tokens currently available, so
+# queued students are let in first-come first-served. Waiters that stop
+# polling fall out after the ticket ttl.
+_ADMISSION_SCRIPT = redis_client.register_script(
+    """
+    local now = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local burst = tonumber(ARGV[3])
+    local ticket = ARGV[4]
+    local ticket_ttl = tonumber(ARGV[5])
+
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or burst
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate / 1000)
+
+    local stale = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now - ticket_ttl * 1000)
+    for _, member in ipairs(stale) do
+        redis.call('ZREM', KEYS[2], member)
+        redis.call('ZREM', KEYS[3], member)
+    end
+
+    local admitted = 0
+    local position = 0
+    local rank = redis.call('ZRANK', KEYS[2], ticket)
+    if rank then
+        if rank < math.floor(tokens) then
+            tokens = tokens - 1
+            redis.call('ZREM', KEYS[2], ticket)
+            redis.call('ZREM', KEYS[3], ticket)
+            admitted = 1
+        else
+            redis.call('ZADD', KEYS[3], now, ticket)
+            position = rank + 1
+        end
+    elseif redis.call('ZCARD', KEYS[2]) == 0 and tokens >= 1 then
+        tokens = tokens - 1
+        admitted = 1
+    else
+        redis.call('ZADD', KEYS[2], now, ticket)
+        redis.call('ZADD', KEYS[3], now, ticket)
+        position = redis.call('ZCARD', KEYS[2])
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+    local idle_ttl = math.ceil(burst / math.max(rate, 0.001)) + ticket_ttl
+    for i = 1, 3 do
+        redis.call('EXPIRE', KEYS[i], idle_ttl)
+    end
+    return {admitted, position}
+    """
+)
+
+
+async def acquire_exam_admission(
+    quiz_id: str,
+    ticket: str,
+    *,
+    now_ms: int,
+    rate_per_second: float,
+    burst: int,
+    ticket_ttl_seconds: int,
+) -> tuple[bool, int]:
+    admitted, position = await _ADMISSION_SCRIPT(
+        keys=[
+            f"exam:admission:bucket:{quiz_id}",
+            f"exam:admission:queue:{quiz_id}",
+            f"exam:admission:seen:{quiz_id}",
+        ],
+        args=[now_ms, rate_per_second, burst, ticket, ticket_ttl_seconds],
+    )
+    return bool(admitted), int(position or 0)
+
+
+# -------------------------------------------------
+# LLM CONCURRENCY GOVERNOR (leased slots + priority queue)
+# -------------------------------------------------
+
+LLM_SLOTS_KEY = "llm:governor:slots"
+LLM_WAITING_KEY = "llm:governor:waiting"
+LLM_SEEN_KEY = "llm:governor:seen"
+LLM_BACKOFF_KEY = "llm:governor:backoff_until"
+
+# KEYS: slots zset (score = lease expiry), waiting zset (score = priority
+#       order), seen zset (score = last poll), backoff key
+# ARGV: now_ms, slot limit, lease ms, token, queue score, waiter ttl ms
+# A caller gets a slot when no provider backoff is active and its rank in
+# the waiting set is within the free slots, so higher priority classes are
+# served first and FIFO within a class. Returns {acquired, backoff ms}.
+_ACQUIRE_LLM_SLOT_SCRIPT = redis_client.register_script(
+    """
+    local now = tonumber(ARGV[1])
+    local limit = tonumber(ARGV[2])
+    local lease = tonumber(ARGV[3])
+    local token = ARGV[4]
+    local score = tonumber(ARGV[5])
+    local waiter_ttl = tonumber(ARGV[6])
+
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+    local stale = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now - waiter_ttl)
+    for _, member in ipairs(stale) do
+        redis.call('ZREM', KEYS[2], member)
+        redis.call('ZREM', KEYS[3], member)
+    end
+    redis.call('ZADD', KEYS[2], 'NX', score, token)
+    redis.call('ZADD', KEYS[3], now, token)
+
+    local backoff_until = tonumber(redis.call('GET', KEYS[4]) or '0')
+    if backoff_until > now then
+        return {0, backoff_until - now}
+    end
+
+    local free = limit - redis.call('ZCARD', KEYS[1])
+    local rank = redis.call('ZRANK', KEYS[2], token)
+    if free <= 0 or not rank or rank >= free then
+        return {0, 0}
+    end
+    redis.call('ZREM', KEYS[2], token)
+    redis.call('ZREM', KEYS[3], token)
+    redis.call('ZADD', KEYS[1], now + lease, token)
+    return {1, 0}
+    """
+)
+
+# Only ever extends an active backoff.
+_LLM_BACKOFF_SCRIPT = redis_client.register_script(
+    """
+    local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local until_ms = tonumber(ARGV[1])
+    if until_ms > current then
+        redis.call('SET', KEYS[1], ARGV[1], 'PX', math.max(1, until_ms - tonumber(ARGV[2])))
+    end
+    return 1
+    """
+)
+
+
+async def acquire_llm_slot(
+    token: str,
+    *,
+    now_ms: int,
+    limit: int,
+    lease_ms: int,
+    queue_score: int,
+    waiter_ttl_ms: int,
+) -> tuple[bool, int]:
+    acquired, backoff_ms = await _ACQUIRE_LLM_SLOT_SCRIPT(
+        keys=[LLM_SLOTS_KEY, LLM_WAITING_KEY, LLM_SEEN_KEY, LLM_BACKOFF_KEY],
+        args=[now_ms, limit, lease_ms, token, queue_score, waiter_ttl_ms],
+    )
+    return bool(acquired), int(backoff_ms or 0)
+
+
+async def release_llm_slot(token: str) -> None:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.zrem(LLM_SLOTS_KEY, token)
+        pipe.zrem(LLM_WAITING_KEY, token)
+        pipe.zrem(LLM_SEEN_KEY, token)
+        await pipe.execute()
+
+
+async def set_llm_backoff(until_ms: int, now_ms: int) -> None:
+    await _LLM_BACKOFF_SCRIPT(keys=[LLM_BACKOFF_KEY], args=[until_ms, now_ms])
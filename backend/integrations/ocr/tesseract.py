@@ -22,11 +22,11 @@ def ensure_configured():
         _configured = True
 
 
-def extract_text_from_image(image_path: str) -> str:
+def extract_text_from_pil_image(image: Image.Image) -> str:
     ensure_configured()
+    return pytesseract.image_to_string(image).strip()
 
-    image = Image.open(image_path)
-    text = pytesseract.image_to_string(image)
-    image.close()
 
-    return text.strip()
+def extract_text_from_image(image_path: str) -> str:
+    with Image.open(image_path) as image:
+        return extract_text_from_pil_image(image)
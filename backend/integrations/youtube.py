@@ -212,6 +212,7 @@ async def summarize_chunks_full_video(segments: list[dict]) -> str:
         Combined study guide as a single string (≤ DIRECT_MAX_CHARS).
     """
     from backend.core.llm import get_llm
+    from backend.core.llm_governor import llm_slot
 
     llm = get_llm()
 
@@ -260,7 +261,8 @@ TRANSCRIPT SEGMENT:
 Return only the study notes, no preamble."""
 
         try:
-            response = await llm.ainvoke(prompt)
+            async with llm_slot():
+                response = await llm.ainvoke(prompt)
             content = response.content if hasattr(response, "content") else str(response)
             return f"### Part {chunk_index + 1} (min {minutes_start}–{minutes_end})\n{content.strip()}"
         except Exception as exc:
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import asynccontextmanager, suppress
 import logging
 from pathlib import Path
 import sys
@@ -11,6 +12,7 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.sessions import SessionMiddleware
 
 from backend.core.config import settings
+from backend.core.database import SessionLocal
 from backend.core.security import ensure_password_backend_available
 from backend.api.auth import router as auth_router
 from backend.api.quizzes import router as quiz_router
@@ -31,6 +33,8 @@ from backend.api.ai_quiz import router as ai_quiz_router
 from backend.api.feedback import router as feedback_router
 from backend.api.notifications import router as notifications_router
 from backend.api.google_auth import router as google_auth_router
+from backend.services.answer_buffer import run_answer_flush_loop
+from backend.services.attempt_expiry import run_expiry_sweep_loop
 
 # psycopg async mode is incompatible with ProactorEventLoop on Windows.
 # Set Selector policy before any event loop is created.
@@ -58,12 +62,30 @@ def _local_dev_origin_regex() -> str:
     return r"^https?://(localhost|127\.0\.0\.1|\[::1\])(?::\d+)?$"
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    background_tasks: list[asyncio.Task] = []
+    if not settings.USE_CELERY:
+        # Without a Celery beat the periodic exam jobs run inside the API process.
+        background_tasks.append(asyncio.create_task(run_answer_flush_loop(SessionLocal)))
+        background_tasks.append(asyncio.create_task(run_expiry_sweep_loop(SessionLocal)))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        for task in background_tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+
+
 def create_app() -> FastAPI:
     ensure_password_backend_available()
 
     app = FastAPI(
         title="Quizzer API",
         version="1.0.0",
+        lifespan=_lifespan,
         docs_url="/docs" if settings.API_DOCS_ENABLED else None,
         redoc_url="/redoc" if settings.API_DOCS_ENABLED else None,
         openapi_url="/openapi.json" if settings.OPENAPI_ENABLED else None,
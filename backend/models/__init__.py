@@ -5,6 +5,9 @@ from backend.models.quiz import Quiz
 from backend.models.quiz_section import QuizSection
 from backend.models.question import Question
 from backend.models.document import Document
+from backend.models.document_chunk import DocumentChunk
+from backend.models.extraction_cache import ExtractionCacheEntry
+from backend.models.compiled_paper import CompiledPaper
 from backend.models.attempt import Attempt
 from backend.models.answer import Answer
 from backend.models.violation import Violation
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, ForeignKey, JSON
+from sqlalchemy import String, ForeignKey, Index, JSON, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 from backend.core.database import Base
@@ -8,6 +8,15 @@ from backend.models.base import UUIDMixin, TimestampMixin
 
 class AIJob(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "ai_jobs"
+    __table_args__ = (
+        # At most one queued or running regrade per quiz.
+        Index(
+            "uq_ai_jobs_active_regrade_quiz_id",
+            "quiz_id",
+            unique=True,
+            postgresql_where=text("job_type = 'RESULT_REGRADE' AND status IN ('PENDING', 'PROCESSING')"),
+        ),
+    )
 
     quiz_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import ForeignKey,String
+from sqlalchemy import ForeignKey,Integer,String,UniqueConstraint,text
 from sqlalchemy.orm import Mapped,mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 from backend.core.database import Base
@@ -7,6 +7,9 @@ from backend.models.base import UUIDMixin,TimestampMixin
 
 class Answer(Base,UUIDMixin,TimestampMixin):
     __tablename__="answers"
+    __table_args__=(
+        UniqueConstraint("attempt_id","question_id",name="uq_answers_attempt_id_question_id"),
+    )
 
     attempt_id:Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -20,4 +23,8 @@ class Answer(Base,UUIDMixin,TimestampMixin):
 
     answer_text:Mapped[str] = mapped_column(String)
 
+    # Highest client sequence flushed from the write-behind buffer; a flush
+    # carrying an older sequence never overwrites the row.
+    client_seq:Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"), nullable=False)
+
 
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, ForeignKey, DateTime, Integer, UniqueConstraint, JSON
+from sqlalchemy import String, ForeignKey, DateTime, Index, Integer, UniqueConstraint, JSON, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from backend.core.database import Base
@@ -11,6 +11,12 @@ class Attempt(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "attempts"
     __table_args__ = (
         UniqueConstraint("quiz_id", "enrollment_number", name="uq_attempts_quiz_enrollment_number"),
+        # Expiry sweeper fallback scan over live attempts only.
+        Index(
+            "ix_attempts_unsubmitted_created_at",
+            "created_at",
+            postgresql_where=text("submitted_at IS NULL"),
+        ),
     )
 
     quiz_id: Mapped[uuid.UUID] = mapped_column(
@@ -44,6 +50,13 @@ class Attempt(Base, UUIDMixin, TimestampMixin):
         JSON,
         nullable=True,
     )
+    # Compiled paper version; new attempts reference it instead of a per-row snapshot.
+    paper_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("compiled_papers.id"),
+        nullable=True,
+        index=True,
+    )
 
     submitted_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
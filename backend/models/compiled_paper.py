@@ -0,0 +1,41 @@
+import uuid
+from sqlalchemy import Boolean, ForeignKey, Index, JSON, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from backend.core.database import Base
+from backend.models.base import UUIDMixin, TimestampMixin
+
+
+class CompiledPaper(Base, UUIDMixin, TimestampMixin):
+    """
+    Immutable exam paper built when a quiz is published. The row id is the
+    paper version that attempts reference instead of copying the snapshot.
+    """
+
+    __tablename__ = "compiled_papers"
+    __table_args__ = (
+        # At most one active paper per quiz, so concurrent compiles converge.
+        Index(
+            "uq_compiled_papers_active_quiz_id",
+            "quiz_id",
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+    )
+
+    quiz_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("quizzes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Same shape as the legacy Attempt.questions_snapshot payload.
+    questions: Mapped[list] = mapped_column(JSON, nullable=False)
+
+    # require_fullscreen, violation_limit and the normalized verification schema.
+    runtime_settings: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
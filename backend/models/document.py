@@ -20,6 +20,9 @@ class Document(Base, UUIDMixin, TimestampMixin):
 
     storage_path: Mapped[str] = mapped_column(String(500))
 
+    # SHA-256 of the uploaded bytes; keys the shared extraction cache.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+
     extraction_status: Mapped[str] = mapped_column(String(100), default="PENDING")
     # PENDING | PROCESSING | COMPLETED | FAILED
 
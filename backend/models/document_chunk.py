@@ -0,0 +1,34 @@
+import uuid
+from sqlalchemy import ForeignKey, Integer, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from backend.core.database import Base
+from backend.models.base import UUIDMixin, TimestampMixin
+
+
+class DocumentChunk(Base, UUIDMixin, TimestampMixin):
+    """
+    A slice of a document's extracted text. Chunks of one document, in
+    ordinal order, concatenate back to the full text.
+    """
+
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        UniqueConstraint("document_id", "ordinal", name="uq_document_chunks_document_id_ordinal"),
+    )
+
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    ordinal: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # Offsets of this chunk in the full extracted text.
+    char_start: Mapped[int] = mapped_column(Integer, nullable=False)
+    char_end: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Whitespace-delimited tokens in the chunk.
+    token_count: Mapped[int] = mapped_column(Integer, nullable=False)
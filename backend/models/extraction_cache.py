@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.core.database import Base
+from backend.models.base import UUIDMixin, TimestampMixin
+
+
+EXTRACTION_CACHE_UNIQUE_CONSTRAINT = "uq_extraction_cache_hash_version_type"
+
+
+class ExtractionCacheEntry(Base, UUIDMixin, TimestampMixin):
+    """
+    Text extracted from one file content, shared by every Document uploaded
+    with the same bytes. The text itself lives in the on-disk blob store.
+    """
+
+    __tablename__ = "extraction_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "content_hash",
+            "extractor_version",
+            "file_type",
+            name=EXTRACTION_CACHE_UNIQUE_CONSTRAINT,
+        ),
+    )
+
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    extractor_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    file_type: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    blob_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    blob_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    text_length: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
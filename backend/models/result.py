@@ -18,6 +18,10 @@ class Result(Base, UUIDMixin, TimestampMixin):
 
     final_score: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    # Score before the violation penalty. Regrades shift this and re-derive
+    # final_score, since final_score is clamped at zero. NULL on legacy rows.
+    raw_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     violation_count: Mapped[int] = mapped_column(Integer, default=0)
 
     integrity_flag: Mapped[bool] = mapped_column(Boolean, default=False)
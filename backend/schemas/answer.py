@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 from typing import Optional
 
@@ -11,3 +11,19 @@ class SaveAnswerRequest(BaseModel):
 class SaveAnswerResponse(BaseModel):
     message: str
     question_id: UUID
+
+
+class BatchAnswerItem(BaseModel):
+    question_id: UUID
+    answer_text: str
+    client_seq: int = Field(default=0, ge=0)
+
+
+class BatchSaveAnswerRequest(BaseModel):
+    answers: list[BatchAnswerItem] = Field(default_factory=list)
+
+
+class BatchSaveAnswerResponse(BaseModel):
+    message: str
+    accepted: list[UUID]
+    stale: list[UUID]
@@ -8,6 +8,7 @@ from backend.services.verification import VerificationSchema
 
 class StartAttemptRequest(BaseModel):
     verification_context: str | None = None
+    admission_ticket: str | None = Field(default=None, max_length=64)
     verification_data: dict[str, Any] = Field(default_factory=dict)
 
     student_name: str | None = None
@@ -43,6 +44,7 @@ class StartAttemptRequest(BaseModel):
 class StartPublicAttemptRequest(BaseModel):
     public_exam_id: str
     verification_context: str | None = None
+    admission_ticket: str | None = Field(default=None, max_length=64)
     verification_data: dict[str, Any] = Field(default_factory=dict)
 
     student_name: str | None = None
@@ -102,6 +104,14 @@ class StartAttemptResponse(BaseModel):
     end_time: datetime
 
 
+class AdmissionQueuedResponse(BaseModel):
+    status: str = "QUEUED"
+    admission_ticket: str
+    queue_position: int
+    retry_after_seconds: int
+
+
 class SubmitAttemptResponse(BaseModel):
     message: str
     submitted_at: datetime
+    grading_status: str | None = None
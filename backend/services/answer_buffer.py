@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import uuid
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core.config import settings
+from backend.core.redis import (
+    clear_flushed_answers,
+    get_buffered_answers,
+    list_dirty_answer_buffers,
+    seal_answer_buffer,
+)
+from backend.models.answer import Answer
+
+
+logger = logging.getLogger(__name__)
+
+ANSWER_UNIQUE_CONSTRAINT = "uq_answers_attempt_id_question_id"
+
+
+def decode_buffered_answers(raw_entries: dict[str, str]) -> list[dict]:
+    rows: list[dict] = []
+    for question_id, raw_payload in raw_entries.items():
+        try:
+            payload = json.loads(raw_payload)
+            rows.append(
+                {
+                    "question_id": uuid.UUID(str(question_id)),
+                    "answer_text": str(payload.get("answer_text") or ""),
+                    "client_seq": int(payload.get("client_seq") or 0),
+                }
+            )
+        except (ValueError, TypeError, AttributeError):
+            logger.warning("Dropping malformed buffered answer for question %s", question_id)
+    return rows
+
+
+async def flush_attempt_answers(db: AsyncSession, attempt_id: str, *, seal: bool = False) -> int:
+    """
+    Writes every buffered answer of one attempt with a single
+    INSERT ... ON CONFLICT and clears the flushed entries from Redis.
+    ``seal=True`` is the final flush of a submitted attempt: the buffer is
+    closed first so no later batch save can slip in after it.
+    """
+    if seal:
+        await seal_answer_buffer(attempt_id)
+    raw_entries = await get_buffered_answers(attempt_id)
+    if not raw_entries:
+        return 0
+
+    rows = decode_buffered_answers(raw_entries)
+    if rows:
+        attempt_uuid = uuid.UUID(str(attempt_id))
+        stmt = insert(Answer).values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "attempt_id": attempt_uuid,
+                    "question_id": row["question_id"],
+                    "answer_text": row["answer_text"],
+                    "client_seq": row["client_seq"],
+                }
+                for row in rows
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint=ANSWER_UNIQUE_CONSTRAINT,
+            set_={
+                "answer_text": stmt.excluded.answer_text,
+                "client_seq": stmt.excluded.client_seq,
+                "updated_at": func.now(),
+            },
+            # A flush that read the buffer earlier but commits later must not
+            # replace a newer answer (same rule as the buffer script).
+            where=Answer.client_seq <= stmt.excluded.client_seq,
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    await clear_flushed_answers(attempt_id, raw_entries)
+    return len(rows)
+
+
+async def flush_dirty_answer_buffers(
+    session_factory: async_sessionmaker[AsyncSession],
+    limit: int = 500,
+) -> int:
+    """Flushes every attempt currently marked dirty; returns the number of rows written."""
+    flushed = 0
+    for attempt_id in await list_dirty_answer_buffers(limit):
+        try:
+            async with session_factory() as db:
+                flushed += await flush_attempt_answers(db, attempt_id)
+        except Exception:
+            logger.exception("Answer buffer flush failed for attempt %s", attempt_id)
+    return flushed
+
+
+async def run_answer_flush_loop(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """In-process flusher used when no Celery beat is running (USE_CELERY=false)."""
+    interval = max(1, settings.ANSWER_FLUSH_INTERVAL_SECONDS)
+    while True:
+        try:
+            await flush_dirty_answer_buffers(session_factory)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Answer flush loop iteration failed")
+        await asyncio.sleep(interval)
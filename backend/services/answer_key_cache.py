@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.redis import redis_client, release_lock
+from backend.models.question import Question
+from backend.services.question_quality import normalize_math_text
+
+
+logger = logging.getLogger(__name__)
+
+ANSWER_KEY_CACHE_TTL_SECONDS = 30 * 24 * 3600
+# Failed generations are only remembered long enough for the graders waiting
+# on the same lock to pick them up; the next attempt after that retries.
+ANSWER_KEY_NEGATIVE_TTL_SECONDS = 30
+ANSWER_KEY_LOCK_SECONDS = 120
+ANSWER_KEY_POLL_SECONDS = 0.2
+
+GenerateAnswerKeys = Callable[[list[dict]], Awaitable[list[str | None]]]
+
+
+def _is_missing(value: object) -> bool:
+    token = str(value or "").strip().lower()
+    return token in {"", "answer_unavailable", "null", "none"}
+
+
+def generated_answer_key(quiz_id: object, question_id: str, question_text: str) -> str:
+    text_hash = hashlib.sha256(normalize_math_text(question_text).encode("utf-8")).hexdigest()[:16]
+    return f"grading:answer_key:{quiz_id}:{question_id}:{text_hash}"
+
+
+async def _read_cached(keys: list[str]) -> list[dict | None]:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.get(key)
+        raw_values = await pipe.execute()
+    return [json.loads(raw) if raw else None for raw in raw_values]
+
+
+async def _acquire(keys: list[str], token: str) -> list[bool]:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.set(f"{key}:lock", token, nx=True, ex=ANSWER_KEY_LOCK_SECONDS)
+        return [bool(acquired) for acquired in await pipe.execute()]
+
+
+async def _store(keys: list[str], answers: list[str | None]) -> None:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, answer in zip(keys, answers):
+            ttl_seconds = ANSWER_KEY_NEGATIVE_TTL_SECONDS if _is_missing(answer) else ANSWER_KEY_CACHE_TTL_SECONDS
+            pipe.set(key, json.dumps({"correct_answer": answer}), ex=ttl_seconds)
+        await pipe.execute()
+
+
+async def _generate(candidates: list[dict], generate: GenerateAnswerKeys) -> list[str | None]:
+    prompt_items = [{k: v for k, v in candidate.items() if k != "question_id"} for candidate in candidates]
+    answers = list(await generate(prompt_items))
+    answers += [None] * (len(candidates) - len(answers))
+    return [None if _is_missing(answer) else str(answer).strip() for answer in answers[: len(candidates)]]
+
+
+async def suggest_answer_keys(db: AsyncSession, quiz_id: object, answers: dict[str, str]) -> None:
+    """
+    Writes generated keys back to questions that still have none. Question
+    status is left alone: demoting questions of a published quiz to DRAFT
+    would silently drop them from the next compiled paper. The caller
+    commits.
+    """
+    for question_id, answer in answers.items():
+        try:
+            question_uuid = uuid.UUID(str(question_id))
+        except ValueError:
+            continue
+        await db.execute(
+            update(Question)
+            .where(
+                Question.id == question_uuid,
+                Question.quiz_id == uuid.UUID(str(quiz_id)),
+                or_(Question.correct_answer.is_(None), Question.correct_answer.in_(["", "answer_unavailable"])),
+            )
+            .values(correct_answer=answer)
+        )
+
+
+async def resolve_answer_keys(
+    quiz_id: object,
+    candidates: list[dict],
+    generate: GenerateAnswerKeys,
+    db: AsyncSession | None = None,
+) -> list[str | None]:
+    """
+    Returns a generated answer key (or None when the model could not produce
+    one) for each candidate. Keys are shared by every attempt of the quiz:
+    one grader takes a per-question lock and generates while concurrent
+    graders wait for its result, so a missing key costs one LLM call and
+    every student is graded against the same key. Falls back to generating
+    directly when Redis is unavailable.
+    """
+    if not candidates:
+        return []
+    if quiz_id is None:
+        return await _generate(candidates, generate)
+
+    keys = [generated_answer_key(quiz_id, c["question_id"], c["question_text"]) for c in candidates]
+    answers: list[str | None] = [None] * len(candidates)
+    pending = list(range(len(candidates)))
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + ANSWER_KEY_LOCK_SECONDS
+
+    try:
+        while pending:
+            cached = await _read_cached([keys[i] for i in pending])
+            waiting = []
+            for index, entry in zip(pending, cached):
+                if entry is None:
+                    waiting.append(index)
+                else:
+                    answers[index] = entry.get("correct_answer")
+            pending = waiting
+            if not pending:
+                break
+
+            acquired = await _acquire([keys[i] for i in pending], token)
+            owned = [index for index, ok in zip(pending, acquired) if ok]
+            if owned:
+                try:
+                    generated = await _generate([candidates[i] for i in owned], generate)
+                    for index, answer in zip(owned, generated):
+                        answers[index] = answer
+                    pending = [index for index in pending if index not in owned]
+                    if db is not None and settings.ANSWER_KEY_WRITE_BACK:
+                        await suggest_answer_keys(
+                            db,
+                            quiz_id,
+                            {candidates[i]["question_id"]: answers[i] for i in owned if answers[i] is not None},
+                        )
+                    await _store([keys[i] for i in owned], generated)
+                finally:
+                    for index in owned:
+                        await release_lock(f"{keys[index]}:lock", token)
+                continue
+
+            if time.monotonic() > deadline:
+                logger.warning("Timed out waiting for answer keys of quiz %s; generating locally", quiz_id)
+                break
+            await asyncio.sleep(ANSWER_KEY_POLL_SECONDS)
+    except RedisError:
+        logger.warning("Answer key cache unavailable; generating without it", exc_info=True)
+
+    if pending:
+        generated = await _generate([candidates[i] for i in pending], generate)
+        for index, answer in zip(pending, generated):
+            answers[index] = answer
+    return answers
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core.config import settings
+from backend.core.redis import claim_expired_attempts
+from backend.models.attempt import Attempt
+from backend.models.quiz import Quiz
+from backend.services.answer_buffer import flush_attempt_answers
+from backend.services.attempt_session import forget_attempt_session
+from backend.services.task_dispatcher import dispatch_result_tasks
+
+
+logger = logging.getLogger(__name__)
+
+# Attempts are only swept after this many seconds past their deadline, so a
+# submit racing the timer still wins.
+EXPIRY_GRACE_SECONDS = 30
+
+
+async def expire_attempts(db: AsyncSession, attempt_ids: list[str]) -> list[str]:
+    """
+    Stamps ``submitted_at`` on every attempt in ``attempt_ids`` that has not
+    been submitted yet, in one UPDATE. Returns the ids actually stamped, which
+    are the only ones that still need grading.
+    """
+    if not attempt_ids:
+        return []
+
+    result = await db.execute(
+        update(Attempt)
+        .where(
+            Attempt.id.in_([uuid.UUID(str(attempt_id)) for attempt_id in attempt_ids]),
+            Attempt.submitted_at.is_(None),
+        )
+        .values(submitted_at=datetime.now(timezone.utc), status="SUBMITTED")
+        .returning(Attempt.id)
+    )
+    stamped = [str(attempt_id) for attempt_id in result.scalars().all()]
+    await db.commit()
+
+    for attempt_id in stamped:
+        await forget_attempt_session(attempt_id)
+        # Batched saves are write-behind; drain them so grading sees every answer.
+        try:
+            await flush_attempt_answers(db, attempt_id, seal=True)
+        except Exception:
+            logger.exception("Answer flush failed for expired attempt %s", attempt_id)
+            await db.rollback()
+    return stamped
+
+
+async def find_overdue_attempt_ids(db: AsyncSession, limit: int) -> list[str]:
+    """
+    Safety net for attempts missing from the Redis deadline index (started
+    before the index existed, or lost with a Redis restart).
+    """
+    duration = func.make_interval(0, 0, 0, 0, 0, func.greatest(func.coalesce(Quiz.duration_minutes, 60), 5))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=EXPIRY_GRACE_SECONDS)
+    result = await db.execute(
+        select(Attempt.id)
+        .join(Quiz, Quiz.id == Attempt.quiz_id)
+        .where(
+            Attempt.submitted_at.is_(None),
+            Attempt.created_at + duration < cutoff,
+        )
+        .order_by(Attempt.created_at.asc())
+        .limit(limit)
+    )
+    return [str(attempt_id) for attempt_id in result.scalars().all()]
+
+
+async def sweep_expired_attempts(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    """
+    Auto-submits timed-out attempts in batches and queues them for grading.
+    Returns the number of attempts submitted.
+    """
+    batch_size = max(1, settings.EXAM_EXPIRY_SWEEP_BATCH_SIZE)
+    swept = 0
+
+    while True:
+        claimed = await claim_expired_attempts(time.time() - EXPIRY_GRACE_SECONDS, batch_size)
+        if not claimed:
+            break
+        async with session_factory() as db:
+            stamped = await expire_attempts(db, claimed)
+        await dispatch_result_tasks(stamped, priority=settings.GRADING_BACKLOG_PRIORITY)
+        swept += len(stamped)
+        if len(claimed) < batch_size:
+            break
+
+    async with session_factory() as db:
+        overdue = await find_overdue_attempt_ids(db, batch_size)
+        stamped = await expire_attempts(db, overdue)
+    await dispatch_result_tasks(stamped, priority=settings.GRADING_BACKLOG_PRIORITY)
+    swept += len(stamped)
+
+    if swept:
+        logger.info("Expiry sweep auto-submitted %s attempts", swept)
+    return swept
+
+
+async def run_expiry_sweep_loop(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """In-process sweeper used when no Celery beat is running (USE_CELERY=false)."""
+    interval = max(5, settings.EXAM_EXPIRY_SWEEP_INTERVAL_SECONDS)
+    while True:
+        try:
+            await sweep_expired_attempts(session_factory)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Expiry sweep iteration failed")
+        await asyncio.sleep(interval)
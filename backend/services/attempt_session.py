@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import uuid
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.exam_state import read_exam_state
+from backend.core.redis import (
+    cache_attempt_session,
+    clear_exam_deadline,
+    invalidate_attempt_session,
+    set_heartbeat,
+)
+from backend.models.attempt import Attempt
+from backend.models.question import Question
+from backend.services.compiled_paper import resolve_attempt_questions
+
+
+# Sessions outlive the exam timer briefly so late submits still hit the cache.
+SESSION_GRACE_SECONDS = 300
+EXPIRED_SESSION_TTL_SECONDS = 300
+
+
+@dataclass
+class AttemptSession:
+    attempt_id: str
+    quiz_id: str
+    status: str
+    submitted: bool
+    question_ids: set[str] = field(default_factory=set)
+    remaining_time: int = 0
+    violation_count: int = 0
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining_time <= 0
+
+
+def hash_attempt_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _snapshot_question_ids(snapshot: list | None) -> list[str]:
+    return [str(question.get("id")) for question in snapshot or [] if isinstance(question, dict) and question.get("id")]
+
+
+async def remember_attempt_session(
+    attempt: Attempt,
+    *,
+    ttl_seconds: int,
+    question_ids: list[str] | None = None,
+) -> None:
+    ids = question_ids if question_ids is not None else _snapshot_question_ids(attempt.questions_snapshot)
+    await cache_attempt_session(
+        str(attempt.id),
+        {
+            "token_hash": hash_attempt_token(attempt.attempt_token),
+            "quiz_id": str(attempt.quiz_id),
+            "status": str(attempt.status or "IN_PROGRESS"),
+            "submitted": "1" if attempt.submitted_at else "0",
+            "question_ids": json.dumps(ids),
+        },
+        ttl_seconds,
+    )
+
+
+async def forget_attempt_session(attempt_id: str) -> None:
+    await invalidate_attempt_session(attempt_id)
+    await clear_exam_deadline(attempt_id)
+
+
+def _validate_token_hash(expected_hash: str | None, provided_token: str | None) -> None:
+    if not provided_token or not expected_hash or not hmac.compare_digest(expected_hash, hash_attempt_token(provided_token)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid attempt token",
+        )
+
+
+async def _load_from_database(db: AsyncSession, attempt_id: uuid.UUID, provided_token: str | None) -> tuple[Attempt, list[str]]:
+    result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
+    attempt = result.scalar_one_or_none()
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+
+    _validate_token_hash(hash_attempt_token(attempt.attempt_token), provided_token)
+
+    question_ids = _snapshot_question_ids(await resolve_attempt_questions(db, attempt))
+    if not question_ids:
+        # Legacy attempts created before snapshots existed.
+        questions_result = await db.execute(select(Question.id).where(Question.quiz_id == attempt.quiz_id))
+        question_ids = [str(question_id) for question_id in questions_result.scalars().all()]
+    return attempt, question_ids
+
+
+async def load_attempt_session(
+    db: AsyncSession,
+    attempt_id: uuid.UUID,
+    provided_token: str | None,
+    *,
+    refresh_heartbeat: bool = False,
+) -> AttemptSession:
+    """
+    Resolves and authenticates an attempt for runtime endpoints.
+
+    Served by one atomic Redis call when the session is cached; otherwise falls
+    back to Postgres and backfills the cache. With ``refresh_heartbeat`` the
+    heartbeat is written only for a live session whose token matches.
+    """
+    state = await read_exam_state(
+        str(attempt_id),
+        token_hash=hash_attempt_token(provided_token) if provided_token else "",
+        refresh_heartbeat=refresh_heartbeat,
+    )
+    cached = state.session
+    remaining_time = state.remaining_time
+
+    if cached:
+        _validate_token_hash(cached.get("token_hash"), provided_token)
+        try:
+            question_ids = set(json.loads(cached.get("question_ids") or "[]"))
+        except json.JSONDecodeError:
+            question_ids = set()
+        return AttemptSession(
+            attempt_id=str(attempt_id),
+            quiz_id=str(cached.get("quiz_id") or ""),
+            status=str(cached.get("status") or "IN_PROGRESS"),
+            submitted=cached.get("submitted") == "1",
+            question_ids=question_ids,
+            remaining_time=remaining_time,
+            violation_count=state.violation_count,
+        )
+
+    attempt, question_ids = await _load_from_database(db, attempt_id, provided_token)
+    session = AttemptSession(
+        attempt_id=str(attempt.id),
+        quiz_id=str(attempt.quiz_id),
+        status=str(attempt.status or "IN_PROGRESS"),
+        submitted=attempt.submitted_at is not None,
+        question_ids=set(question_ids),
+        remaining_time=remaining_time,
+        violation_count=state.violation_count,
+    )
+    if not session.submitted:
+        ttl_seconds = remaining_time + SESSION_GRACE_SECONDS if remaining_time else EXPIRED_SESSION_TTL_SECONDS
+        await remember_attempt_session(attempt, ttl_seconds=ttl_seconds, question_ids=question_ids)
+        if refresh_heartbeat and not session.expired:
+            await set_heartbeat(str(attempt_id))
+    return session
@@ -0,0 +1,433 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.database import SessionLocal
+from backend.core.redis import cache_get_json, cache_set_json, redis_client, release_lock, set_if_generation
+from backend.models.attempt import Attempt
+from backend.models.compiled_paper import CompiledPaper
+from backend.models.question import Question
+from backend.models.quiz import Quiz
+from backend.models.quiz_settings import QuizSettings
+from backend.services.verification import VerificationSchema, normalize_verification_schema
+
+
+logger = logging.getLogger(__name__)
+
+PAPER_CACHE_TTL_SECONDS = 24 * 3600
+PAPER_LRU_SIZE = 128
+PAPER_COMPILE_LOCK_SECONDS = 30
+PAPER_COMPILE_POLL_SECONDS = 0.1
+
+
+# --------------------------------------------------
+# Paper inputs (questions + runtime settings)
+# --------------------------------------------------
+
+def load_legacy_runtime_settings(quiz: Quiz) -> dict:
+    raw = quiz.settings_json if isinstance(quiz.settings_json, dict) else {}
+    verification = raw.get("verification") if isinstance(raw.get("verification"), dict) else None
+    return {
+        "require_fullscreen": bool(raw.get("require_fullscreen", True)),
+        "violation_limit": max(1, int(raw.get("violation_limit", 3) or 3)),
+        "verification": normalize_verification_schema(verification, quiz.academic_type),
+    }
+
+
+async def load_runtime_settings(db: AsyncSession, quiz: Quiz) -> dict:
+    defaults = load_legacy_runtime_settings(quiz)
+    try:
+        result = await db.execute(
+            select(QuizSettings).where(
+                QuizSettings.quiz_id == quiz.id,
+                QuizSettings.owner_user_id == quiz.created_by,
+            )
+        )
+        settings_record = result.scalar_one_or_none()
+    except SQLAlchemyError:
+        await db.rollback()
+        return defaults
+
+    if not settings_record:
+        return defaults
+
+    return {
+        "require_fullscreen": settings_record.require_fullscreen,
+        "violation_limit": max(1, int(settings_record.violation_limit or defaults["violation_limit"])),
+        "verification": defaults["verification"],
+    }
+
+
+async def load_paper_questions(db: AsyncSession, quiz_id: uuid.UUID) -> list[Question]:
+    questions_result = await db.execute(
+        select(Question)
+        .where(Question.quiz_id == quiz_id, Question.status == "APPROVED")
+        .order_by(Question.created_at.asc())
+    )
+    return questions_result.scalars().all()
+
+
+def serialize_question_snapshot(questions: list[Question]) -> list[dict]:
+    return [
+        {
+            "id": str(question.id),
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "options": question.options,
+            "marks": int(question.marks or 1),
+            "correct_answer": question.correct_answer,
+        }
+        for question in questions
+    ]
+
+
+def _content_hash(questions: list[dict], runtime_settings: dict) -> str:
+    payload = json.dumps({"questions": questions, "settings": runtime_settings}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------
+# Artifact + in-process LRU
+# --------------------------------------------------
+
+@dataclass(frozen=True)
+class PaperArtifact:
+    paper_id: str
+    quiz_id: str
+    questions: tuple[dict, ...]
+    runtime_settings: dict
+    question_ids: frozenset[str] = field(default_factory=frozenset)
+    verification_schema: VerificationSchema | None = None
+
+    @classmethod
+    def build(cls, paper_id: str, quiz_id: str, questions: list[dict], runtime_settings: dict) -> "PaperArtifact":
+        return cls(
+            paper_id=str(paper_id),
+            quiz_id=str(quiz_id),
+            questions=tuple(questions),
+            runtime_settings=runtime_settings,
+            question_ids=frozenset(str(question.get("id")) for question in questions if question.get("id")),
+            # Validated once per process instead of on every exam start.
+            verification_schema=VerificationSchema.model_validate(runtime_settings["verification"]),
+        )
+
+    def to_cache(self) -> dict:
+        return {
+            "paper_id": self.paper_id,
+            "quiz_id": self.quiz_id,
+            "questions": list(self.questions),
+            "runtime_settings": self.runtime_settings,
+        }
+
+
+class _PaperLRU:
+    """Papers are immutable per version id, so entries never need invalidation."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, PaperArtifact] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, paper_id: str) -> PaperArtifact | None:
+        with self._lock:
+            artifact = self._entries.get(paper_id)
+            if artifact is not None:
+                self._entries.move_to_end(paper_id)
+            return artifact
+
+    def put(self, artifact: PaperArtifact) -> None:
+        with self._lock:
+            self._entries[artifact.paper_id] = artifact
+            self._entries.move_to_end(artifact.paper_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+
+_paper_lru = _PaperLRU(PAPER_LRU_SIZE)
+
+
+def _paper_key(paper_id: str) -> str:
+    return f"exam:paper:{paper_id}"
+
+
+def _current_paper_key(quiz_id: str) -> str:
+    return f"exam:paper:current:{quiz_id}"
+
+
+def _compile_lock_key(quiz_id: str) -> str:
+    return f"exam:paper:compile:{quiz_id}"
+
+
+def _generation_key(quiz_id: str) -> str:
+    # Bumped after every committed change of the active paper; a pointer
+    # derived from reads taken before the bump is never written.
+    return f"exam:paper:generation:{quiz_id}"
+
+
+def _artifact_from_row(row: CompiledPaper) -> PaperArtifact:
+    return PaperArtifact.build(str(row.id), str(row.quiz_id), list(row.questions or []), dict(row.runtime_settings or {}))
+
+
+async def _cache_artifact(artifact: PaperArtifact, *, generation: str | None = None) -> None:
+    """
+    Caches the artifact. With ``generation`` (read before the active row was
+    loaded) it also becomes the current-paper pointer, unless the active
+    paper changed in the meantime.
+    """
+    _paper_lru.put(artifact)
+    await cache_set_json(_paper_key(artifact.paper_id), artifact.to_cache(), PAPER_CACHE_TTL_SECONDS)
+    if generation is not None:
+        await set_if_generation(
+            _current_paper_key(artifact.quiz_id),
+            artifact.paper_id,
+            PAPER_CACHE_TTL_SECONDS,
+            _generation_key(artifact.quiz_id),
+            generation,
+        )
+
+
+async def _read_current_pointer(quiz_id: str) -> tuple[str | None, str]:
+    current_id, generation = await redis_client.mget(_current_paper_key(quiz_id), _generation_key(quiz_id))
+    return current_id, generation or "0"
+
+
+# --------------------------------------------------
+# Build / lookup / invalidate
+# --------------------------------------------------
+
+async def compile_paper(db: AsyncSession, quiz: Quiz) -> CompiledPaper | None:
+    """
+    Builds the paper for ``quiz`` and makes it the active version. Reuses the
+    current active row when nothing changed. At most one row per quiz is
+    active (partial unique index); when a concurrent transaction activated a
+    paper first, that row is returned instead. The caller commits.
+    """
+    questions = serialize_question_snapshot(await load_paper_questions(db, quiz.id))
+    if not questions:
+        return None
+    runtime_settings = await load_runtime_settings(db, quiz)
+    content_hash = _content_hash(questions, runtime_settings)
+
+    active_result = await db.execute(
+        select(CompiledPaper).where(CompiledPaper.quiz_id == quiz.id, CompiledPaper.is_active.is_(True))
+    )
+    active = active_result.scalars().all()
+    for row in active:
+        if row.content_hash == content_hash:
+            return row
+
+    await db.execute(
+        update(CompiledPaper)
+        .where(CompiledPaper.quiz_id == quiz.id, CompiledPaper.is_active.is_(True))
+        .values(is_active=False)
+    )
+    inserted = await db.execute(
+        insert(CompiledPaper)
+        .values(
+            id=uuid.uuid4(),
+            quiz_id=quiz.id,
+            questions=questions,
+            runtime_settings=runtime_settings,
+            content_hash=content_hash,
+            is_active=True,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[CompiledPaper.quiz_id],
+            index_where=text("is_active"),
+        )
+        .returning(CompiledPaper.id)
+    )
+    paper_id = inserted.scalar_one_or_none()
+    if paper_id is not None:
+        return await db.get(CompiledPaper, paper_id)
+    return await _load_active_row(db, quiz.id)
+
+
+async def _load_active_row(db: AsyncSession, quiz_id: uuid.UUID) -> CompiledPaper | None:
+    result = await db.execute(
+        select(CompiledPaper)
+        .where(CompiledPaper.quiz_id == quiz_id, CompiledPaper.is_active.is_(True))
+        .order_by(CompiledPaper.created_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _compile_in_own_transaction(quiz: Quiz, generation: str) -> PaperArtifact | None:
+    async with SessionLocal() as compile_db:
+        row = await _load_active_row(compile_db, quiz.id)
+        if row is None:
+            row = await compile_paper(compile_db, quiz)
+            if row is None:
+                return None
+            await compile_db.commit()
+        artifact = _artifact_from_row(row)
+    await _cache_artifact(artifact, generation=generation)
+    return artifact
+
+
+async def _compile_current_paper(db: AsyncSession, quiz: Quiz, generation: str) -> PaperArtifact | None:
+    """
+    Lazily compiles the paper of a published quiz. One caller per quiz holds
+    a Redis lock and compiles in its own transaction; concurrent exam starts
+    wait for the current-paper pointer instead of compiling again.
+    """
+    quiz_key = str(quiz.id)
+    lock_key = _compile_lock_key(quiz_key)
+    token = uuid.uuid4().hex
+    try:
+        acquired = await redis_client.set(lock_key, token, nx=True, ex=PAPER_COMPILE_LOCK_SECONDS)
+    except RedisError:
+        # The unique active index still prevents duplicate papers.
+        return await _compile_in_own_transaction(quiz, generation)
+
+    if acquired:
+        try:
+            return await _compile_in_own_transaction(quiz, generation)
+        finally:
+            try:
+                await release_lock(lock_key, token)
+            except RedisError:
+                logger.warning("Could not release paper compile lock for quiz %s", quiz_key)
+
+    deadline = time.monotonic() + PAPER_COMPILE_LOCK_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(PAPER_COMPILE_POLL_SECONDS)
+        try:
+            current_id = await redis_client.get(_current_paper_key(quiz_key))
+        except RedisError:
+            break
+        if current_id:
+            artifact = await get_paper(db, current_id)
+            if artifact is not None:
+                return artifact
+    return await _compile_in_own_transaction(quiz, generation)
+
+
+async def warm_paper_cache(paper: CompiledPaper) -> PaperArtifact:
+    """Call after the publishing transaction commits."""
+    artifact = _artifact_from_row(paper)
+    await _cache_artifact(artifact)
+    quiz_key = artifact.quiz_id
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.incr(_generation_key(quiz_key))
+        pipe.set(_current_paper_key(quiz_key), artifact.paper_id, ex=PAPER_CACHE_TTL_SECONDS)
+        await pipe.execute()
+    return artifact
+
+
+async def get_paper(db: AsyncSession, paper_id: uuid.UUID | str) -> PaperArtifact | None:
+    paper_key = str(paper_id)
+    artifact = _paper_lru.get(paper_key)
+    if artifact is not None:
+        return artifact
+
+    cached = await cache_get_json(_paper_key(paper_key))
+    if isinstance(cached, dict) and cached.get("questions"):
+        artifact = PaperArtifact.build(paper_key, cached["quiz_id"], cached["questions"], cached["runtime_settings"])
+        _paper_lru.put(artifact)
+        return artifact
+
+    row = await db.get(CompiledPaper, uuid.UUID(paper_key))
+    if not row:
+        return None
+    artifact = _artifact_from_row(row)
+    await _cache_artifact(artifact)
+    return artifact
+
+
+async def get_current_paper(db: AsyncSession, quiz: Quiz) -> PaperArtifact | None:
+    """
+    Returns the active paper of a published quiz. Papers that are missing
+    (quizzes published before compiled papers existed, or invalidated by a
+    settings change) are compiled lazily, once per quiz. Never commits
+    ``db``.
+    """
+    current_id, generation = await _read_current_pointer(str(quiz.id))
+    if current_id:
+        artifact = await get_paper(db, current_id)
+        if artifact is not None:
+            return artifact
+
+    row = await _load_active_row(db, quiz.id)
+    if row is None:
+        if not quiz.is_published:
+            return None
+        return await _compile_current_paper(db, quiz, generation)
+
+    artifact = _artifact_from_row(row)
+    await _cache_artifact(artifact, generation=generation)
+    return artifact
+
+_RETIRED_PAPERS_INFO_KEY = "compiled_paper.retired_quizzes"
+_unpin_tasks: set[asyncio.Task] = set()
+
+
+async def _unpin_current_papers(quiz_ids: set[str]) -> None:
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for quiz_id in quiz_ids:
+                pipe.incr(_generation_key(quiz_id))
+                pipe.delete(_current_paper_key(quiz_id))
+            await pipe.execute()
+    except RedisError:
+        logger.warning("Could not drop current-paper pointers for quizzes %s", sorted(quiz_ids))
+
+
+def _unpin_retired_papers(session) -> None:
+    quiz_ids = session.info.pop(_RETIRED_PAPERS_INFO_KEY, None)
+    if not quiz_ids:
+        return
+    # after_commit is synchronous; AsyncSession runs it on the event loop thread.
+    task = asyncio.get_running_loop().create_task(_unpin_current_papers(quiz_ids))
+    _unpin_tasks.add(task)
+    task.add_done_callback(_unpin_tasks.discard)
+
+
+def _forget_retired_papers(session) -> None:
+    session.info.pop(_RETIRED_PAPERS_INFO_KEY, None)
+
+
+async def invalidate_quiz_paper(db: AsyncSession, quiz_id: uuid.UUID) -> None:
+    """
+    Retires the active paper so the next publish compiles a new version.
+    Attempts keep their paper_id, so in-flight exams and grading are unaffected.
+    The caller commits; the current-paper pointer is dropped only once that
+    commit lands, so a concurrent exam start cannot re-pin the retired paper.
+    """
+    await db.execute(
+        update(CompiledPaper)
+        .where(CompiledPaper.quiz_id == quiz_id, CompiledPaper.is_active.is_(True))
+        .values(is_active=False)
+    )
+    sync_session = db.sync_session
+    if not event.contains(sync_session, "after_commit", _unpin_retired_papers):
+        event.listen(sync_session, "after_commit", _unpin_retired_papers)
+        event.listen(sync_session, "after_rollback", _forget_retired_papers)
+    db.info.setdefault(_RETIRED_PAPERS_INFO_KEY, set()).add(str(quiz_id))
+
+
+async def resolve_attempt_questions(db: AsyncSession, attempt: Attempt) -> list[dict]:
+    """Question snapshot of an attempt, whether stored inline (legacy) or via its paper."""
+    if attempt.questions_snapshot:
+        return list(attempt.questions_snapshot)
+    if attempt.paper_id:
+        artifact = await get_paper(db, attempt.paper_id)
+        if artifact is not None:
+            return list(artifact.questions)
+        logger.warning("Attempt %s references missing paper %s", attempt.id, attempt.paper_id)
+    return []
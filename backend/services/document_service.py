@@ -1,55 +1,169 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import pdfplumber
 import fitz  # PyMuPDF
 from docx import Document as DocxDocument
 from pptx import Presentation
 from pathlib import Path
+from PIL import Image
+
+from backend.core.config import settings
+from backend.integrations.ocr.tesseract import extract_text_from_image, extract_text_from_pil_image
+
+
+logger = logging.getLogger(__name__)
+
+# Part of the extraction cache key; bump whenever extraction output changes.
+EXTRACTOR_VERSION = "3"
 
-from backend.integrations.ocr.tesseract import extract_text_from_image
+# Ruled tables are drawn as many straight lines/rectangles; PyMuPDF's text
+# layer loses their cell order, so those pages go through pdfplumber.
+TABLE_RULING_THRESHOLD = 8
 
 
 # ----------------------------------------
 # PDF Extraction (Text-based)
 # ----------------------------------------
 
-def extract_pdf_text(path: str) -> str:
-    text_parts = []
+def _page_has_table(page: "fitz.Page") -> bool:
+    rulings = 0
+    for drawing in page.get_drawings():
+        rulings += sum(1 for item in drawing.get("items", ()) if item[0] in ("l", "re"))
+        if rulings >= TABLE_RULING_THRESHOLD:
+            return True
+    return False
 
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
 
-    return "\n".join(text_parts).strip()
+def _extract_pdf_page_range(path: str, start: int, stop: int) -> list[dict]:
+    """Text of pages [start, stop), each with the engine used and its extraction time."""
+    pages: list[dict] = []
+    plumber = None
+    doc = fitz.open(path)
+    try:
+        for number in range(start, stop):
+            started_at = time.perf_counter()
+            page = doc.load_page(number)
+            text = page.get_text("text")
+            engine = "pymupdf"
+            if _page_has_table(page):
+                if plumber is None:
+                    plumber = pdfplumber.open(path)
+                text = plumber.pages[number].extract_text() or text
+                engine = "pdfplumber"
+            pages.append(
+                {
+                    "page": number + 1,
+                    "text": (text or "").strip(),
+                    "engine": engine,
+                    "seconds": time.perf_counter() - started_at,
+                }
+            )
+    finally:
+        doc.close()
+        if plumber is not None:
+            plumber.close()
+    return pages
+
+
+def extract_pdf_pages(path: str) -> list[dict]:
+    """
+    Extracts every page in order. Documents longer than PDF_PAGES_PER_SHARD
+    are split into page ranges extracted in a spawned process pool. Daemonic
+    processes (Celery prefork children) cannot start children, so there, or
+    if the pool breaks, the ranges run serially; document tasks are routed to
+    a queue consumed with ``--pool threads`` for that reason.
+    """
+    with fitz.open(path) as doc:
+        page_count = doc.page_count
+    shard_size = max(1, settings.PDF_PAGES_PER_SHARD)
+    ranges = [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+    workers = min(max(1, settings.PDF_EXTRACTION_WORKERS), os.cpu_count() or 1, len(ranges))
+
+    if workers > 1 and multiprocessing.current_process().daemon:
+        logger.warning(
+            "PDF extraction for %s runs serially inside a daemonic worker process; "
+            "consume the %s queue with --pool threads to shard it",
+            path,
+            settings.DOCUMENT_QUEUE_NAME,
+        )
+    elif workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                shards = list(
+                    pool.map(
+                        _extract_pdf_page_range,
+                        [path] * len(ranges),
+                        [start for start, _ in ranges],
+                        [stop for _, stop in ranges],
+                    )
+                )
+            return [page for shard in shards for page in shard]
+        except (BrokenProcessPool, OSError):
+            logger.warning("PDF process pool unavailable for %s; extracting serially", path, exc_info=True)
+
+    return [page for start, stop in ranges for page in _extract_pdf_page_range(path, start, stop)]
+
+
+def _page_timings(pages: list[dict]) -> dict:
+    return {
+        "pages": [{"page": p["page"], "engine": p["engine"], "seconds": round(p["seconds"], 4)} for p in pages],
+        "table_pages": sum(1 for p in pages if p["engine"] == "pdfplumber"),
+    }
+
+
+def extract_pdf_text(path: str) -> str:
+    return "\n".join(page["text"] for page in extract_pdf_pages(path) if page["text"]).strip()
 
 
 # ----------------------------------------
 # Scanned PDF (Safe OCR Fallback)
 # ----------------------------------------
 
-def extract_scanned_pdf_text(path: str) -> str:
-    text_parts = []
-    doc = fitz.open(path)
-
-    try:
-        for page_index in range(len(doc)):
-            page = doc.load_page(page_index)
-            pix = page.get_pixmap()
-
-            image_path = f"{path}_page_{page_index}.png"
-            pix.save(image_path)
+def page_needs_ocr(text: str) -> bool:
+    """True when a page's text layer is missing, too short or mostly non-text (broken font encodings)."""
+    stripped = "".join((text or "").split())
+    if len(stripped) < settings.OCR_MIN_PAGE_CHARS:
+        return True
+    readable = sum(1 for char in stripped if char.isalnum() or char in ".,;:!?'\"()-%")
+    return readable / len(stripped) < 0.6 or stripped.count("\ufffd") > len(stripped) // 20
 
-            try:
-                ocr_text = extract_text_from_image(image_path)
-                if ocr_text:
-                    text_parts.append(ocr_text)
-            finally:
-                Path(image_path).unlink(missing_ok=True)
 
-    finally:
-        doc.close()
-
-    return "\n".join(text_parts).strip()
+def _ocr_pdf_page(path: str, number: int) -> tuple[str, float]:
+    started_at = time.perf_counter()
+    try:
+        with fitz.open(path) as doc:
+            pix = doc.load_page(number).get_pixmap(dpi=settings.OCR_DPI, colorspace=fitz.csGRAY, alpha=False)
+        with Image.frombytes("L", (pix.width, pix.height), pix.samples) as image:
+            text = extract_text_from_pil_image(image)
+    except Exception as exc:
+        logger.warning("OCR failed for page %s of %s: %s", number + 1, path, exc)
+        text = ""
+    return text, time.perf_counter() - started_at
+
+
+def ocr_pdf_pages(path: str, pages: list[dict]) -> dict:
+    """
+    OCRs, in place, the pages whose text layer is unusable. Pages are
+    rasterized in memory at OCR_DPI and recognised across OCR_MAX_WORKERS
+    threads (Tesseract runs as a subprocess); at most OCR_MAX_PAGES pages are
+    OCRed per document, in page order.
+    """
+    candidates = [page for page in pages if page_needs_ocr(page["text"])]
+    selected = candidates[: max(0, settings.OCR_MAX_PAGES)]
+    if selected:
+        with ThreadPoolExecutor(max_workers=max(1, min(settings.OCR_MAX_WORKERS, len(selected)))) as pool:
+            results = list(pool.map(lambda page: _ocr_pdf_page(path, page["page"] - 1), selected))
+        for page, (text, seconds) in zip(selected, results):
+            if text:
+                page["text"] = text
+                page["engine"] = "tesseract"
+            page["seconds"] += seconds
+    return {"ocr_pages": len(selected), "ocr_skipped_pages": len(candidates) - len(selected)}
 
 
 # ----------------------------------------
@@ -86,19 +200,30 @@ def extract_txt_text(path: str) -> str:
 # Unified Dispatcher
 # ----------------------------------------
 
-def extract_text_from_file(path: str, file_type: str) -> str:
-
+def extract_document(path: str, file_type: str) -> tuple[str, dict]:
+    """Extracted text plus extraction timings (per page for PDFs)."""
     file_type = file_type.lower()
 
     if file_type == "pdf":
-        # Try native PDF text extraction first
-        text = extract_pdf_text(path)
+        # Native text layer first; only pages without usable text are OCRed.
+        pages = extract_pdf_pages(path)
+        ocr_started_at = time.perf_counter()
+        ocr_stats = ocr_pdf_pages(path, pages)
+        timings = {**_page_timings(pages), **ocr_stats}
+        if ocr_stats["ocr_pages"]:
+            timings["ocr"] = round(time.perf_counter() - ocr_started_at, 3)
+
+        return "\n".join(page["text"] for page in pages if page["text"]).strip(), timings
+
+    return extract_text_from_file(path, file_type), {}
+
 
-        # Fallback to OCR only if empty
-        if not text:
-            text = extract_scanned_pdf_text(path)
+def extract_text_from_file(path: str, file_type: str) -> str:
+
+    file_type = file_type.lower()
 
-        return text
+    if file_type == "pdf":
+        return extract_document(path, file_type)[0]
 
     if file_type == "docx":
         return extract_docx_text(path)
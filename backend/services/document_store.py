@@ -0,0 +1,126 @@
+import uuid
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.document import Document
+from backend.models.document_chunk import DocumentChunk
+
+
+DOCUMENT_CHUNK_CHARS = 4000
+
+
+def split_document_text(text: str, target_chars: int = DOCUMENT_CHUNK_CHARS) -> list[dict]:
+    """
+    Splits text into chunks of about target_chars, preferring paragraph,
+    line and word boundaries. Nothing is dropped: the chunk texts
+    concatenate back to text.
+    """
+    chunks: list[dict] = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + target_chars)
+        if end < len(text):
+            window = text[start:end]
+            for separator in ("\n\n", "\n", " "):
+                cut = window.rfind(separator)
+                if cut > target_chars // 2:
+                    end = start + cut + len(separator)
+                    break
+        piece = text[start:end]
+        chunks.append(
+            {
+                "ordinal": len(chunks),
+                "text": piece,
+                "char_start": start,
+                "char_end": end,
+                "token_count": len(piece.split()),
+            }
+        )
+        start = end
+    return chunks
+
+
+async def replace_document_chunks(db: AsyncSession, document_id: uuid.UUID, text: str) -> int:
+    """Stores the extracted text as chunks, replacing earlier ones. The caller commits."""
+    await db.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document_id))
+    chunks = split_document_text(text)
+    if chunks:
+        await db.execute(
+            insert(DocumentChunk),
+            [{"id": uuid.uuid4(), "document_id": document_id, **chunk} for chunk in chunks],
+        )
+    return len(chunks)
+
+
+async def load_document_text(db: AsyncSession, document_id: uuid.UUID, max_chars: int | None = None) -> str:
+    """Extracted text of a document; with max_chars only the chunks starting before it are read."""
+    query = select(DocumentChunk.text).where(DocumentChunk.document_id == document_id)
+    if max_chars is not None:
+        if max_chars <= 0:
+            return ""
+        query = query.where(DocumentChunk.char_start < max_chars)
+    rows = await db.execute(query.order_by(DocumentChunk.ordinal))
+    text = "".join(rows.scalars().all())
+    return text if max_chars is None else text[:max_chars]
+
+
+async def load_document_chunks(db: AsyncSession, document_id: uuid.UUID, offset: int, limit: int) -> list[dict]:
+    rows = await db.execute(
+        select(
+            DocumentChunk.ordinal,
+            DocumentChunk.char_start,
+            DocumentChunk.char_end,
+            DocumentChunk.token_count,
+            DocumentChunk.text,
+        )
+        .where(DocumentChunk.document_id == document_id)
+        .order_by(DocumentChunk.ordinal)
+        .offset(offset)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def _summary_query():
+    metadata = Document.extracted_metadata
+    return select(
+        Document.id,
+        Document.quiz_id,
+        Document.file_name,
+        Document.file_type,
+        Document.extraction_status,
+        Document.created_at,
+        Document.updated_at,
+        metadata["text_length"].as_integer().label("text_length"),
+        metadata["chunk_count"].as_integer().label("chunk_count"),
+        metadata["error"].as_string().label("error"),
+    )
+
+
+def _summary(row) -> dict:
+    return {
+        "id": row.id,
+        "quiz_id": row.quiz_id,
+        "file_name": row.file_name,
+        "file_type": row.file_type,
+        "extraction_status": row.extraction_status,
+        "extracted_metadata": {
+            "text_length": row.text_length,
+            "chunk_count": row.chunk_count,
+            "error": row.error,
+        },
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+async def list_document_summaries(db: AsyncSession, quiz_id: uuid.UUID) -> list[dict]:
+    """Documents of a quiz without their extracted text or source index."""
+    rows = await db.execute(_summary_query().where(Document.quiz_id == quiz_id).order_by(Document.created_at))
+    return [_summary(row) for row in rows]
+
+
+async def get_document_summary(db: AsyncSession, document_id: uuid.UUID) -> dict | None:
+    row = (await db.execute(_summary_query().where(Document.id == document_id))).one_or_none()
+    return _summary(row) if row is not None else None
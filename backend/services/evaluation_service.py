@@ -6,6 +6,7 @@ from backend.models.answer import Answer
 from backend.models.result import Result
 from backend.models.violation import Violation
 from backend.models.attempt import Attempt
+from backend.services.compiled_paper import resolve_attempt_questions
 from backend.services.question_quality import normalize_question_type, normalize_math_text
 
 
@@ -21,7 +22,7 @@ async def evaluate_attempt(db: AsyncSession, attempt_id):
         logger.warning("Evaluation skipped because attempt %s was not found", attempt_id)
         return None
 
-    snapshot = list(getattr(attempt, "questions_snapshot", None) or [])
+    snapshot = await resolve_attempt_questions(db, attempt)
     if not snapshot:
         logger.warning("Attempt %s has no question snapshot; evaluation cannot grade objective answers", attempt_id)
 
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.core.redis import acquire_exam_admission
+from backend.models.quiz import Quiz
+from backend.services.compiled_paper import PaperArtifact, get_current_paper
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdmissionDecision:
+    admitted: bool
+    ticket: str
+    queue_position: int = 0
+    retry_after_seconds: int = 0
+
+
+async def admit_exam_start(quiz_id: str, ticket: str | None) -> AdmissionDecision:
+    """
+    Takes one token from the quiz's start bucket. Students that do not get one
+    are queued and receive a ticket to poll with; Redis failures fail open so
+    an outage never locks students out of an exam.
+    """
+    ticket = ticket or uuid.uuid4().hex
+    if not settings.EXAM_ADMISSION_ENABLED:
+        return AdmissionDecision(admitted=True, ticket=ticket)
+
+    rate = max(0.1, settings.EXAM_ADMISSION_RATE_PER_SECOND)
+    try:
+        admitted, position = await acquire_exam_admission(
+            quiz_id,
+            ticket,
+            now_ms=int(time.time() * 1000),
+            rate_per_second=rate,
+            burst=max(1, settings.EXAM_ADMISSION_BURST),
+            ticket_ttl_seconds=max(5, settings.EXAM_ADMISSION_TICKET_TTL_SECONDS),
+        )
+    except RedisError:
+        logger.exception("Exam admission check failed for quiz %s; admitting", quiz_id)
+        return AdmissionDecision(admitted=True, ticket=ticket)
+
+    if admitted:
+        return AdmissionDecision(admitted=True, ticket=ticket)
+    return AdmissionDecision(
+        admitted=False,
+        ticket=ticket,
+        queue_position=position,
+        retry_after_seconds=max(1, math.ceil(position / rate)),
+    )
+
+
+class CoalescingLoader:
+    """
+    Collapses concurrent loads of the same key into one awaitable and keeps
+    the result for a short TTL, so a classroom opening the same link at once
+    triggers a single quiz/paper lookup per process.
+
+    The shared load runs in its own task, so a caller that is cancelled (a
+    client disconnect) never cancels it for the others. ``loader`` must not
+    depend on any one caller's resources, such as its request session.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._cache: dict[str, tuple[float, Any]] = {}
+
+    def _prune(self, now: float) -> None:
+        if len(self._cache) < self._max_entries:
+            return
+        for key in [key for key, (expires_at, _) in self._cache.items() if expires_at <= now]:
+            self._cache.pop(key, None)
+
+    async def _run(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if self._ttl_seconds > 0:
+            now = time.monotonic()
+            self._prune(now)
+            self._cache[key] = (now + self._ttl_seconds, value)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark as retrieved: every waiter may have gone away.
+            task.exception()
+
+    async def load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.get_running_loop().create_task(self._run(key, loader))
+                task.add_done_callback(lambda done, key=key: self._finish(key, done))
+                self._inflight[key] = task
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not task.cancelled() or (current is not None and current.cancelling()):
+                    raise
+                # Only the shared load was cancelled, not this caller: load again.
+
+    def forget(self, key: str) -> None:
+        self._cache.pop(key, None)
+
+
+# --------------------------------------------------
+# Coalesced exam entry lookup
+# --------------------------------------------------
+
+@dataclass(frozen=True)
+class ExamQuizSnapshot:
+    """Detached copy of the quiz columns the start path reads."""
+
+    id: uuid.UUID
+    title: str
+    academic_type: str
+    duration_minutes: int | None
+    is_published: bool
+    ai_generation_status: str | None
+
+
+@dataclass(frozen=True)
+class ExamEntry:
+    quiz: ExamQuizSnapshot | None
+    paper: PaperArtifact | None = None
+
+
+_entry_loader = CoalescingLoader(settings.EXAM_ENTRY_CACHE_SECONDS)
+
+
+async def _fetch_exam_entry(condition) -> ExamEntry:
+    # Shared by every coalesced caller, so it reads through its own session.
+    async with SessionLocal() as db:
+        result = await db.execute(select(Quiz).where(condition))
+        quiz = result.scalar_one_or_none()
+        if quiz is None:
+            return ExamEntry(quiz=None)
+        snapshot = ExamQuizSnapshot(
+            id=quiz.id,
+            title=quiz.title,
+            academic_type=quiz.academic_type,
+            duration_minutes=quiz.duration_minutes,
+            is_published=bool(quiz.is_published),
+            ai_generation_status=quiz.ai_generation_status,
+        )
+        paper = await get_current_paper(db, quiz) if quiz.is_published else None
+    return ExamEntry(quiz=snapshot, paper=paper)
+
+
+async def load_exam_entry(
+    *,
+    quiz_id: uuid.UUID | None = None,
+    public_exam_id: str | None = None,
+) -> ExamEntry:
+    """
+    Quiz and current paper for an exam start. Concurrent starts for the same
+    quiz share one lookup, and the result is reused for a couple of seconds.
+    """
+    if quiz_id is not None:
+        return await _entry_loader.load(f"id:{quiz_id}", lambda: _fetch_exam_entry(Quiz.id == quiz_id))
+    return await _entry_loader.load(
+        f"public:{public_exam_id}",
+        lambda: _fetch_exam_entry(Quiz.public_id == public_exam_id),
+    )
@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.extraction_cache import EXTRACTION_CACHE_UNIQUE_CONSTRAINT, ExtractionCacheEntry
+from backend.services.document_service import EXTRACTOR_VERSION
+
+
+logger = logging.getLogger(__name__)
+
+
+def _blob_path(content_hash: str, file_type: str) -> Path:
+    root = Path(settings.EXTRACTION_CACHE_DIR)
+    return root / content_hash[:2] / f"{content_hash}-v{EXTRACTOR_VERSION}.{file_type}.json.gz"
+
+
+def _write_blob(path: Path, payload: dict) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with gzip.open(partial, "wt", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False)
+    os.replace(partial, path)
+    return path.stat().st_size
+
+
+def _read_blob(path: str) -> dict | None:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _remove_blobs(paths: list[str]) -> None:
+    for path in paths:
+        Path(path).unlink(missing_ok=True)
+
+
+async def lookup_extraction(db: AsyncSession, content_hash: str | None, file_type: str) -> dict | None:
+    """
+    Cached extraction payload for these bytes, or None. A row whose blob
+    has gone missing is dropped so the document is extracted again.
+    """
+    if not settings.EXTRACTION_CACHE_ENABLED or not content_hash:
+        return None
+    entry = (
+        await db.execute(
+            select(ExtractionCacheEntry).where(
+                ExtractionCacheEntry.content_hash == content_hash,
+                ExtractionCacheEntry.extractor_version == EXTRACTOR_VERSION,
+                ExtractionCacheEntry.file_type == file_type.lower(),
+            )
+        )
+    ).scalar_one_or_none()
+    if entry is None:
+        return None
+
+    payload = await asyncio.to_thread(_read_blob, entry.blob_path)
+    if payload is None or not payload.get("extracted_text"):
+        logger.warning("Extraction cache blob missing for %s; re-extracting", content_hash)
+        await db.delete(entry)
+        await db.commit()
+        return None
+
+    entry.hit_count += 1
+    entry.last_used_at = func.now()
+    await db.commit()
+    return payload
+
+
+async def store_extraction(db: AsyncSession, content_hash: str | None, file_type: str, payload: dict) -> None:
+    """Writes the payload (extracted_text plus derived data) to the blob store and records it."""
+    if not settings.EXTRACTION_CACHE_ENABLED or not content_hash:
+        return
+    file_type = file_type.lower()
+    path = _blob_path(content_hash, file_type)
+    blob_bytes = await asyncio.to_thread(_write_blob, path, payload)
+
+    stmt = insert(ExtractionCacheEntry).values(
+        id=uuid.uuid4(),
+        content_hash=content_hash,
+        extractor_version=EXTRACTOR_VERSION,
+        file_type=file_type,
+        blob_path=str(path),
+        blob_bytes=blob_bytes,
+        text_length=len(payload.get("extracted_text") or ""),
+        hit_count=0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint=EXTRACTION_CACHE_UNIQUE_CONSTRAINT,
+        set_={
+            "blob_path": stmt.excluded.blob_path,
+            "blob_bytes": stmt.excluded.blob_bytes,
+            "text_length": stmt.excluded.text_length,
+            "last_used_at": func.now(),
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+    await evict_extraction_cache(db)
+
+
+async def evict_extraction_cache(db: AsyncSession) -> int:
+    """Drops least recently used entries until the blob store fits EXTRACTION_CACHE_MAX_BYTES."""
+    total = await db.scalar(select(func.coalesce(func.sum(ExtractionCacheEntry.blob_bytes), 0)))
+    excess = int(total or 0) - settings.EXTRACTION_CACHE_MAX_BYTES
+    if excess <= 0:
+        return 0
+
+    result = await db.execute(
+        select(ExtractionCacheEntry.id, ExtractionCacheEntry.blob_path, ExtractionCacheEntry.blob_bytes).order_by(
+            ExtractionCacheEntry.last_used_at.asc()
+        )
+    )
+    victims: list[uuid.UUID] = []
+    paths: list[str] = []
+    for entry_id, blob_path, blob_bytes in result:
+        victims.append(entry_id)
+        paths.append(blob_path)
+        excess -= blob_bytes
+        if excess <= 0:
+            break
+
+    await db.execute(delete(ExtractionCacheEntry).where(ExtractionCacheEntry.id.in_(victims)))
+    await db.commit()
+    await asyncio.to_thread(_remove_blobs, paths)
+    return len(victims)
@@ -0,0 +1,103 @@
+import logging
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.ai.graphs.result_processing_graph import get_result_processing_graph
+from backend.core.llm_governor import LLM_PRIORITY_GRADING, llm_priority
+from backend.core.redis import set_grading_progress
+from backend.models.attempt import Attempt
+from backend.services.compiled_paper import get_paper
+from backend.services.objective_grading import (
+    ObjectiveAnswerKey,
+    answer_key_for_paper,
+    build_objective_answer_key,
+    grade_objective_attempts,
+)
+from backend.services.regrade_service import apply_answer_key_overrides, load_applied_answer_keys
+
+
+logger = logging.getLogger(__name__)
+
+# Stage reported while each graph node runs; clients read it from the status endpoint.
+GRADING_QUEUED = "QUEUED"
+GRADING_COMPLETED = "COMPLETED"
+GRADING_FAILED = "FAILED"
+_NEXT_STAGE = {
+    "objective": "SHORT_ANSWERS",
+    "short_answer": "FINALIZING",
+    "aggregate": GRADING_COMPLETED,
+}
+
+
+def _initial_state(db: AsyncSession, attempt_id: str) -> dict:
+    return {
+        "db": db,
+        "attempt_id": attempt_id,
+        "objective_score": 0,
+        "short_answer_payload": [],
+        "short_answer_scores": [],
+        "violation_count": 0,
+        "final_score": 0,
+        "review_required": False,
+    }
+
+
+async def _objective_answer_key(db: AsyncSession, attempt_id: uuid.UUID) -> ObjectiveAnswerKey | None:
+    result = await db.execute(
+        select(Attempt.quiz_id, Attempt.paper_id, Attempt.questions_snapshot).where(Attempt.id == attempt_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    # Keys corrected by a completed regrade apply to attempts graded later too.
+    overrides = await load_applied_answer_keys(db, row.quiz_id)
+    if row.questions_snapshot:
+        return build_objective_answer_key(apply_answer_key_overrides(list(row.questions_snapshot), overrides))
+    if row.paper_id:
+        paper = await get_paper(db, row.paper_id)
+        if paper is not None:
+            if overrides:
+                return build_objective_answer_key(apply_answer_key_overrides(list(paper.questions), overrides))
+            return answer_key_for_paper(paper.paper_id, list(paper.questions))
+    return None
+
+
+async def grade_attempt(db: AsyncSession, attempt_id: str) -> None:
+    """
+    Grades one submitted attempt. Papers with only keyed MCQ/TRUE_FALSE
+    questions take the objective fast path; everything else runs the result
+    graph, publishing its stage after each node.
+    """
+    attempt_uuid = uuid.UUID(str(attempt_id))
+    answer_key = await _objective_answer_key(db, attempt_uuid)
+    if answer_key is not None:
+        await grade_objective_attempts(db, answer_key, [attempt_uuid])
+        await db.commit()
+        await set_grading_progress(attempt_id, GRADING_COMPLETED)
+        return
+
+    graph = get_result_processing_graph()
+    await set_grading_progress(attempt_id, "OBJECTIVE")
+    async for update in graph.astream(_initial_state(db, attempt_id), stream_mode="updates"):
+        for node_name in update:
+            stage = _NEXT_STAGE.get(node_name)
+            if stage:
+                await set_grading_progress(attempt_id, stage)
+
+
+async def run_grading_job(session_factory: async_sessionmaker[AsyncSession], attempt_id: str) -> bool:
+    """Grades one attempt in its own session. Failures are recorded, not raised."""
+    try:
+        with llm_priority(LLM_PRIORITY_GRADING):
+            async with session_factory() as db:
+                await grade_attempt(db, attempt_id)
+        return True
+    except Exception as exc:
+        logger.exception("Grading failed for attempt %s", attempt_id)
+        try:
+            await set_grading_progress(attempt_id, GRADING_FAILED, error=str(exc)[:200])
+        except Exception:
+            logger.exception("Could not record grading failure for attempt %s", attempt_id)
+        return False
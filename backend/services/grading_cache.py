@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+
+from backend.ai.schemas.evaluation import ShortAnswerScore
+from backend.core.config import settings
+from backend.core.redis import record_metrics, redis_client
+from backend.services.question_quality import normalize_math_text
+
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_METRICS_GROUP = "grading:answer_cache"
+ANSWER_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+_MINHASH_PERMUTATIONS = 64
+_MINHASH_PRIME = (1 << 61) - 1
+_SHINGLE_SIZE = 5
+# Fixed coefficients so signatures are comparable across processes.
+_MINHASH_COEFFICIENTS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MINHASH_PRIME or 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MINHASH_PRIME,
+    )
+    for i in range(_MINHASH_PERMUTATIONS)
+]
+
+
+def normalize_student_answer(value: object) -> str:
+    return " ".join(normalize_math_text(value).casefold().split())
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def answer_cache_key(item: dict) -> tuple[str, str]:
+    """(redis hash key, field) for one short-answer payload item."""
+    question_id = str(item.get("question_id") or "")
+    key_hash = _digest(normalize_student_answer(item.get("correct_answer")))[:16]
+    max_marks = int(item.get("max_marks") or 1)
+    answer_hash = _digest(f"{max_marks}:{normalize_student_answer(item.get('student_answer'))}")[:32]
+    return f"grading:answers:{question_id}:{key_hash}", answer_hash
+
+
+def minhash_signature(text: str) -> list[int]:
+    padded = f" {text} "
+    shingles = {padded[i:i + _SHINGLE_SIZE] for i in range(max(1, len(padded) - _SHINGLE_SIZE + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big") for shingle in shingles]
+    return [min((a * value + b) % _MINHASH_PRIME for value in hashes) for a, b in _MINHASH_COEFFICIENTS]
+
+
+def estimated_similarity(left: list[int], right: list[int]) -> float:
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+def _to_score(question_id: str, max_marks: int, cached: dict) -> ShortAnswerScore | None:
+    if int(cached.get("max_marks") or 0) != max_marks:
+        return None
+    return ShortAnswerScore(
+        question_id=question_id,
+        awarded_marks=int(cached.get("awarded_marks") or 0),
+        max_marks=max_marks,
+        confidence=str(cached.get("confidence") or ""),
+    )
+
+
+async def lookup_cached_scores(items: list[dict]) -> dict[int, ShortAnswerScore]:
+    """
+    Returns cached scores by index into ``items``. Exact hits match the
+    normalized answer; with GRADING_CACHE_FUZZY_ENABLED, remaining items may
+    reuse the score of a near-identical answer to the same question.
+    """
+    if not settings.GRADING_CACHE_ENABLED or not items:
+        return {}
+
+    hits: dict[int, ShortAnswerScore] = {}
+    fuzzy_hits = 0
+    try:
+        keys = [answer_cache_key(item) for item in items]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for hash_key, field in keys:
+                pipe.hget(hash_key, field)
+            raw_values = await pipe.execute()
+
+        misses: dict[str, list[int]] = {}
+        for index, (item, raw) in enumerate(zip(items, raw_values)):
+            score = _to_score(str(item["question_id"]), int(item.get("max_marks") or 1), json.loads(raw)) if raw else None
+            if score is not None:
+                hits[index] = score
+            else:
+                misses.setdefault(keys[index][0], []).append(index)
+
+        if settings.GRADING_CACHE_FUZZY_ENABLED and misses:
+            threshold = settings.GRADING_CACHE_FUZZY_THRESHOLD
+            for hash_key, indexes in misses.items():
+                candidates = [json.loads(raw) for raw in (await redis_client.hvals(hash_key) or [])]
+                candidates = [candidate for candidate in candidates if candidate.get("signature")]
+                if not candidates:
+                    continue
+                for index in indexes:
+                    item = items[index]
+                    signature = minhash_signature(normalize_student_answer(item.get("student_answer")))
+                    best = max(candidates, key=lambda candidate: estimated_similarity(signature, candidate["signature"]))
+                    if estimated_similarity(signature, best["signature"]) < threshold:
+                        continue
+                    score = _to_score(str(item["question_id"]), int(item.get("max_marks") or 1), best)
+                    if score is not None:
+                        hits[index] = score
+                        fuzzy_hits += 1
+    except Exception:
+        logger.warning("Grading cache lookup failed; evaluating without cache", exc_info=True)
+        return hits
+
+    try:
+        await record_metrics(
+            ANSWER_CACHE_METRICS_GROUP,
+            lookups=len(items),
+            exact_hits=len(hits) - fuzzy_hits,
+            fuzzy_hits=fuzzy_hits,
+            misses=len(items) - len(hits),
+        )
+    except Exception:
+        logger.warning("Could not record grading cache metrics", exc_info=True)
+    return hits
+
+
+async def store_cached_scores(entries: list[tuple[dict, ShortAnswerScore]]) -> None:
+    if not settings.GRADING_CACHE_ENABLED or not entries:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for item, score in entries:
+                hash_key, field = answer_cache_key(item)
+                cached = {
+                    "awarded_marks": int(score.awarded_marks),
+                    "max_marks": int(score.max_marks),
+                    "confidence": score.confidence,
+                }
+                if settings.GRADING_CACHE_FUZZY_ENABLED:
+                    cached["signature"] = minhash_signature(normalize_student_answer(item.get("student_answer")))
+                pipe.hset(hash_key, field, json.dumps(cached))
+                pipe.expire(hash_key, ANSWER_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception:
+        logger.warning("Grading cache store failed", exc_info=True)
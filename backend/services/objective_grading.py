@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.answer import Answer
+from backend.models.attempt import Attempt
+from backend.models.result import Result
+from backend.models.violation import Violation
+from backend.services.question_quality import normalize_math_text, normalize_question_type
+
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVE_FAST_PATH_TYPES = {"MCQ", "TRUE_FALSE"}
+# Question types the result graph grades by exact match.
+EXACT_MATCH_TYPES = {"MCQ", "TRUE_FALSE", "ONE_WORD"}
+ANSWER_KEY_CACHE_SIZE = 256
+
+
+def normalize_objective_answer(value: object) -> str:
+    """Same comparison form the result graph uses for exact-match questions."""
+    return normalize_math_text(value).strip().lower()
+
+
+@dataclass(frozen=True)
+class ObjectiveAnswerKey:
+    """Pre-normalized answer key: question id -> (normalized correct answer, marks)."""
+
+    entries: dict[str, tuple[str, int]]
+
+    @property
+    def total_marks(self) -> int:
+        return sum(marks for _, marks in self.entries.values())
+
+    def score(self, answers: dict[str, str]) -> tuple[int, int]:
+        """Returns (score, correct answers) for one attempt's raw answers."""
+        score = 0
+        correct = 0
+        for question_id, (expected, marks) in self.entries.items():
+            given = answers.get(question_id)
+            if given is not None and normalize_objective_answer(given) == expected:
+                score += marks
+                correct += 1
+        return score, correct
+
+
+def _is_missing_answer_key(value: str) -> bool:
+    return not value or value.lower() in {"answer_unavailable", "null", "none"}
+
+
+def build_objective_answer_key(questions: list[dict], *, partial: bool = False) -> ObjectiveAnswerKey | None:
+    """
+    Returns a key only when every question is MCQ/TRUE_FALSE with an answer
+    key present; anything else needs the full result graph. With
+    ``partial=True`` the key instead covers just the keyed exact-match
+    questions (MCQ, TRUE_FALSE, ONE_WORD) and skips the rest.
+    """
+    if not questions:
+        return None
+    entries: dict[str, tuple[str, int]] = {}
+    for question in questions:
+        question_type = normalize_question_type(question.get("question_type"))
+        correct_answer = str(question.get("correct_answer") or "").strip()
+        question_id = str(question.get("id") or "")
+        if partial:
+            if question_type not in EXACT_MATCH_TYPES or _is_missing_answer_key(correct_answer) or not question_id:
+                continue
+        elif question_type not in OBJECTIVE_FAST_PATH_TYPES or _is_missing_answer_key(correct_answer) or not question_id:
+            return None
+        entries[question_id] = (normalize_objective_answer(correct_answer), int(question.get("marks") or 1))
+    return ObjectiveAnswerKey(entries=entries)
+
+
+class _AnswerKeyCache:
+    """Keys are derived from immutable compiled papers, so entries never go stale."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, ObjectiveAnswerKey | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, paper_id: str, questions: list[dict]) -> ObjectiveAnswerKey | None:
+        with self._lock:
+            if paper_id in self._entries:
+                self._entries.move_to_end(paper_id)
+                return self._entries[paper_id]
+        key = build_objective_answer_key(questions)
+        with self._lock:
+            self._entries[paper_id] = key
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return key
+
+
+_answer_key_cache = _AnswerKeyCache(ANSWER_KEY_CACHE_SIZE)
+
+
+def answer_key_for_paper(paper_id: str, questions: list[dict]) -> ObjectiveAnswerKey | None:
+    return _answer_key_cache.get_or_build(str(paper_id), questions)
+
+
+async def grade_objective_attempts(
+    db: AsyncSession,
+    answer_key: ObjectiveAnswerKey,
+    attempt_ids: list[uuid.UUID],
+) -> dict[uuid.UUID, int]:
+    """
+    Grades a batch of attempts that share ``answer_key`` with one answers
+    query, one violations query and bulk writes. Returns final scores by
+    attempt id. The caller commits.
+    """
+    if not attempt_ids:
+        return {}
+
+    answers_by_attempt: dict[uuid.UUID, dict[str, str]] = defaultdict(dict)
+    answers_result = await db.execute(
+        select(Answer.attempt_id, Answer.question_id, Answer.answer_text).where(Answer.attempt_id.in_(attempt_ids))
+    )
+    for attempt_id, question_id, answer_text in answers_result.all():
+        answers_by_attempt[attempt_id][str(question_id)] = str(answer_text or "")
+
+    violations_result = await db.execute(
+        select(Violation.attempt_id, func.count(Violation.id))
+        .where(Violation.attempt_id.in_(attempt_ids))
+        .group_by(Violation.attempt_id)
+    )
+    violations_by_attempt = {attempt_id: int(count) for attempt_id, count in violations_result.all()}
+
+    result_rows: list[dict] = []
+    attempt_rows: list[dict] = []
+    scores: dict[uuid.UUID, int] = {}
+    for attempt_id in attempt_ids:
+        score, _ = answer_key.score(answers_by_attempt.get(attempt_id, {}))
+        violation_count = violations_by_attempt.get(attempt_id, 0)
+        final_score = max(0, score - violation_count // 2)
+        scores[attempt_id] = final_score
+        result_rows.append(
+            {
+                "id": uuid.uuid4(),
+                "attempt_id": attempt_id,
+                "final_score": final_score,
+                "raw_score": score,
+                "violation_count": violation_count,
+                "integrity_flag": violation_count > 3,
+                "status": "GRADED",
+            }
+        )
+        attempt_rows.append({"id": attempt_id, "final_score": final_score, "status": "GRADED"})
+
+    stmt = insert(Result).values(result_rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Result.attempt_id],
+        set_={
+            "final_score": stmt.excluded.final_score,
+            "raw_score": stmt.excluded.raw_score,
+            "violation_count": stmt.excluded.violation_count,
+            "integrity_flag": stmt.excluded.integrity_flag,
+            "status": stmt.excluded.status,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    # ORM bulk UPDATE by primary key: one executemany for the whole batch.
+    await db.execute(update(Attempt), attempt_rows)
+    return scores
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core.config import settings
+from backend.models.ai_job import AIJob
+from backend.models.answer import Answer
+from backend.models.attempt import Attempt
+from backend.models.question import Question
+from backend.models.result import Result
+from backend.services.compiled_paper import get_paper
+from backend.services.objective_grading import (
+    EXACT_MATCH_TYPES,
+    ObjectiveAnswerKey,
+    build_objective_answer_key,
+    grade_objective_attempts,
+)
+from backend.services.question_quality import normalize_question_type
+
+
+logger = logging.getLogger(__name__)
+
+REGRADE_JOB_TYPE = "RESULT_REGRADE"
+REGRADE_ACTIVE_STATUSES = ("PENDING", "PROCESSING")
+REGRADE_BATCH_SIZE = 500
+
+
+class _PaperKeys:
+    """Answer keys of one paper as last graded and with the current question rows."""
+
+    def __init__(self, questions: list[dict], overrides: dict[str, dict], applied: dict[str, dict]):
+        updated = apply_answer_key_overrides(questions, overrides)
+        # Objective-only papers are regraded from scratch.
+        self.full = build_objective_answer_key(updated)
+        # Mixed papers keep their short-answer marks; only the exact-match
+        # portion of the score is shifted by the key change.
+        if self.full is None:
+            previous = apply_answer_key_overrides(questions, applied)
+            self.previous = build_objective_answer_key(previous, partial=True)
+            self.updated = build_objective_answer_key(updated, partial=True)
+        else:
+            self.previous = None
+            self.updated = None
+
+
+def _apply_override(question: dict, overrides: dict[str, dict]) -> dict:
+    override = overrides.get(str(question.get("id") or ""))
+    if not override:
+        return question
+    return {**question, **override}
+
+
+def apply_answer_key_overrides(questions: list[dict], overrides: dict[str, dict]) -> list[dict]:
+    """Paper questions with the given answer keys and marks swapped in."""
+    if not overrides:
+        return questions
+    return [_apply_override(question, overrides) for question in questions]
+
+
+async def load_answer_key_overrides(db: AsyncSession, quiz_id: uuid.UUID) -> dict[str, dict]:
+    """Current answer key and marks of every exact-match question in the quiz, by question id."""
+    result = await db.execute(
+        select(Question.id, Question.question_type, Question.correct_answer, Question.marks).where(
+            Question.quiz_id == quiz_id
+        )
+    )
+    return {
+        str(question_id): {"correct_answer": correct_answer, "marks": int(marks or 1)}
+        for question_id, question_type, correct_answer, marks in result.all()
+        if normalize_question_type(question_type) in EXACT_MATCH_TYPES
+    }
+
+
+async def load_applied_answer_keys(db: AsyncSession, quiz_id: uuid.UUID) -> dict[str, dict]:
+    """
+    Keys applied by the last completed regrade. Regrades diff against them so
+    score shifts are never applied twice, and grading resolves paper keys
+    through them so attempts graded after a regrade use the corrected key.
+    """
+    result = await db.execute(
+        select(AIJob.meta)
+        .where(
+            AIJob.quiz_id == quiz_id,
+            AIJob.job_type == REGRADE_JOB_TYPE,
+            AIJob.status == "COMPLETED",
+        )
+        .order_by(AIJob.created_at.desc())
+        .limit(1)
+    )
+    meta = result.scalar_one_or_none() or {}
+    applied = meta.get("answer_keys") if isinstance(meta, dict) else None
+    return applied if isinstance(applied, dict) else {}
+
+
+def _previous_raw_score(raw_score: int | None, final_score: int, penalty: int, objective_score: int) -> int:
+    if raw_score is not None:
+        return int(raw_score)
+    # Results graded before raw scores were stored: an unclamped final score
+    # gives the raw score back exactly; a clamped one is at least the
+    # exact-match score it was graded with.
+    if final_score > 0:
+        return final_score + penalty
+    return min(objective_score, penalty)
+
+
+async def _shift_objective_scores(
+    db: AsyncSession,
+    previous_key: ObjectiveAnswerKey,
+    updated_key: ObjectiveAnswerKey,
+    attempt_ids: list[uuid.UUID],
+) -> int:
+    """
+    Applies the exact-match score change to already graded attempts. The
+    change is applied to the pre-penalty score and the violation penalty is
+    re-applied, so a score clamped at zero does not absorb part of the
+    correction. Returns rows updated.
+    """
+    results = await db.execute(
+        select(Result.attempt_id, Result.raw_score, Result.final_score, Result.violation_count).where(
+            Result.attempt_id.in_(attempt_ids)
+        )
+    )
+    graded = {row.attempt_id: row for row in results.all()}
+    if not graded:
+        return 0
+
+    answers_by_attempt: dict[uuid.UUID, dict[str, str]] = defaultdict(dict)
+    answers = await db.execute(
+        select(Answer.attempt_id, Answer.question_id, Answer.answer_text).where(
+            Answer.attempt_id.in_(list(graded))
+        )
+    )
+    for attempt_id, question_id, answer_text in answers.all():
+        answers_by_attempt[attempt_id][str(question_id)] = str(answer_text or "")
+
+    result_rows: list[dict] = []
+    attempt_rows: list[dict] = []
+    for attempt_id, row in graded.items():
+        attempt_answers = answers_by_attempt.get(attempt_id, {})
+        previous_score = previous_key.score(attempt_answers)[0]
+        delta = updated_key.score(attempt_answers)[0] - previous_score
+        if delta == 0:
+            continue
+        penalty = int(row.violation_count or 0) // 2
+        raw_score = _previous_raw_score(row.raw_score, int(row.final_score or 0), penalty, previous_score)
+        raw_score = max(0, raw_score + delta)
+        final_score = max(0, raw_score - penalty)
+        result_rows.append({"b_attempt_id": attempt_id, "b_final_score": final_score, "b_raw_score": raw_score})
+        attempt_rows.append({"id": attempt_id, "final_score": final_score})
+
+    if result_rows:
+        await db.execute(
+            update(Result.__table__)
+            .where(Result.__table__.c.attempt_id == bindparam("b_attempt_id"))
+            .values(
+                final_score=bindparam("b_final_score"),
+                raw_score=bindparam("b_raw_score"),
+                updated_at=func.now(),
+            ),
+            result_rows,
+        )
+        await db.execute(update(Attempt), attempt_rows)
+    return len(result_rows)
+
+
+async def expire_stale_regrade_jobs(db: AsyncSession, quiz_id: uuid.UUID) -> int:
+    """
+    Fails queued or running regrades of the quiz whose progress has not been
+    written for REGRADE_JOB_STALE_SECONDS (a crashed worker or a lost
+    dispatch), so they stop blocking new regrades. The caller commits.
+    """
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.REGRADE_JOB_STALE_SECONDS)
+    result = await db.execute(
+        select(AIJob).where(
+            AIJob.quiz_id == quiz_id,
+            AIJob.job_type == REGRADE_JOB_TYPE,
+            AIJob.status.in_(REGRADE_ACTIVE_STATUSES),
+            AIJob.updated_at < stale_before,
+        )
+    )
+    stale = result.scalars().all()
+    for job in stale:
+        logger.warning("Regrade job %s of quiz %s went stale in %s", job.id, quiz_id, job.status)
+        job.status = "FAILED"
+        job.meta = {**(job.meta or {}), "stage": "failed", "error": "Regrade stopped reporting progress"}
+    return len(stale)
+
+
+async def _set_regrade_progress(db: AsyncSession, job: AIJob, **fields) -> None:
+    job.meta = {**(job.meta or {}), **fields}
+    await db.commit()
+
+
+async def regrade_quiz_results(
+    session_factory: async_sessionmaker[AsyncSession],
+    job_id: str,
+    quiz_id: str,
+    batch_size: int = REGRADE_BATCH_SIZE,
+) -> int:
+    """
+    Regrades every submitted attempt of a quiz against the current answer
+    keys. Attempts are streamed in keyset-paginated batches; each batch reads
+    its answers with one query and writes with bulk statements. Progress is
+    reported through AIJob.meta. Returns the number of attempts processed.
+    """
+    quiz_uuid = uuid.UUID(str(quiz_id))
+    started_at = time.perf_counter()
+
+    # Score writes share one transaction so a failed run leaves no partial
+    # regrade behind; progress is committed through a separate session.
+    async with session_factory() as db, session_factory() as progress_db:
+        job = await progress_db.get(AIJob, uuid.UUID(str(job_id)))
+        if job is None:
+            logger.warning("Regrade job %s not found", job_id)
+            return 0
+        if job.status != "PENDING":
+            # Expired as stale before a worker picked it up.
+            logger.warning("Regrade job %s is %s; not starting", job_id, job.status)
+            return 0
+
+        try:
+            overrides = await load_answer_key_overrides(db, quiz_uuid)
+            applied = await load_applied_answer_keys(db, quiz_uuid)
+            total = int(
+                await db.scalar(
+                    select(func.count(Attempt.id)).where(
+                        Attempt.quiz_id == quiz_uuid,
+                        Attempt.submitted_at.is_not(None),
+                    )
+                )
+                or 0
+            )
+            job.status = "PROCESSING"
+            await _set_regrade_progress(progress_db, job, stage="regrading", progress=0, processed=0, updated=0, total=total)
+
+            paper_keys: dict[str, _PaperKeys | None] = {}
+            processed = 0
+            updated = 0
+            last_id: uuid.UUID | None = None
+
+            while True:
+                query = (
+                    select(Attempt.id, Attempt.paper_id, Attempt.questions_snapshot)
+                    .where(Attempt.quiz_id == quiz_uuid, Attempt.submitted_at.is_not(None))
+                    .order_by(Attempt.id)
+                    .limit(batch_size)
+                )
+                if last_id is not None:
+                    query = query.where(Attempt.id > last_id)
+                rows = (await db.execute(query)).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                groups: dict[str, list[uuid.UUID]] = defaultdict(list)
+                for row in rows:
+                    if row.questions_snapshot:
+                        # Legacy attempts carry their own snapshot.
+                        group_key = f"attempt:{row.id}"
+                        if group_key not in paper_keys:
+                            paper_keys[group_key] = _PaperKeys(list(row.questions_snapshot), overrides, applied)
+                    elif row.paper_id:
+                        group_key = f"paper:{row.paper_id}"
+                        if group_key not in paper_keys:
+                            paper = await get_paper(db, row.paper_id)
+                            paper_keys[group_key] = _PaperKeys(list(paper.questions), overrides, applied) if paper else None
+                    else:
+                        continue
+                    groups[group_key].append(row.id)
+
+                for group_key, attempt_ids in groups.items():
+                    keys = paper_keys.get(group_key)
+                    if keys is None:
+                        continue
+                    if keys.full is not None:
+                        await grade_objective_attempts(db, keys.full, attempt_ids)
+                        updated += len(attempt_ids)
+                    elif keys.previous is not None and keys.updated is not None:
+                        updated += await _shift_objective_scores(db, keys.previous, keys.updated, attempt_ids)
+                    if group_key.startswith("attempt:"):
+                        paper_keys.pop(group_key, None)
+
+                processed += len(rows)
+                await _set_regrade_progress(
+                    progress_db,
+                    job,
+                    processed=processed,
+                    updated=updated,
+                    progress=int(processed * 100 / total) if total else 100,
+                )
+
+            # A run that stalled long enough to be expired may have been
+            # replaced by a new regrade; applying its shifts too would
+            # double-count them.
+            await progress_db.refresh(job, attribute_names=["status"])
+            if job.status != "PROCESSING":
+                logger.warning("Regrade job %s of quiz %s was expired while running; discarding", job_id, quiz_id)
+                await db.rollback()
+                return 0
+
+            await db.commit()
+            job.status = "COMPLETED"
+            await _set_regrade_progress(
+                progress_db,
+                job,
+                stage="completed",
+                progress=100,
+                processed=processed,
+                updated=updated,
+                answer_keys=overrides,
+                timings={"total": round(time.perf_counter() - started_at, 3)},
+            )
+            logger.info(
+                "Regraded quiz %s | attempts=%s updated=%s elapsed_s=%.3f",
+                quiz_id,
+                processed,
+                updated,
+                time.perf_counter() - started_at,
+            )
+            return processed
+        except Exception as exc:
+            logger.exception("Regrade failed for quiz %s", quiz_id)
+            await db.rollback()
+            job.status = "FAILED"
+            await _set_regrade_progress(progress_db, job, stage="failed", error=str(exc))
+            return 0
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from langchain_core.callbacks import get_usage_metadata_callback
+
+from backend.ai.agents.short_answer_evaluator import evaluate_short_answers
+from backend.ai.schemas.evaluation import ShortAnswerScore
+from backend.core.config import settings
+from backend.core.llm_governor import LLM_PRIORITY_GRADING, llm_priority
+from backend.core.redis import record_metrics
+from backend.services.grading_cache import answer_cache_key, lookup_cached_scores, store_cached_scores
+
+
+logger = logging.getLogger(__name__)
+
+SHORT_ANSWER_METRICS_GROUP = "grading:short_answer"
+
+
+@dataclass
+class _PendingItem:
+    key: str
+    question_id: str
+    payload: dict
+    future: asyncio.Future
+    duplicates: list["_PendingItem"] = field(default_factory=list)
+
+    def resolve(self, score: ShortAnswerScore) -> None:
+        for item in [self, *self.duplicates]:
+            if not item.future.done():
+                max_marks = int(item.payload.get("max_marks") or 1)
+                item.future.set_result(_clamp_score(score, item.question_id, max_marks))
+
+    def fail(self, error: Exception) -> None:
+        for item in [self, *self.duplicates]:
+            if not item.future.done():
+                item.future.set_exception(error)
+
+
+def _item_key(attempt_id: str, question_id: str) -> str:
+    return f"{attempt_id}:{question_id}"
+
+
+def _clamp_score(score: ShortAnswerScore, question_id: str, max_marks: int) -> ShortAnswerScore:
+    return ShortAnswerScore(
+        question_id=question_id,
+        awarded_marks=max(0, min(int(score.awarded_marks), max_marks)),
+        max_marks=max_marks,
+        confidence=score.confidence,
+    )
+
+
+class ShortAnswerBatcher:
+    """
+    Packs short-answer items from concurrently graded attempts into one
+    evaluation call. A batch is sent when it reaches ``max_items`` or when the
+    oldest item has waited ``window_seconds``. Items are keyed by
+    attempt_id:question_id so results fan back out to the right attempt; a
+    batch whose response cannot be parsed or is incomplete is split in half
+    and retried. Any other error (transport, rate limits the governor gave up
+    on) fails the whole batch at once.
+    """
+
+    def __init__(self, max_items: int, window_seconds: float):
+        self._max_items = max(1, max_items)
+        self._window_seconds = max(0.0, window_seconds)
+        self._pending: list[_PendingItem] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def evaluate(self, attempt_id: str, payload: list[dict]) -> list[ShortAnswerScore]:
+        if not payload:
+            return []
+        scores: list[ShortAnswerScore | None] = [None] * len(payload)
+        for index, score in (await lookup_cached_scores(payload)).items():
+            scores[index] = score
+        misses = [index for index, score in enumerate(scores) if score is None]
+        if not misses:
+            return list(scores)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Celery tasks run each job on a fresh loop; never carry items across.
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        items = [
+            _PendingItem(
+                key=_item_key(attempt_id, str(payload[index]["question_id"])),
+                question_id=str(payload[index]["question_id"]),
+                payload=payload[index],
+                future=loop.create_future(),
+            )
+            for index in misses
+        ]
+        self._pending.extend(items)
+        if len(self._pending) >= self._max_items:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_seconds, self._flush_now)
+
+        for index, score in zip(misses, await asyncio.gather(*(item.future for item in items))):
+            scores[index] = score
+        return list(scores)
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[: self._max_items], self._pending[self._max_items :]
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: list[_PendingItem]) -> None:
+        error: Exception | None = None
+        try:
+            await self._grade_batch(batch)
+        except Exception as exc:
+            error = exc
+            logger.exception("Short-answer batch of %s items failed", len(batch))
+        finally:
+            # Waiters never hang, whatever stopped the batch.
+            for item in batch:
+                item.fail(error or RuntimeError(f"Short-answer batch ended without a score for {item.key}"))
+
+    async def _grade_batch(self, batch: list[_PendingItem]) -> None:
+        started_at = time.perf_counter()
+        stats = {"llm_calls": 0, "splits": 0, "failed_items": 0, "deduplicated": 0, "input_tokens": 0, "output_tokens": 0}
+        # Identical answers to the same question are evaluated once.
+        unique: dict[tuple[str, str], _PendingItem] = {}
+        for item in batch:
+            cache_key = answer_cache_key(item.payload)
+            if cache_key in unique:
+                unique[cache_key].duplicates.append(item)
+            else:
+                unique[cache_key] = item
+        # Keep answers to the same question adjacent so the model grades them against one key.
+        representatives = sorted(unique.values(), key=lambda item: item.question_id)
+        stats["deduplicated"] = len(batch) - len(representatives)
+        evaluated: list[tuple[dict, ShortAnswerScore]] = []
+        await self._evaluate(representatives, stats, evaluated)
+        await store_cached_scores(evaluated)
+
+        elapsed = time.perf_counter() - started_at
+        graded = len(batch) - stats["failed_items"]
+        logger.info(
+            "short_answer_batch items=%s deduplicated=%s llm_calls=%s splits=%s failed=%s tokens_per_answer=%.1f answers_per_s=%.1f",
+            len(batch),
+            stats["deduplicated"],
+            stats["llm_calls"],
+            stats["splits"],
+            stats["failed_items"],
+            (stats["input_tokens"] + stats["output_tokens"]) / max(1, graded),
+            graded / elapsed if elapsed > 0 else 0.0,
+        )
+        try:
+            await record_metrics(
+                SHORT_ANSWER_METRICS_GROUP,
+                batches=1,
+                answers=graded,
+                elapsed_seconds=float(elapsed),
+                **stats,
+            )
+        except Exception:
+            logger.warning("Could not record short-answer batch metrics", exc_info=True)
+
+    async def _evaluate(
+        self,
+        items: list[_PendingItem],
+        stats: dict,
+        evaluated: list[tuple[dict, ShortAnswerScore]],
+    ) -> None:
+        if not items:
+            return
+        request = [{**item.payload, "question_id": item.key} for item in items]
+        stats["llm_calls"] += 1
+        try:
+            # Batches are flushed from timer callbacks, so set the class here.
+            with llm_priority(LLM_PRIORITY_GRADING), get_usage_metadata_callback() as usage:
+                output = await evaluate_short_answers(request)
+            for model_usage in usage.usage_metadata.values():
+                stats["input_tokens"] += int(model_usage.get("input_tokens", 0) or 0)
+                stats["output_tokens"] += int(model_usage.get("output_tokens", 0) or 0)
+            scores = {str(score.question_id): score for score in output.results}
+            error: Exception | None = None
+        except ValueError as exc:
+            # Unparseable or invalid output: smaller batches may parse.
+            scores = {}
+            error = exc
+        except Exception as exc:
+            # Splitting would only repeat a transport or quota failure per half.
+            for item in items:
+                stats["failed_items"] += 1 + len(item.duplicates)
+                item.fail(exc)
+            return
+
+        missing = []
+        for item in items:
+            score = scores.get(item.key)
+            if score is None:
+                missing.append(item)
+                continue
+            item.resolve(score)
+            evaluated.append((item.payload, _clamp_score(score, item.question_id, int(item.payload.get("max_marks") or 1))))
+
+        if not missing:
+            return
+        if len(missing) == 1 and len(items) == 1:
+            stats["failed_items"] += 1 + len(missing[0].duplicates)
+            missing[0].fail(error or ValueError(f"No evaluation returned for {missing[0].key}"))
+            return
+
+        stats["splits"] += 1
+        middle = max(1, len(missing) // 2)
+        await self._evaluate(missing[:middle], stats, evaluated)
+        await self._evaluate(missing[middle:], stats, evaluated)
+
+
+short_answer_batcher = ShortAnswerBatcher(
+    max_items=settings.SHORT_ANSWER_BATCH_MAX_ITEMS,
+    window_seconds=settings.SHORT_ANSWER_BATCH_WINDOW_MS / 1000,
+)
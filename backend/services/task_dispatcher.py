@@ -14,10 +14,20 @@ Switching modes requires ONLY config change - no code changes needed.
 import asyncio
 import logging
 import uuid
+from celery import group
+from redis.exceptions import RedisError
 from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.core.redis import buffer_grading_attempts, set_grading_progress
+from backend.services.grading import GRADING_QUEUED, run_grading_job
 from backend.workers.document_task import process_document as celery_process_document
 from backend.workers.quiz_creation_task import create_quiz_ai as celery_create_quiz_ai
 from backend.workers.export_task import export_results as celery_export_results
+from backend.workers.result_processing_task import process_result as celery_process_result
+from backend.workers.result_processing_task import process_result_batch as celery_process_result_batch
+from backend.workers.result_processing_task import drain_grading_buffer as celery_drain_grading_buffer
+from backend.workers.regrade_task import regrade_quiz as celery_regrade_quiz
+from backend.services.regrade_service import regrade_quiz_results
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +59,28 @@ async def dispatch_document_task(document_id: str) -> None:
         await asyncio.to_thread(celery_process_document, document_id)
 
 
+async def dispatch_document_tasks(document_ids: list[str]) -> None:
+    """
+    Dispatch processing for every document of one upload request.
+
+    With Celery the tasks are published together as one group; inline they
+    run concurrently in the thread pool and this returns once all finish.
+
+    Args:
+        document_ids: UUIDs of committed documents
+    """
+    if not document_ids:
+        return
+    if settings.USE_CELERY:
+        logger.info(f"[Celery] Dispatching document tasks: count={len(document_ids)}")
+        group(celery_process_document.s(document_id) for document_id in document_ids).apply_async()
+    else:
+        logger.info(f"[Inline] Executing document tasks: count={len(document_ids)}")
+        await asyncio.gather(
+            *(asyncio.to_thread(celery_process_document, document_id) for document_id in document_ids)
+        )
+
+
 async def dispatch_quiz_task(
     job_id: str,
     quiz_id: str,
@@ -131,6 +163,103 @@ async def dispatch_export_task(
         return simple_task
 
 
+async def dispatch_result_tasks(attempt_ids: list[str], *, priority: int | None = None) -> None:
+    """
+    Dispatch grading for a batch of submitted attempts (non-blocking).
+
+    Routes to either the dedicated Celery grading queue or the bounded inline
+    grading pool, based on USE_CELERY config.
+
+    Args:
+        attempt_ids: UUIDs of attempts that have been stamped as submitted
+        priority: 0 (highest) - 9 (lowest); defaults to GRADING_TASK_PRIORITY
+    """
+    if not attempt_ids:
+        return
+
+    priority = settings.GRADING_TASK_PRIORITY if priority is None else priority
+    for attempt_id in attempt_ids:
+        await set_grading_progress(attempt_id, GRADING_QUEUED)
+
+    if settings.USE_CELERY:
+        if await _coalesce_live_submits(attempt_ids, priority):
+            return
+        logger.info(f"[Celery] Dispatching result tasks: count={len(attempt_ids)}, priority={priority}")
+        # Attempts in one chunk are graded on one loop, so their short
+        # answers share evaluation batches.
+        chunk_size = max(1, settings.GRADING_TASK_CHUNK_SIZE)
+        for start in range(0, len(attempt_ids), chunk_size):
+            chunk = list(attempt_ids[start:start + chunk_size])
+            if len(chunk) == 1:
+                celery_process_result.apply_async(
+                    args=[chunk[0]],
+                    queue=settings.GRADING_QUEUE_NAME,
+                    priority=priority,
+                )
+            else:
+                celery_process_result_batch.apply_async(
+                    args=[chunk],
+                    queue=settings.GRADING_QUEUE_NAME,
+                    priority=priority,
+                )
+    else:
+        logger.info(f"[Background] Queuing result tasks: count={len(attempt_ids)}, priority={priority}")
+        _inline_grading_pool.submit(attempt_ids, priority)
+
+
+async def _coalesce_live_submits(attempt_ids: list[str], priority: int) -> bool:
+    """
+    Buffers live submits in Redis for GRADING_COALESCE_WINDOW_MS so the ones
+    arriving together are graded as one batch (sharing short-answer LLM
+    batches) instead of one task each. Returns False when the attempts must
+    be dispatched directly.
+    """
+    window_ms = settings.GRADING_COALESCE_WINDOW_MS
+    chunk_size = max(1, settings.GRADING_TASK_CHUNK_SIZE)
+    if window_ms <= 0 or priority != settings.GRADING_TASK_PRIORITY or len(attempt_ids) >= chunk_size:
+        return False
+    try:
+        schedule_drain = await buffer_grading_attempts(
+            attempt_ids,
+            flag_ttl_seconds=max(30, window_ms * 10 // 1000),
+        )
+    except RedisError:
+        logger.warning("Grading coalescing unavailable; dispatching %s attempts directly", len(attempt_ids))
+        return False
+    if schedule_drain:
+        logger.info(f"[Celery] Scheduling coalesced grading drain in {window_ms} ms")
+        celery_drain_grading_buffer.apply_async(
+            countdown=window_ms / 1000,
+            queue=settings.GRADING_QUEUE_NAME,
+            priority=priority,
+        )
+    return True
+
+
+async def dispatch_regrade_task(job_id: str, quiz_id: str) -> None:
+    """
+    Dispatch a whole-quiz regrade (non-blocking).
+
+    Routes to either the Celery grading queue (backlog priority) or a
+    background coroutine, based on USE_CELERY config. Progress is reported
+    through the AIJob row.
+
+    Args:
+        job_id: UUID of the RESULT_REGRADE AI job
+        quiz_id: UUID of the quiz
+    """
+    if settings.USE_CELERY:
+        logger.info(f"[Celery] Dispatching regrade task: job_id={job_id}, quiz_id={quiz_id}")
+        celery_regrade_quiz.apply_async(
+            args=[job_id, quiz_id],
+            queue=settings.GRADING_QUEUE_NAME,
+            priority=settings.GRADING_BACKLOG_PRIORITY,
+        )
+    else:
+        logger.info(f"[Background] Queuing regrade task: job_id={job_id}, quiz_id={quiz_id}")
+        asyncio.create_task(regrade_quiz_results(SessionLocal, job_id, quiz_id))
+
+
 # ============================================================================
 # Background Task Runners (for inline execution without blocking API)
 # ============================================================================
@@ -156,4 +285,46 @@ async def _run_quiz_task_background(
         )
         logger.info(f"[SUCCESS] Quiz generation completed: job_id={job_id}")
     except Exception as e:
-        logger.error(f"[FAILED] Quiz generation failed: job_id={job_id}, error={e}")
\ No newline at end of file
+        logger.error(f"[FAILED] Quiz generation failed: job_id={job_id}, error={e}")
+
+
+class _InlineGradingPool:
+    """
+    Bounded asyncio worker pool that grades attempts inside the API process
+    when Celery is disabled. Workers start lazily on the running loop and
+    take the highest-priority attempt first.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.PriorityQueue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+        self._sequence = 0
+
+    def _ensure_started(self) -> asyncio.PriorityQueue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.PriorityQueue()
+            self._loop = loop
+            self._workers = [
+                loop.create_task(self._worker()) for _ in range(max(1, settings.GRADING_CONCURRENCY))
+            ]
+        return self._queue
+
+    def submit(self, attempt_ids: list[str], priority: int) -> None:
+        queue = self._ensure_started()
+        for attempt_id in attempt_ids:
+            self._sequence += 1
+            queue.put_nowait((priority, self._sequence, attempt_id))
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            _, _, attempt_id = await queue.get()
+            try:
+                await run_grading_job(SessionLocal, attempt_id)
+            finally:
+                queue.task_done()
+
+
+_inline_grading_pool = _InlineGradingPool()
@@ -318,11 +318,14 @@ def _normalize_submitted_value(field: VerificationField, raw_value: Any) -> str:
     return value
 
 
-def validate_verification_submission(schema_raw: dict[str, Any], payload_data: Any) -> VerificationResolution:
-    try:
-        schema = VerificationSchema.model_validate(schema_raw)
-    except ValidationError as exc:
-        raise HTTPException(status_code=500, detail="Stored verification schema is invalid") from exc
+def validate_verification_submission(schema_raw: dict[str, Any] | VerificationSchema, payload_data: Any) -> VerificationResolution:
+    if isinstance(schema_raw, VerificationSchema):
+        schema = schema_raw
+    else:
+        try:
+            schema = VerificationSchema.model_validate(schema_raw)
+        except ValidationError as exc:
+            raise HTTPException(status_code=500, detail="Stored verification schema is invalid") from exc
 
     if not isinstance(payload_data, dict):
         raise HTTPException(status_code=422, detail="verification_data must be an object")
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from backend.api import answers as answers_api
+from backend.api import attemps as attempts_api
+from backend.core import redis as redis_store
+from backend.schemas.answer import BatchSaveAnswerRequest
+from backend.services import answer_buffer
+
+
+class _RecordingSession:
+    def __init__(self, attempt=None):
+        self.attempt = attempt
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return SimpleNamespace(scalar_one_or_none=lambda: self.attempt)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        return None
+
+
+def test_flush_upserts_buffered_answers_and_clears_only_flushed_entries(monkeypatch):
+    attempt_id = str(uuid.uuid4())
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    buffered = {
+        first: json.dumps({"answer_text": "B", "client_seq": 3}),
+        second: json.dumps({"answer_text": "photosynthesis", "client_seq": 1}),
+        "not-a-uuid": json.dumps({"answer_text": "x"}),
+    }
+    cleared: list[dict] = []
+
+    async def fake_get(key):
+        return dict(buffered)
+
+    async def fake_clear(key, flushed):
+        cleared.append(flushed)
+        return 0
+
+    monkeypatch.setattr(answer_buffer, "get_buffered_answers", fake_get)
+    monkeypatch.setattr(answer_buffer, "clear_flushed_answers", fake_clear)
+
+    db = _RecordingSession()
+    written = asyncio.run(answer_buffer.flush_attempt_answers(db, attempt_id))
+
+    assert written == 2
+    assert db.commits == 1
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_answers_attempt_id_question_id DO UPDATE" in sql
+    assert "answer_text = excluded.answer_text" in sql
+    # An older flush committing late cannot overwrite a newer answer.
+    assert "WHERE answers.client_seq <= excluded.client_seq" in sql
+    # The exact payloads read are handed back, so entries rewritten during the
+    # flush are not deleted.
+    assert cleared == [buffered]
+
+
+def test_final_flush_seals_the_buffer_before_reading_it(monkeypatch):
+    calls: list[str] = []
+
+    async def fake_seal(attempt_id):
+        calls.append("seal")
+
+    async def fake_get(attempt_id):
+        calls.append("read")
+        return {}
+
+    monkeypatch.setattr(answer_buffer, "seal_answer_buffer", fake_seal)
+    monkeypatch.setattr(answer_buffer, "get_buffered_answers", fake_get)
+
+    asyncio.run(answer_buffer.flush_attempt_answers(_RecordingSession(), "attempt-1", seal=True))
+
+    assert calls == ["seal", "read"]
+
+
+def test_submit_flushes_buffered_answers_before_grading(monkeypatch):
+    attempt = SimpleNamespace(id=uuid.uuid4(), attempt_token="token", submitted_at=None, status="IN_PROGRESS")
+    calls: list[str] = []
+
+    async def fake_forget(attempt_id):
+        calls.append("forget")
+
+    async def fake_flush(db, attempt_id, *, seal=False):
+        calls.append(f"flush(seal={seal})")
+        return 1
+
+    async def fake_dispatch(attempt_ids, *, priority=None):
+        calls.append("dispatch")
+
+    monkeypatch.setattr(attempts_api, "forget_attempt_session", fake_forget)
+    monkeypatch.setattr(attempts_api, "flush_attempt_answers", fake_flush)
+    monkeypatch.setattr(attempts_api, "dispatch_result_tasks", fake_dispatch)
+
+    db = _RecordingSession(attempt)
+    asyncio.run(attempts_api.submit_attempt(attempt.id, x_attempt_token="token", db=db))
+
+    assert attempt.status == "SUBMITTED"
+    assert db.commits == 1
+    assert calls == ["forget", "flush(seal=True)", "dispatch"]
+
+
+def test_buffer_answers_reports_a_sealed_buffer(monkeypatch):
+    seen_keys: list[list[str]] = []
+
+    async def fake_script(keys, args):
+        seen_keys.append(keys)
+        return -1
+
+    monkeypatch.setattr(redis_store, "_BUFFER_ANSWERS_SCRIPT", fake_script)
+
+    result = asyncio.run(
+        redis_store.buffer_answers("attempt-1", [{"question_id": "q1", "answer_text": "A", "client_seq": 1}])
+    )
+
+    assert result is None
+    assert seen_keys[0][2] == "exam:answers:attempt-1:sealed"
+
+
+def test_batch_save_racing_a_submit_is_rejected(monkeypatch):
+    question_id = uuid.uuid4()
+    session = SimpleNamespace(submitted=False, expired=False, question_ids={str(question_id)})
+
+    async def fake_load(db, attempt_id, token):
+        return session
+
+    async def sealed_buffer(attempt_id, entries):
+        return None
+
+    monkeypatch.setattr(answers_api, "load_attempt_session", fake_load)
+    monkeypatch.setattr(answers_api, "buffer_answers", sealed_buffer)
+
+    payload = BatchSaveAnswerRequest(answers=[{"question_id": question_id, "answer_text": "A", "client_seq": 1}])
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(answers_api.save_answers_batch(uuid.uuid4(), payload, x_attempt_token="t", db=None))
+
+    assert exc.value.status_code == 409
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.services import answer_key_cache
+from backend.services.answer_key_cache import resolve_answer_keys
+
+
+def _patch_store(monkeypatch):
+    values: dict[str, dict] = {}
+    locks: dict[str, str] = {}
+
+    async def read_cached(keys):
+        return [values.get(key) for key in keys]
+
+    async def acquire(keys, token):
+        acquired = []
+        for key in keys:
+            acquired.append(f"{key}:lock" not in locks)
+            locks.setdefault(f"{key}:lock", token)
+        return acquired
+
+    async def store(keys, answers):
+        for key, answer in zip(keys, answers):
+            values[key] = {"correct_answer": answer}
+
+    async def release(key, token):
+        if locks.get(key) == token:
+            del locks[key]
+        return True
+
+    monkeypatch.setattr(answer_key_cache, "_read_cached", read_cached)
+    monkeypatch.setattr(answer_key_cache, "_acquire", acquire)
+    monkeypatch.setattr(answer_key_cache, "_store", store)
+    monkeypatch.setattr(answer_key_cache, "release_lock", release)
+    monkeypatch.setattr(answer_key_cache, "ANSWER_KEY_POLL_SECONDS", 0.001)
+
+
+def test_concurrent_graders_share_one_generated_answer_key(monkeypatch):
+    _patch_store(monkeypatch)
+    calls = []
+
+    async def generate(candidates):
+        calls.append(candidates)
+        await asyncio.sleep(0.01)
+        return [f"generated #{len(calls)}" for _ in candidates]
+
+    candidate = {"question_id": "q1", "question_text": "Define osmosis.", "question_type": "SHORT_ANSWER", "marks": 2}
+
+    async def scenario():
+        return await asyncio.gather(*(resolve_answer_keys("quiz-1", [dict(candidate)], generate) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert "question_id" not in calls[0][0]
+    assert results == [["generated #1"]] * 5
+
+
+def test_failed_generations_are_cached_briefly(monkeypatch):
+    stored: list[tuple[str, int]] = []
+
+    class _Pipeline:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def set(self, key, value, ex=None):
+            stored.append((key, ex))
+
+        async def execute(self):
+            return []
+
+    monkeypatch.setattr(
+        answer_key_cache, "redis_client", SimpleNamespace(pipeline=lambda transaction=False: _Pipeline())
+    )
+
+    asyncio.run(answer_key_cache._store(["k-ok", "k-missing"], ["Osmosis is ...", None]))
+
+    assert stored == [
+        ("k-ok", answer_key_cache.ANSWER_KEY_CACHE_TTL_SECONDS),
+        ("k-missing", answer_key_cache.ANSWER_KEY_NEGATIVE_TTL_SECONDS),
+    ]
+
+
+def test_suggested_answer_keys_keep_question_status():
+    from sqlalchemy.dialects import postgresql
+
+    statements = []
+
+    class _Session:
+        async def execute(self, statement):
+            statements.append(statement)
+
+    quiz_id = "5f0c6c1e-1b7a-4f7e-9a35-3c1b0b7d2f11"
+    question_id = "0d7c9a0e-3f8e-4f55-8d3a-6a2f0a4b9c21"
+    asyncio.run(answer_key_cache.suggest_answer_keys(_Session(), quiz_id, {question_id: "Osmosis"}))
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "correct_answer=" in sql
+    assert "status" not in sql.split("WHERE")[0]
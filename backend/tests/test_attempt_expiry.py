@@ -0,0 +1,50 @@
+import asyncio
+
+from backend.services import attempt_expiry
+
+
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_sweep_drains_deadline_index_in_batches_then_checks_database(monkeypatch):
+    index = [f"attempt-{i}" for i in range(5)]
+    stamped_batches: list[list[str]] = []
+    dispatched: list[str] = []
+
+    async def fake_claim(cutoff, limit):
+        claimed = index[:limit]
+        del index[:limit]
+        return claimed
+
+    async def fake_expire(db, attempt_ids):
+        stamped_batches.append(list(attempt_ids))
+        # One attempt was submitted by the student in the meantime.
+        return [attempt_id for attempt_id in attempt_ids if attempt_id != "attempt-3"]
+
+    async def fake_find_overdue(db, limit):
+        return ["legacy-attempt"]
+
+    async def fake_dispatch(attempt_ids, *, priority=None):
+        dispatched.extend(attempt_ids)
+
+    monkeypatch.setattr(attempt_expiry.settings, "EXAM_EXPIRY_SWEEP_BATCH_SIZE", 2)
+    monkeypatch.setattr(attempt_expiry, "claim_expired_attempts", fake_claim)
+    monkeypatch.setattr(attempt_expiry, "expire_attempts", fake_expire)
+    monkeypatch.setattr(attempt_expiry, "find_overdue_attempt_ids", fake_find_overdue)
+    monkeypatch.setattr(attempt_expiry, "dispatch_result_tasks", fake_dispatch)
+
+    swept = asyncio.run(attempt_expiry.sweep_expired_attempts(_FakeSession))
+
+    assert stamped_batches == [
+        ["attempt-0", "attempt-1"],
+        ["attempt-2", "attempt-3"],
+        ["attempt-4"],
+        ["legacy-attempt"],
+    ]
+    assert "attempt-3" not in dispatched
+    assert swept == len(dispatched) == 5
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from backend.core.exam_state import ExamRuntimeState
+from backend.services.attempt_session import hash_attempt_token, load_attempt_session
+
+
+class _UnusedSession:
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("cached attempt sessions must not query Postgres")
+
+
+def _patch_runtime(monkeypatch, cached: dict, ttl: int, violations: int = 0):
+    async def fake_read_exam_state(attempt_id, *, token_hash="", refresh_heartbeat=False):
+        return ExamRuntimeState(
+            session=cached,
+            remaining_time=max(0, ttl),
+            violation_count=violations,
+        )
+
+    monkeypatch.setattr(
+        "backend.services.attempt_session.read_exam_state",
+        fake_read_exam_state,
+    )
+
+
+def test_load_attempt_session_serves_cached_session_without_database(monkeypatch):
+    attempt_id = uuid.uuid4()
+    _patch_runtime(
+        monkeypatch,
+        {
+            "token_hash": hash_attempt_token("token-1"),
+            "quiz_id": "quiz-1",
+            "status": "IN_PROGRESS",
+            "submitted": "0",
+            "question_ids": json.dumps(["q1", "q2"]),
+        },
+        ttl=125,
+        violations=2,
+    )
+
+    session = asyncio.run(load_attempt_session(_UnusedSession(), attempt_id, "token-1", refresh_heartbeat=True))
+
+    assert session.quiz_id == "quiz-1"
+    assert session.submitted is False
+    assert session.question_ids == {"q1", "q2"}
+    assert session.remaining_time == 125
+    assert session.expired is False
+    assert session.violation_count == 2
+
+
+def test_load_attempt_session_rejects_wrong_token_from_cache(monkeypatch):
+    _patch_runtime(
+        monkeypatch,
+        {"token_hash": hash_attempt_token("token-1"), "submitted": "0"},
+        ttl=-2,
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(load_attempt_session(_UnusedSession(), uuid.uuid4(), "someone-else"))
+
+    assert exc_info.value.status_code == 401
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.orm import Session
+
+from backend.services import compiled_paper
+from backend.services.compiled_paper import PaperArtifact, _PaperLRU
+from backend.services.verification import VerificationSchema, default_verification_schema
+
+
+def _artifact(paper_id: str) -> PaperArtifact:
+    return PaperArtifact.build(
+        paper_id,
+        "quiz-1",
+        [
+            {"id": "q1", "question_text": "2 + 2 = ?", "question_type": "MCQ", "marks": 1, "correct_answer": "4"},
+            {"id": "q2", "question_text": "Define inertia.", "question_type": "SHORT_ANSWER", "marks": 2, "correct_answer": None},
+        ],
+        {
+            "require_fullscreen": True,
+            "violation_limit": 3,
+            "verification": default_verification_schema("college"),
+        },
+    )
+
+
+def test_paper_artifact_precomputes_question_ids_and_verification_schema():
+    artifact = _artifact("paper-1")
+
+    assert artifact.question_ids == frozenset({"q1", "q2"})
+    assert isinstance(artifact.verification_schema, VerificationSchema)
+    assert artifact.to_cache()["questions"][0]["id"] == "q1"
+
+
+def test_paper_lru_evicts_least_recently_used_version():
+    lru = _PaperLRU(max_size=2)
+    lru.put(_artifact("paper-1"))
+    lru.put(_artifact("paper-2"))
+    assert lru.get("paper-1") is not None
+
+    lru.put(_artifact("paper-3"))
+
+    assert lru.get("paper-2") is None
+    assert lru.get("paper-1") is not None
+    assert lru.get("paper-3") is not None
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+def test_concurrent_starts_compile_a_missing_paper_once(monkeypatch):
+    fake_redis = _FakeRedis()
+    compiles = 0
+
+    async def fake_compile(quiz, generation):
+        nonlocal compiles
+        compiles += 1
+        await asyncio.sleep(0.05)
+        artifact = _artifact("paper-1")
+        compiled_paper._paper_lru.put(artifact)
+        fake_redis.values[compiled_paper._current_paper_key(str(quiz.id))] = artifact.paper_id
+        return artifact
+
+    async def no_active_row(db, quiz_id):
+        return None
+
+    async def fake_release(key, token):
+        fake_redis.values.pop(key, None)
+        return True
+
+    monkeypatch.setattr(compiled_paper, "redis_client", fake_redis)
+    monkeypatch.setattr(compiled_paper, "release_lock", fake_release)
+    monkeypatch.setattr(compiled_paper, "_load_active_row", no_active_row)
+    monkeypatch.setattr(compiled_paper, "_compile_in_own_transaction", fake_compile)
+    monkeypatch.setattr(compiled_paper, "PAPER_COMPILE_POLL_SECONDS", 0.01)
+
+    quiz = SimpleNamespace(id="quiz-1", is_published=True)
+
+    async def scenario():
+        return await asyncio.gather(*(compiled_paper.get_current_paper(None, quiz) for _ in range(20)))
+
+    papers = asyncio.run(scenario())
+
+    assert compiles == 1
+    assert {paper.paper_id for paper in papers} == {"paper-1"}
+
+
+class _RecordingPipeline:
+    def __init__(self, commands):
+        self.commands = commands
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.commands.append(("incr", key))
+
+    def delete(self, key):
+        self.commands.append(("delete", key))
+
+    async def execute(self):
+        return []
+
+
+def test_invalidation_drops_the_current_pointer_only_after_commit(monkeypatch):
+    commands: list[tuple[str, str]] = []
+    monkeypatch.setattr(
+        compiled_paper, "redis_client", SimpleNamespace(pipeline=lambda transaction: _RecordingPipeline(commands))
+    )
+    sync_session = Session()
+
+    async def execute(stmt):
+        return None
+
+    db = SimpleNamespace(execute=execute, sync_session=sync_session, info=sync_session.info)
+
+    async def scenario():
+        await compiled_paper.invalidate_quiz_paper(db, "quiz-1")
+        await compiled_paper.invalidate_quiz_paper(db, "quiz-1")
+        # A concurrent exam start may still re-pin the active row here; the
+        # generation bump after commit makes that pin a no-op.
+        assert commands == []
+        sync_session.commit()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert commands == [
+        ("incr", compiled_paper._generation_key("quiz-1")),
+        ("delete", compiled_paper._current_paper_key("quiz-1")),
+    ]
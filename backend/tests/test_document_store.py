@@ -0,0 +1,14 @@
+from backend.services.document_store import split_document_text
+
+
+def test_chunks_cover_text_without_loss():
+    text = "\n\n".join(f"Paragraph {n}: " + "photosynthesis " * 40 for n in range(30)) + "tail" * 3000
+
+    chunks = split_document_text(text, target_chars=1000)
+
+    assert "".join(chunk["text"] for chunk in chunks) == text
+    assert [chunk["ordinal"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(text[c["char_start"]:c["char_end"]] == c["text"] for c in chunks)
+    assert all(len(chunk["text"]) <= 1000 for chunk in chunks)
+    assert chunks[0]["text"].endswith("\n\n")
+    assert chunks[0]["token_count"] == len(chunks[0]["text"].split())
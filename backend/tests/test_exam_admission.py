@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from backend.services.exam_admission import CoalescingLoader, admit_exam_start
+
+
+def test_coalescing_loader_shares_one_lookup_between_concurrent_callers():
+    calls = 0
+
+    async def slow_lookup():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"quiz": "q1"}
+
+    async def scenario():
+        loader = CoalescingLoader(ttl_seconds=60)
+        results = await asyncio.gather(*(loader.load("id:q1", slow_lookup) for _ in range(25)))
+        cached = await loader.load("id:q1", slow_lookup)
+        return results, cached
+
+    results, cached = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result == {"quiz": "q1"} for result in results)
+    assert cached == {"quiz": "q1"}
+
+
+def test_coalescing_loader_does_not_cache_failures():
+    attempts = 0
+
+    async def flaky_lookup():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("db unavailable")
+        return "ok"
+
+    async def scenario():
+        loader = CoalescingLoader(ttl_seconds=60)
+        with pytest.raises(RuntimeError):
+            await loader.load("id:q1", flaky_lookup)
+        return await loader.load("id:q1", flaky_lookup)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert attempts == 2
+
+
+def test_coalescing_loader_survives_the_leader_being_cancelled():
+    calls = 0
+
+    async def slow_lookup():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "paper"
+
+    async def scenario():
+        loader = CoalescingLoader(ttl_seconds=0)
+        leader = asyncio.create_task(loader.load("id:q1", slow_lookup))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(loader.load("id:q1", slow_lookup))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "paper"
+    assert calls == 1
+
+
+def test_coalescing_loader_reloads_when_the_shared_load_is_cancelled():
+    calls = 0
+
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise asyncio.CancelledError
+        return "paper"
+
+    async def scenario():
+        loader = CoalescingLoader(ttl_seconds=0)
+        return await loader.load("id:q1", lookup)
+
+    assert asyncio.run(scenario()) == "paper"
+    assert calls == 2
+
+
+def test_admit_exam_start_fails_open_when_redis_is_down(monkeypatch):
+    async def broken_acquire(*args, **kwargs):
+        raise RedisConnectionError("down")
+
+    monkeypatch.setattr("backend.services.exam_admission.acquire_exam_admission", broken_acquire)
+
+    decision = asyncio.run(admit_exam_start("quiz-1", None))
+
+    assert decision.admitted is True
+    assert decision.ticket
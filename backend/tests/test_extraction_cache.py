@@ -0,0 +1,51 @@
+import hashlib
+import io
+from types import SimpleNamespace
+
+from backend.core.config import settings
+from backend.services import extraction_cache
+from backend.utils import file_utils
+
+
+def test_upload_is_hashed_while_streaming(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "BASE_UPLOAD_DIR", tmp_path)
+    body = b"%PDF-1.7 syllabus" * 100_000
+    upload = SimpleNamespace(filename="syllabus.pdf", file=io.BytesIO(body))
+
+    saved = file_utils.save_upload_file(upload, "quiz")
+
+    assert saved.sha256 == hashlib.sha256(body).hexdigest()
+    assert saved.size == len(body)
+    assert open(saved.path, "rb").read() == body
+
+
+def test_blob_store_round_trip_is_keyed_by_extractor_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_DIR", str(tmp_path))
+    digest = "ab" * 32
+    path = extraction_cache._blob_path(digest, "pdf")
+
+    size = extraction_cache._write_blob(path, {"extracted_text": "Chapter 1", "source_index": None})
+
+    assert size == path.stat().st_size
+    assert f"-v{extraction_cache.EXTRACTOR_VERSION}." in path.name
+    assert extraction_cache._read_blob(str(path)) == {"extracted_text": "Chapter 1", "source_index": None}
+    assert extraction_cache._read_blob(str(tmp_path / "missing.json.gz")) is None
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+def test_upload_rejected_by_magic_bytes_or_size_leaves_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "BASE_UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(file_utils, "MAX_FILE_SIZE_MB", 1)
+
+    for name, body, detail in [
+        ("notes.pdf", b"MZ\x90\x00 not a pdf", "File content does not match its type"),
+        ("big.png", b"\x89PNG\r\n\x1a\n" + b"0" * (2 * 1024 * 1024), "File exceeds 1MB limit"),
+    ]:
+        try:
+            file_utils.save_upload_file(SimpleNamespace(filename=name, file=io.BytesIO(body)), "quiz")
+        except file_utils.HTTPException as exc:
+            assert exc.detail == detail
+        else:
+            raise AssertionError(f"{name} was accepted")
+
+    assert list((tmp_path / "quiz").iterdir()) == []
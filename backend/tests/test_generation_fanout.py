@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.core.config import settings
+from backend.workers import quiz_creation_task
+from backend.workers.quiz_creation_task import generate_quiz_questions_fanout, should_fan_out_generation
+
+
+def _section(index, qtype, count):
+    return {"index": index, "title": f"S{index}", "question_type": qtype, "number_of_questions": count, "marks_per_question": 1}
+
+
+def _question(text, qtype):
+    options = ["True", "False"] if qtype == "TRUE_FALSE" else ["Alpha", "Beta", "Gamma", "Delta"]
+    return SimpleNamespace(question_text=text, question_type=qtype, options=options, correct_answer=options[0], marks=1)
+
+
+def test_fanout_retries_only_short_sections(monkeypatch):
+    monkeypatch.setattr(settings, "QUIZ_GENERATION_CHUNK_SIZE", 3)
+    monkeypatch.setattr(settings, "QUIZ_GENERATION_SECTION_RETRIES", 2)
+    calls = []
+
+    async def fake_batched(extracted_text, blueprint_sections, professor_note, source_questions, retry_feedback=""):
+        (chunk,) = blueprint_sections
+        calls.append((chunk["index"], chunk["number_of_questions"]))
+        if chunk["question_type"] == "TRUE_FALSE" and len(calls) <= 3:
+            # First round: one true/false question goes missing and one repeats.
+            return [_question("Water boils at 100C at sea level", "TRUE_FALSE")] * 2
+        start = len(calls) * 10
+        return [_question(f"{chunk['question_type']} question number {start + i}", chunk["question_type"]) for i in range(chunk["number_of_questions"])]
+
+    monkeypatch.setattr(quiz_creation_task, "generate_quiz_questions_batched", fake_batched)
+    sections = [_section(0, "MCQ", 5), _section(1, "TRUE_FALSE", 2)]
+
+    questions = asyncio.run(generate_quiz_questions_fanout("text", sections, None, []))
+
+    assert should_fan_out_generation(sections)
+    # Round one: MCQ in chunks of 3 + 2, TRUE_FALSE in one chunk; round two: only the TRUE_FALSE deficit.
+    assert sorted(calls[:3]) == [(0, 2), (0, 3), (1, 2)]
+    assert calls[3:] == [(1, 1)]
+    assert [q.question_type for q in questions] == ["MCQ"] * 5 + ["TRUE_FALSE"] * 2
+
+
+def test_blueprint_deficit_counts_only_missing_questions():
+    sections = [_section(0, "MCQ", 3), _section(1, "TRUE_FALSE", 2)]
+    accepted = [_question(f"MCQ question {i}", "MCQ") for i in range(2)] + [_question("Sky is blue", "TRUE_FALSE")]
+    from_source = [(sections[1], _question("Grass is green", "TRUE_FALSE"))]
+
+    assert quiz_creation_task.compute_blueprint_deficit(from_source, accepted, sections) == [
+        {**sections[0], "number_of_questions": 1}
+    ]
+    assert quiz_creation_task.compute_blueprint_deficit([], [], sections) == sections
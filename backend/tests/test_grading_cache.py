@@ -0,0 +1,30 @@
+from backend.services.grading_cache import (
+    answer_cache_key,
+    estimated_similarity,
+    minhash_signature,
+    normalize_student_answer,
+)
+
+
+def _item(student_answer, correct_answer="Photosynthesis makes glucose"):
+    return {"question_id": "q1", "student_answer": student_answer, "correct_answer": correct_answer, "max_marks": 2}
+
+
+def test_equivalent_answers_share_a_cache_key():
+    assert normalize_student_answer("  Light   ENERGY\n is stored ") == "light energy is stored"
+    assert answer_cache_key(_item("Light energy is stored")) == answer_cache_key(_item("  light  ENERGY is stored"))
+    assert answer_cache_key(_item("Light energy is stored")) != answer_cache_key(_item("Heat is stored"))
+    # A corrected answer key never reuses grades made against the old one.
+    assert answer_cache_key(_item("Light energy is stored"))[0] != answer_cache_key(
+        _item("Light energy is stored", correct_answer="Respiration releases energy")
+    )[0]
+
+
+def test_minhash_similarity_separates_near_duplicates_from_different_answers():
+    base = minhash_signature(normalize_student_answer("Plants convert light energy into chemical energy stored in glucose"))
+    near = minhash_signature(normalize_student_answer("Plants convert light energy in to chemical energy stored in glucose."))
+    other = minhash_signature(normalize_student_answer("Mitochondria release energy through cellular respiration"))
+
+    assert estimated_similarity(base, base) == 1.0
+    assert estimated_similarity(base, near) > 0.7
+    assert estimated_similarity(base, other) < 0.3
@@ -0,0 +1,117 @@
+import asyncio
+
+from backend.services import task_dispatcher
+
+
+def test_inline_grading_pool_is_bounded_and_prefers_live_submits(monkeypatch):
+    running = 0
+    peak = 0
+    order: list[str] = []
+
+    async def fake_progress(attempt_id, stage, **fields):
+        return None
+
+    async def fake_grading_job(session_factory, attempt_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        order.append(attempt_id)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    monkeypatch.setattr(task_dispatcher.settings, "USE_CELERY", False)
+    monkeypatch.setattr(task_dispatcher.settings, "GRADING_CONCURRENCY", 2)
+    monkeypatch.setattr(task_dispatcher, "set_grading_progress", fake_progress)
+    monkeypatch.setattr(task_dispatcher, "run_grading_job", fake_grading_job)
+    monkeypatch.setattr(task_dispatcher, "_inline_grading_pool", task_dispatcher._InlineGradingPool())
+
+    async def scenario():
+        await task_dispatcher.dispatch_result_tasks([f"expired-{i}" for i in range(4)], priority=6)
+        await task_dispatcher.dispatch_result_tasks(["live-submit"], priority=3)
+        await asyncio.wait_for(task_dispatcher._inline_grading_pool._queue.join(), timeout=2)
+
+    asyncio.run(scenario())
+
+    assert peak == 2
+    assert sorted(order) == sorted([f"expired-{i}" for i in range(4)] + ["live-submit"])
+    # Workers only pick up work once the dispatching coroutine yields, so the
+    # live submit is graded before the backlog.
+    assert order[0] == "live-submit"
+
+
+def test_live_submits_are_coalesced_into_one_celery_drain(monkeypatch):
+    buffered: list[str] = []
+    drains: list[dict] = []
+    direct: list[list[str]] = []
+
+    async def fake_progress(attempt_id, stage, **fields):
+        return None
+
+    async def fake_buffer(attempt_ids, flag_ttl_seconds=60):
+        first = not buffered
+        buffered.extend(attempt_ids)
+        return first
+
+    class _Task:
+        def __init__(self, calls):
+            self.calls = calls
+
+        def apply_async(self, args=None, **options):
+            self.calls.append(options if args is None else args[0])
+
+    monkeypatch.setattr(task_dispatcher.settings, "USE_CELERY", True)
+    monkeypatch.setattr(task_dispatcher.settings, "GRADING_COALESCE_WINDOW_MS", 500)
+    monkeypatch.setattr(task_dispatcher, "set_grading_progress", fake_progress)
+    monkeypatch.setattr(task_dispatcher, "buffer_grading_attempts", fake_buffer)
+    monkeypatch.setattr(task_dispatcher, "celery_drain_grading_buffer", _Task(drains))
+    monkeypatch.setattr(task_dispatcher, "celery_process_result", _Task(direct))
+    monkeypatch.setattr(task_dispatcher, "celery_process_result_batch", _Task(direct))
+
+    async def scenario():
+        for i in range(50):
+            await task_dispatcher.dispatch_result_tasks([f"submit-{i}"])
+        # Sweeper backlogs keep their own chunked tasks.
+        await task_dispatcher.dispatch_result_tasks(["expired-1", "expired-2"], priority=6)
+
+    asyncio.run(scenario())
+
+    assert buffered == [f"submit-{i}" for i in range(50)]
+    assert len(drains) == 1 and drains[0]["countdown"] == 0.5
+    assert direct == [["expired-1", "expired-2"]]
+
+
+def test_drain_grades_buffered_submits_on_one_loop_and_hands_off_the_rest(monkeypatch):
+    from backend.workers import result_processing_task
+
+    graded_on: list[tuple[str, object]] = []
+    follow_ups: list[dict] = []
+
+    async def fake_drain(limit):
+        return [f"submit-{i}" for i in range(limit)], 7
+
+    async def fake_grading_job(session_factory, attempt_id):
+        graded_on.append((attempt_id, asyncio.get_running_loop()))
+        return True
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(result_processing_task.settings, "GRADING_TASK_CHUNK_SIZE", 3)
+    monkeypatch.setattr(result_processing_task, "drain_grading_attempts", fake_drain)
+    monkeypatch.setattr(result_processing_task, "run_grading_job", fake_grading_job)
+    monkeypatch.setattr(result_processing_task, "get_task_sessionmaker", lambda: None)
+    monkeypatch.setattr(result_processing_task, "close_llm_clients", noop)
+    monkeypatch.setattr(result_processing_task, "reset_redis_connections", noop)
+    monkeypatch.setattr(
+        result_processing_task.drain_grading_buffer,
+        "apply_async",
+        lambda **options: follow_ups.append(options),
+    )
+
+    graded = result_processing_task.drain_grading_buffer()
+
+    assert graded == 3
+    assert [attempt_id for attempt_id, _ in graded_on] == ["submit-0", "submit-1", "submit-2"]
+    assert len({id(loop) for _, loop in graded_on}) == 1
+    assert len(follow_ups) == 1
@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from backend.ai.graphs import result_processing_graph
+from backend.ai.graphs.result_processing_graph import get_result_processing_graph
+from backend.models.answer import Answer
+
+
+QUESTIONS = [
+    {"id": f"q{i}", "question_text": f"Q{i}", "question_type": "MCQ", "correct_answer": "A", "marks": 1}
+    for i in range(20)
+]
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class _InMemorySession:
+    """Answers every query of an objective-only attempt without I/O."""
+
+    def __init__(self):
+        self.attempt = SimpleNamespace(id=uuid.uuid4(), quiz_id=uuid.uuid4(), questions_snapshot=QUESTIONS, paper_id=None, final_score=0, status="SUBMITTED")
+        self.answers = [SimpleNamespace(question_id=question["id"], answer_text="A") for question in QUESTIONS]
+
+    async def get(self, model, key):
+        return self.attempt
+
+    async def execute(self, statement):
+        entity = statement.column_descriptions[0]["entity"]
+        return _Rows(self.answers if entity is Answer else [])
+
+    def add(self, instance):
+        pass
+
+    async def commit(self):
+        pass
+
+
+def _state(db):
+    return {
+        "db": db,
+        "attempt_id": str(db.attempt.id),
+        "objective_score": 0,
+        "short_answer_payload": [],
+        "short_answer_scores": [],
+        "violation_count": 0,
+        "final_score": 0,
+        "review_required": False,
+    }
+
+
+async def _grade_many(runs: int) -> None:
+    for _ in range(runs):
+        db = _InMemorySession()
+        await get_result_processing_graph().ainvoke(_state(db))
+        assert db.attempt.final_score == len(QUESTIONS)
+
+
+def test_result_graph_is_compiled_once_per_process():
+    assert get_result_processing_graph() is get_result_processing_graph()
+
+
+def test_grading_many_attempts_builds_the_graph_once(monkeypatch):
+    builds = 0
+    build = result_processing_graph.build_result_processing_graph
+
+    def counting_build():
+        nonlocal builds
+        builds += 1
+        return build()
+
+    monkeypatch.setattr(result_processing_graph, "build_result_processing_graph", counting_build)
+    monkeypatch.setattr(result_processing_graph, "_result_processing_graph", None)
+
+    asyncio.run(_grade_many(30))
+
+    assert builds == 1
@@ -0,0 +1,19 @@
+from backend.core.json_stream import IncrementalJSONArrayParser
+
+
+def test_parser_emits_each_array_item_as_soon_as_it_closes():
+    response = (
+        '```json\n{"questions": [{"question_text": "What is {x} in \\"[a]\\"?", "options": ["1", "2"]},'
+        ' {"question_text": "Second", "options": null}, {"broken": }]}\n```'
+    )
+    parser = IncrementalJSONArrayParser()
+    emitted = []
+    for index in range(0, len(response), 7):
+        emitted.append(parser.feed(response[index:index + 7]))
+
+    items = [item for batch in emitted for item in batch]
+    assert [item["question_text"] for item in items] == ['What is {x} in "[a]"?', "Second"]
+    # The first item is available before the response finishes.
+    first_batch = next(index for index, batch in enumerate(emitted) if batch)
+    assert first_batch < len(emitted) - 5
+    assert parser.skipped == 1
@@ -0,0 +1,92 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from backend.core import llm, llm_cache
+from backend.core.config import settings
+from backend.core.llm_cache import llm_cache_key, track_llm_cache
+
+
+class _Answer(BaseModel):
+    text: str
+
+
+def _use_sqlite(monkeypatch, tmp_path, max_entries=10):
+    monkeypatch.setattr(settings, "LLM_CACHE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "LLM_CACHE_SQLITE_PATH", str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(settings, "LLM_CACHE_MAX_ENTRIES", max_entries)
+    monkeypatch.setattr(llm_cache, "_backend_name", None)
+
+
+def test_sqlite_cache_evicts_least_recently_read_entries(monkeypatch, tmp_path):
+    _use_sqlite(monkeypatch, tmp_path, max_entries=2)
+
+    async def scenario():
+        await llm_cache.store_cached_response("a", "1")
+        await llm_cache.store_cached_response("b", "2")
+        await llm_cache.get_cached_response("a")
+        await llm_cache.store_cached_response("c", "3")
+        return [await llm_cache.get_cached_response(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == ["1", None, "3"]
+
+
+def test_structured_llm_call_serves_identical_prompts_from_cache(monkeypatch, tmp_path):
+    _use_sqlite(monkeypatch, tmp_path)
+    key = llm_cache_key(settings.LLM_MODEL, "prompt", "_Answer")
+
+    def no_model_call(*args, **kwargs):
+        raise AssertionError("the model must not be called on a cache hit")
+
+    monkeypatch.setattr(llm, "get_llm", no_model_call)
+
+    async def scenario():
+        stats = track_llm_cache()
+        await llm_cache.store_cached_response(key, _Answer(text="cached").model_dump_json())
+        result = await llm.structured_llm_call("prompt", _Answer)
+        return result, stats
+
+    result, stats = asyncio.run(scenario())
+    assert result.text == "cached"
+    assert stats == {"hits": 1, "misses": 0}
+
+
+class _Item(BaseModel):
+    text: str
+
+
+class _Items(BaseModel):
+    items: list[_Item]
+
+
+def test_streamed_output_with_skipped_items_is_not_cached(monkeypatch, tmp_path):
+    from contextlib import asynccontextmanager
+    from types import SimpleNamespace
+
+    _use_sqlite(monkeypatch, tmp_path)
+
+    class _StreamingModel:
+        async def astream(self, prompt):
+            for chunk in ('{"items": [{"text": "a"}, ', '{"wrong": 1}, ', '{"text": "b"}]}'):
+                yield SimpleNamespace(content=chunk)
+
+    @asynccontextmanager
+    async def free_slot(priority=None):
+        yield
+
+    async def no_metrics(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(llm, "get_llm", lambda *args, **kwargs: _StreamingModel())
+    monkeypatch.setattr(llm, "llm_slot", free_slot)
+    monkeypatch.setattr(llm, "record_metrics", no_metrics)
+
+    async def scenario():
+        streamed = [item.text async for item in llm.stream_structured_items("prompt", _Items, _Item)]
+        cached = await llm_cache.get_cached_response(llm_cache_key(settings.LLM_MODEL, "prompt", "_Items"))
+        return streamed, cached
+
+    streamed, cached = asyncio.run(scenario())
+    assert streamed == ["a", "b"]
+    # structured_llm_call shares the key and must not be served the partial list.
+    assert cached is None
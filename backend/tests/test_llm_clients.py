@@ -0,0 +1,28 @@
+import asyncio
+
+from backend.core import llm
+
+
+def test_llm_clients_are_reused_per_model_and_event_loop(monkeypatch):
+    registry = llm._LLMClientRegistry()
+    monkeypatch.setattr(llm, "_registry", registry)
+
+    async def scenario():
+        first = llm.get_llm()
+        again = llm.get_llm()
+        cooler = llm.get_llm(temperature=0.0)
+        await llm.close_llm_clients()
+        return first, again, cooler
+
+    first, again, cooler = asyncio.run(scenario())
+    assert first is again
+    assert cooler is not first
+    assert first.http_async_client is cooler.http_async_client
+
+    # A new loop (one Celery task) gets its own pool; nothing leaks across loops.
+    other_loop_client = asyncio.run(scenario())[0]
+    assert other_loop_client is not first
+    assert registry.stats()["clients_reused"] == 2
+
+    registry.after_fork()
+    assert registry.stats()["clients_created"] == 0
@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.core import llm_governor
+from backend.core.llm_governor import LLM_PRIORITY_BULK, LLM_PRIORITY_GRADING, llm_priority, llm_slot, retry_after_seconds
+
+
+def _rate_limit_error(headers):
+    return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+
+def test_retry_after_prefers_millisecond_header():
+    assert retry_after_seconds(_rate_limit_error({"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(_rate_limit_error({})) == llm_governor.DEFAULT_RATE_LIMIT_BACKOFF_SECONDS
+
+
+def test_llm_slot_queues_by_priority_and_waits_out_backoff(monkeypatch):
+    polls = []
+    released = []
+
+    async def acquire(token, *, now_ms, limit, lease_ms, queue_score, waiter_ttl_ms):
+        polls.append(queue_score)
+        # First poll: the provider asked everyone to back off.
+        return (len(polls) > 1, 10 if len(polls) == 1 else 0)
+
+    async def release(token):
+        released.append(token)
+
+    async def no_metrics(group, **counters):
+        return None
+
+    monkeypatch.setattr(llm_governor, "acquire_llm_slot", acquire)
+    monkeypatch.setattr(llm_governor, "release_llm_slot", release)
+    monkeypatch.setattr(llm_governor, "record_metrics", no_metrics)
+
+    async def scenario():
+        with llm_priority(LLM_PRIORITY_BULK):
+            async with llm_slot():
+                pass
+        async with llm_slot(LLM_PRIORITY_GRADING):
+            pass
+
+    asyncio.run(scenario())
+
+    bulk_score, _, grading_score = polls
+    assert grading_score < bulk_score
+    assert len(released) == 2
@@ -0,0 +1,188 @@
+from backend.services.objective_grading import build_objective_answer_key
+
+
+def _question(question_id, question_type="MCQ", correct_answer="A", marks=1):
+    return {
+        "id": question_id,
+        "question_text": f"Question {question_id}",
+        "question_type": question_type,
+        "correct_answer": correct_answer,
+        "marks": marks,
+    }
+
+
+def test_answer_key_only_covers_fully_keyed_objective_papers():
+    assert build_objective_answer_key([_question("q1"), _question("q2", "TRUE_FALSE", "True")]) is not None
+    assert build_objective_answer_key([_question("q1"), _question("q2", "SHORT_ANSWER", "Photosynthesis")]) is None
+    assert build_objective_answer_key([_question("q1", correct_answer="answer_unavailable")]) is None
+    assert build_objective_answer_key([]) is None
+
+
+def test_answer_key_scores_with_normalized_comparison():
+    key = build_objective_answer_key(
+        [
+            _question("q1", correct_answer="  B "),
+            _question("q2", "TRUE_FALSE", "True", marks=2),
+            _question("q3", correct_answer="sqrt(x)", marks=3),
+        ]
+    )
+
+    score, correct = key.score({"q1": "b", "q2": "TRUE", "q3": "wrong"})
+
+    assert (score, correct) == (3, 2)
+    assert key.total_marks == 6
+
+
+def test_regrade_keys_shift_mixed_papers_from_last_applied_key():
+    from backend.services.regrade_service import _PaperKeys
+
+    paper = [
+        _question("q1", correct_answer="A", marks=2),
+        _question("q2", "SHORT_ANSWER", "Chlorophyll absorbs light", marks=5),
+    ]
+    answers = {"q1": "C", "q2": "light"}
+
+    first = _PaperKeys(paper, overrides={"q1": {"correct_answer": "C", "marks": 2}}, applied={})
+    assert first.full is None
+    assert first.updated.score(answers)[0] - first.previous.score(answers)[0] == 2
+
+    # Running the same correction again must not add the marks a second time.
+    again = _PaperKeys(
+        paper,
+        overrides={"q1": {"correct_answer": "C", "marks": 2}},
+        applied={"q1": {"correct_answer": "C", "marks": 2}},
+    )
+    assert again.updated.score(answers)[0] - again.previous.score(answers)[0] == 0
+
+
+def test_regrade_keys_rebuild_objective_only_papers_in_full():
+    from backend.services.regrade_service import _PaperKeys
+
+    keys = _PaperKeys([_question("q1", correct_answer="A")], overrides={"q1": {"correct_answer": "B", "marks": 1}}, applied={})
+
+    assert keys.full is not None
+    assert keys.full.score({"q1": "b"}) == (1, 1)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+
+class _ScriptedSession:
+    """Returns one scripted result per execute() call, in order."""
+
+    def __init__(self, *results):
+        self._results = list(results)
+        self.writes = []
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            self.writes.append(params)
+            return None
+        return _Rows(self._results.pop(0))
+
+
+def test_regrade_shift_reapplies_the_penalty_to_the_raw_score():
+    import asyncio
+    import uuid
+    from types import SimpleNamespace
+
+    from backend.services.regrade_service import _PaperKeys, _shift_objective_scores
+
+    attempt_id = uuid.uuid4()
+    paper = [
+        _question("q1", correct_answer="A", marks=2),
+        _question("q2", "SHORT_ANSWER", "Chlorophyll absorbs light", marks=5),
+    ]
+    keys = _PaperKeys(paper, overrides={"q1": {"correct_answer": "C", "marks": 2}}, applied={})
+    # Raw score 1 with a penalty of 2 was stored as 0.
+    db = _ScriptedSession(
+        [SimpleNamespace(attempt_id=attempt_id, raw_score=1, final_score=0, violation_count=4)],
+        [(attempt_id, "q1", "C")],
+    )
+
+    updated = asyncio.run(_shift_objective_scores(db, keys.previous, keys.updated, [attempt_id]))
+
+    assert updated == 1
+    result_rows, attempt_rows = db.writes
+    assert result_rows == [{"b_attempt_id": attempt_id, "b_final_score": 1, "b_raw_score": 3}]
+    assert attempt_rows == [{"id": attempt_id, "final_score": 1}]
+
+
+def test_grading_after_a_regrade_uses_the_corrected_key(monkeypatch):
+    import asyncio
+    import uuid
+    from types import SimpleNamespace
+
+    from backend.services import grading
+
+    paper = SimpleNamespace(paper_id="paper-1", questions=(_question("q1", correct_answer="A"),))
+
+    async def fake_get_paper(db, paper_id):
+        return paper
+
+    async def fake_applied(db, quiz_id):
+        return {"q1": {"correct_answer": "C", "marks": 1}}
+
+    monkeypatch.setattr(grading, "get_paper", fake_get_paper)
+    monkeypatch.setattr(grading, "load_applied_answer_keys", fake_applied)
+    db = _ScriptedSession([SimpleNamespace(quiz_id=uuid.uuid4(), paper_id="paper-1", questions_snapshot=None)])
+
+    key = asyncio.run(grading._objective_answer_key(db, uuid.uuid4()))
+
+    assert key.score({"q1": "c"}) == (1, 1)
+
+
+def test_regrade_request_racing_a_running_regrade_is_rejected(monkeypatch):
+    import asyncio
+    import uuid
+    from types import SimpleNamespace
+
+    import pytest
+    from fastapi import HTTPException
+    from sqlalchemy.exc import IntegrityError
+
+    from backend.api import results as results_api
+
+    user = SimpleNamespace(id=uuid.uuid4())
+    dispatched: list[str] = []
+
+    class _Session:
+        rolled_back = False
+
+        async def get(self, model, key):
+            return SimpleNamespace(id=key, created_by=user.id)
+
+        def add(self, job):
+            pass
+
+        async def commit(self):
+            # The partial unique index rejects a second active regrade.
+            raise IntegrityError("INSERT INTO ai_jobs", {}, Exception("uq_ai_jobs_active_regrade_quiz_id"))
+
+        async def rollback(self):
+            self.rolled_back = True
+
+    async def no_stale_jobs(db, quiz_id):
+        return 0
+
+    async def fake_dispatch(job_id, quiz_id):
+        dispatched.append(job_id)
+
+    monkeypatch.setattr(results_api, "expire_stale_regrade_jobs", no_stale_jobs)
+    monkeypatch.setattr(results_api, "dispatch_regrade_task", fake_dispatch)
+
+    db = _Session()
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(results_api.regrade_quiz_results(uuid.uuid4(), db=db, current_user=user))
+
+    assert exc.value.status_code == 409
+    assert db.rolled_back
+    assert dispatched == []
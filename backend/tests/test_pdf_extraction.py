@@ -0,0 +1,94 @@
+import threading
+
+import fitz
+
+from backend.core.config import settings
+from backend.services import document_service
+
+
+def _write_pdf(path, pages: int, table_page: int) -> None:
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {number} body of the chapter")
+        if number == table_page:
+            for row in range(10):
+                page.draw_line((50, 100 + row * 20), (500, 100 + row * 20))
+    doc.save(path)
+    doc.close()
+
+
+def test_sharded_extraction_keeps_page_order(tmp_path, monkeypatch):
+    path = str(tmp_path / "chapter.pdf")
+    _write_pdf(path, pages=7, table_page=5)
+    monkeypatch.setattr(settings, "PDF_PAGES_PER_SHARD", 3)
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(document_service.os, "cpu_count", lambda: 2)
+
+    text, timings = document_service.extract_document(path, "pdf")
+
+    assert text.splitlines() == [f"Page {number} body of the chapter" for number in range(1, 8)]
+    assert [p["page"] for p in timings["pages"]] == list(range(1, 8))
+    assert [p["page"] for p in timings["pages"] if p["engine"] == "pdfplumber"] == [5]
+    assert timings["table_pages"] == 1
+
+
+def test_thread_pool_worker_extracts_shards_in_child_processes(tmp_path, monkeypatch, caplog):
+    path = str(tmp_path / "long.pdf")
+    _write_pdf(path, pages=6, table_page=0)
+    monkeypatch.setattr(settings, "PDF_PAGES_PER_SHARD", 2)
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(document_service.os, "cpu_count", lambda: 2)
+    submitted = []
+
+    class RecordingPool(document_service.ProcessPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(args)
+            return super().submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(document_service, "ProcessPoolExecutor", RecordingPool)
+    result = {}
+
+    # Document tasks run on a --pool threads worker: a worker thread of a
+    # non-daemonic process.
+    worker = threading.Thread(target=lambda: result.update(pages=document_service.extract_pdf_pages(path)))
+    with caplog.at_level("WARNING", logger=document_service.logger.name):
+        worker.start()
+        worker.join(timeout=120)
+
+    assert len(submitted) == 3  # one task per page range
+    assert not caplog.records
+    assert [page["page"] for page in result["pages"]] == list(range(1, 7))
+
+
+def test_celery_routes_documents_to_their_own_queue():
+    from backend.workers.celery_app import celery_app
+
+    assert celery_app.conf.task_routes["process_document"] == {"queue": settings.DOCUMENT_QUEUE_NAME}
+
+
+def test_only_pages_without_text_layer_are_ocred_within_budget(tmp_path, monkeypatch):
+    path = str(tmp_path / "scanned.pdf")
+    doc = fitz.open()
+    for number in range(1, 5):
+        page = doc.new_page()
+        if number == 1:
+            page.insert_text((72, 72), "Native text layer on the first page")
+    doc.save(path)
+    doc.close()
+    monkeypatch.setattr(settings, "OCR_MAX_PAGES", 2)
+    sizes = []
+
+    def fake_ocr(image):
+        sizes.append(image.size)
+        return f"scanned {len(sizes)}"
+
+    monkeypatch.setattr(document_service, "extract_text_from_pil_image", fake_ocr)
+
+    text, timings = document_service.extract_document(path, "pdf")
+
+    assert document_service.page_needs_ocr("��� garbled �����������")
+    assert [p["engine"] for p in timings["pages"]] == ["pymupdf", "tesseract", "tesseract", "pymupdf"]
+    assert (timings["ocr_pages"], timings["ocr_skipped_pages"]) == (2, 1)
+    assert text.splitlines()[0] == "Native text layer on the first page"
+    assert sizes[0][0] == round(595 * settings.OCR_DPI / 72)
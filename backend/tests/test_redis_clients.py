@@ -0,0 +1,30 @@
+import asyncio
+
+from backend.core import redis as redis_store
+
+
+def test_each_event_loop_gets_and_releases_its_own_redis_client():
+    clients = redis_store._LoopBoundRedis("redis://localhost:6379/0", decode_responses=True)
+
+    async def main_loop():
+        main_client = clients._client()
+        assert clients._client() is main_client
+
+        def inline_task():
+            # An inline task runs its own loop on a worker thread and releases
+            # only that loop's client.
+            async def run():
+                task_client = clients._client()
+                await clients.close_current_loop()
+                return task_client
+
+            return asyncio.run(run())
+
+        task_client = await asyncio.to_thread(inline_task)
+        assert task_client is not main_client
+        # The API loop keeps its client and pool.
+        assert clients._client() is main_client
+        await clients.close_current_loop()
+
+    asyncio.run(main_loop())
+    assert len(clients._clients) == 0
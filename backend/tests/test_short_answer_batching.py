@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.ai.schemas.evaluation import ShortAnswerScore
+from backend.services import short_answer_batching
+from backend.services.short_answer_batching import ShortAnswerBatcher
+
+
+def _payload(question_id, max_marks=5, student_answer=None):
+    return {
+        "question_id": question_id,
+        "question_text": f"Explain {question_id}",
+        "student_answer": student_answer or f"An answer to {question_id}",
+        "correct_answer": "The key",
+        "max_marks": max_marks,
+    }
+
+
+def _patch(monkeypatch, respond):
+    calls: list[list[str]] = []
+
+    async def fake_evaluate(items):
+        keys = [item["question_id"] for item in items]
+        calls.append(keys)
+        return respond(keys)
+
+    async def fake_metrics(group, **counters):
+        return None
+
+    async def no_cached_scores(items):
+        return {}
+
+    async def skip_store(entries):
+        return None
+
+    monkeypatch.setattr(short_answer_batching, "evaluate_short_answers", fake_evaluate)
+    monkeypatch.setattr(short_answer_batching, "record_metrics", fake_metrics)
+    monkeypatch.setattr(short_answer_batching, "lookup_cached_scores", no_cached_scores)
+    monkeypatch.setattr(short_answer_batching, "store_cached_scores", skip_store)
+    return calls
+
+
+def _scores(keys, marks=3):
+    return SimpleNamespace(
+        results=[ShortAnswerScore(question_id=key, awarded_marks=marks, max_marks=5, confidence="high") for key in keys]
+    )
+
+
+def test_batcher_packs_items_from_concurrent_attempts_into_one_call(monkeypatch):
+    calls = _patch(monkeypatch, _scores)
+    batcher = ShortAnswerBatcher(max_items=10, window_seconds=0.01)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.evaluate("a1", [_payload("q1"), _payload("q2")]),
+            batcher.evaluate("a2", [_payload("q1")]),
+            batcher.evaluate("a3", [_payload("q1", max_marks=2)]),
+        )
+
+    first, second, third = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    # a2's q1 answer matches a1's, so only one of them is sent.
+    assert sorted(calls[0]) == ["a1:q1", "a1:q2", "a3:q1"]
+    assert [score.question_id for score in first] == ["q1", "q2"]
+    assert second[0].awarded_marks == 3
+    # Awards are clamped to the question's own max marks.
+    assert third[0].awarded_marks == 2
+
+
+def test_batcher_resplits_when_the_response_is_incomplete(monkeypatch):
+    # The model drops every other item of a multi-item batch.
+    calls = _patch(monkeypatch, lambda keys: _scores(keys if len(keys) == 1 else keys[::2]))
+    batcher = ShortAnswerBatcher(max_items=4, window_seconds=0.01)
+
+    async def scenario():
+        return await batcher.evaluate("a1", [_payload(f"q{i}") for i in range(4)])
+
+    scores = asyncio.run(scenario())
+
+    assert [score.question_id for score in scores] == ["q0", "q1", "q2", "q3"]
+    assert len(calls) > 1
+
+
+def test_batcher_fails_the_whole_batch_on_a_transport_error(monkeypatch):
+    def unavailable(keys):
+        raise ConnectionError("upstream closed the connection")
+
+    calls = _patch(monkeypatch, unavailable)
+    batcher = ShortAnswerBatcher(max_items=4, window_seconds=0.01)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(batcher.evaluate("a1", [_payload(f"q{i}") for i in range(4)]))
+
+    assert len(calls) == 1
+
+
+def test_batcher_resolves_waiters_when_the_batch_fails_before_evaluating(monkeypatch):
+    _patch(monkeypatch, _scores)
+
+    def broken_cache_key(payload):
+        raise RuntimeError("bad payload")
+
+    monkeypatch.setattr(short_answer_batching, "answer_cache_key", broken_cache_key)
+    batcher = ShortAnswerBatcher(max_items=2, window_seconds=0.01)
+
+    async def scenario():
+        return await asyncio.wait_for(batcher.evaluate("a1", [_payload("q1"), _payload("q2")]), timeout=1)
+
+    with pytest.raises(RuntimeError, match="bad payload"):
+        asyncio.run(scenario())
+
+
+def test_batcher_skips_cached_answers(monkeypatch):
+    calls = _patch(monkeypatch, _scores)
+    stored = []
+
+    async def cached_scores(items):
+        return {0: ShortAnswerScore(question_id=items[0]["question_id"], awarded_marks=5, max_marks=5, confidence="high")}
+
+    async def store(entries):
+        stored.extend(entries)
+
+    monkeypatch.setattr(short_answer_batching, "lookup_cached_scores", cached_scores)
+    monkeypatch.setattr(short_answer_batching, "store_cached_scores", store)
+    batcher = ShortAnswerBatcher(max_items=10, window_seconds=0.01)
+
+    scores = asyncio.run(batcher.evaluate("a1", [_payload("q1"), _payload("q2")]))
+
+    assert calls == [["a1:q2"]]
+    assert [(score.question_id, score.awarded_marks) for score in scores] == [("q1", 5), ("q2", 3)]
+    assert [item["question_id"] for item, _ in stored] == ["q2"]
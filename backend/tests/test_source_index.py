@@ -0,0 +1,61 @@
+import asyncio
+
+from backend.api import ai_quiz
+from backend.workers import quiz_creation_task
+from backend.workers.quiz_creation_task import (
+    assemble_source_index,
+    build_filtered_content,
+    build_source_entry,
+    detect_content_type,
+    parse_questions_from_source,
+    remember_source_index,
+    source_index_content_type,
+    source_questions_from_index,
+    source_text_digest,
+)
+
+
+NOTES = "Introduction to photosynthesis.\n\nChlorophyll absorbs light energy in the chloroplast."
+BANK = "1. What gas do plants absorb?\na) Oxygen\nb) Carbon dioxide\nc) Helium\nd) Neon\nAnswer: b"
+SECTIONS = [{"index": 0, "title": "S1", "question_type": "MCQ", "number_of_questions": 2, "marks_per_question": 1}]
+
+
+def test_assembled_index_matches_combined_text():
+    combined = f"{NOTES}\n\n{BANK}"
+    index = assemble_source_index([build_source_entry(NOTES), build_source_entry(BANK)], source_text_digest(combined))
+
+    assert source_index_content_type(index) == detect_content_type(combined)
+    assert [vars(q) for q in source_questions_from_index(index)] == [vars(q) for q in parse_questions_from_source(combined)]
+
+
+def test_filtered_content_reuses_stored_index(monkeypatch):
+    combined = f"{NOTES}\n\n{BANK}"
+    expected = build_filtered_content(combined, SECTIONS, "plants")
+    remember_source_index(
+        assemble_source_index([build_source_entry(NOTES), build_source_entry(BANK)], source_text_digest(combined))
+    )
+
+    def fail(_text):
+        raise AssertionError("source text parsed again")
+
+    monkeypatch.setattr(quiz_creation_task, "parse_questions_from_source", fail)
+    monkeypatch.setattr(quiz_creation_task, "_chunk_text", fail)
+
+    assert build_filtered_content(combined, SECTIONS, "plants") == expected
+
+
+def test_document_summary_stays_small_and_survives_budget_truncation(monkeypatch):
+    document_text = f"{NOTES}\n\n{BANK}\n\n" + "Further reading on leaf structure. " * 200
+    summary = build_source_entry(document_text, with_chunks=False)
+    assert not {"chunks", "tokens", "fingerprints"} & set(summary)
+
+    def fail(_text):
+        raise AssertionError("source text parsed again")
+
+    monkeypatch.setattr(quiz_creation_task, "parse_questions_from_source", fail)
+
+    truncated = document_text[:500]
+    entry = asyncio.run(ai_quiz._source_entry(truncated, summary))
+
+    assert entry["questions"] == summary["questions"]
+    assert "".join(entry["chunks"]).replace("\n", "") == truncated.strip().replace("\n", "")
@@ -1,5 +1,7 @@
+import hashlib
 import os
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
 
@@ -31,39 +33,86 @@ def _validate_extension(filename: str) -> str:
     return extension
 
 
-def _validate_size(file: UploadFile):
-    file.file.seek(0, os.SEEK_END)
-    size = file.file.tell()
-    file.file.seek(0)
+def _size_limit_error() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"File exceeds {MAX_FILE_SIZE_MB}MB limit",
+    )
+
+
+# Leading bytes of each allowed type; docx/pptx are zip containers.
+_MAGIC_BYTES = {
+    "pdf": (b"%PDF-",),
+    "docx": (b"PK\x03\x04",),
+    "pptx": (b"PK\x03\x04",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpg": (b"\xff\xd8\xff",),
+    "jpeg": (b"\xff\xd8\xff",),
+}
 
-    if size > MAX_FILE_SIZE_MB * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File exceeds {MAX_FILE_SIZE_MB}MB limit",
-        )
+
+def _matches_type(first_chunk: bytes, extension: str) -> bool:
+    if extension == "txt":
+        return b"\x00" not in first_chunk
+    return first_chunk.startswith(_MAGIC_BYTES.get(extension, ()))
 
 
 # --------------------------------------------------
 # Main Save Function
 # --------------------------------------------------
 
-def save_upload_file(file: UploadFile, quiz_id: str) -> str:
+@dataclass(frozen=True)
+class SavedUpload:
+    path: str
+    sha256: str
+    size: int
+
+
+def save_upload_file(file: UploadFile, quiz_id: str) -> SavedUpload:
     """
-    Save uploaded file securely.
-    Returns storage path.
+    Save uploaded file securely, in one streaming pass: the first chunk's
+    magic bytes must match the extension, the size limit is enforced as
+    chunks arrive, and the SHA-256 is computed while writing. Nothing is
+    left on disk when the upload is rejected.
+    Returns the storage path with the hash and size of the bytes written.
     """
 
     extension = _validate_extension(file.filename)
-    _validate_size(file)
+    limit = MAX_FILE_SIZE_MB * 1024 * 1024
+    declared_size = getattr(file, "size", None)
+    if declared_size is not None and declared_size > limit:
+        raise _size_limit_error()
 
     quiz_dir = BASE_UPLOAD_DIR / quiz_id
     quiz_dir.mkdir(parents=True, exist_ok=True)
 
     filename = f"{uuid.uuid4()}.{extension}"
     filepath = quiz_dir / filename
-
-    with open(filepath, "wb") as buffer:
-        while chunk := file.file.read(1024 * 1024):
-            buffer.write(chunk)
-
-    return str(filepath)
+    partial = filepath.with_name(f"{filename}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial, "wb") as buffer:
+            while chunk := file.file.read(1024 * 1024):
+                if size == 0 and not _matches_type(chunk, extension):
+                    raise HTTPException(
+                        status_code=400,
+                        detail="File content does not match its type",
+                    )
+                size += len(chunk)
+                if size > limit:
+                    raise _size_limit_error()
+                digest.update(chunk)
+                buffer.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+        os.replace(partial, filepath)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    return SavedUpload(path=str(filepath), sha256=digest.hexdigest(), size=size)
+
+
+def discard_saved_upload(saved: SavedUpload) -> None:
+    Path(saved.path).unlink(missing_ok=True)
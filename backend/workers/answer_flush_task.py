@@ -0,0 +1,28 @@
+import asyncio
+import logging
+import sys
+
+from backend.workers.celery_app import celery_app
+from backend.workers.task_db import get_task_sessionmaker
+from backend.core.redis import reset_redis_connections
+from backend.services.answer_buffer import flush_dirty_answer_buffers
+
+logger = logging.getLogger(__name__)
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+@celery_app.task(name="flush_answer_buffers")
+def flush_answer_buffers():
+
+    async def _run():
+        try:
+            return await flush_dirty_answer_buffers(get_task_sessionmaker())
+        finally:
+            await reset_redis_connections()
+
+    flushed = asyncio.run(_run())
+    if flushed:
+        logger.info(f"[SUCCESS] Flushed buffered answers: rows={flushed}")
+    return flushed
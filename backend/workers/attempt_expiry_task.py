@@ -0,0 +1,28 @@
+import asyncio
+import logging
+import sys
+
+from backend.workers.celery_app import celery_app
+from backend.workers.task_db import get_task_sessionmaker
+from backend.core.redis import reset_redis_connections
+from backend.services.attempt_expiry import sweep_expired_attempts
+
+logger = logging.getLogger(__name__)
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+@celery_app.task(name="sweep_expired_attempts")
+def sweep_expired_attempts_task():
+
+    async def _run():
+        try:
+            return await sweep_expired_attempts(get_task_sessionmaker())
+        finally:
+            await reset_redis_connections()
+
+    swept = asyncio.run(_run())
+    if swept:
+        logger.info(f"[SUCCESS] Auto-submitted expired attempts: count={swept}")
+    return swept
@@ -32,6 +32,40 @@ celery_app.conf.update(
     broker_pool_limit=20,
     result_expires=3600,
     task_acks_late=True,
+    # Grading runs on its own queue so submit bursts never wait behind AI
+    # generation jobs. Start a dedicated worker with:
+    #   celery -A backend.workers.celery_app worker -Q grading --concurrency=<GRADING_CONCURRENCY>
+    # Document extraction shards long PDFs across a process pool, and billiard's
+    # prefork children are daemonic (they cannot start processes). Consume the
+    # document queue with a thread pool so the pool can start:
+    #   celery -A backend.workers.celery_app worker -Q documents --pool threads --concurrency=2
+    task_routes={
+        "process_document": {"queue": settings.DOCUMENT_QUEUE_NAME},
+        "process_result": {"queue": settings.GRADING_QUEUE_NAME},
+        "process_result_batch": {"queue": settings.GRADING_QUEUE_NAME},
+        "drain_grading_buffer": {"queue": settings.GRADING_QUEUE_NAME},
+        "regrade_quiz": {"queue": settings.GRADING_QUEUE_NAME},
+    },
+    task_default_priority=5,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+    },
+    beat_schedule={
+        "flush-answer-buffers": {
+            "task": "flush_answer_buffers",
+            "schedule": float(max(1, settings.ANSWER_FLUSH_INTERVAL_SECONDS)),
+        },
+        # Safety net for coalesced submits whose scheduled drain was lost.
+        "drain-grading-buffer": {
+            "task": "drain_grading_buffer",
+            "schedule": 10.0,
+        },
+        "sweep-expired-attempts": {
+            "task": "sweep_expired_attempts",
+            "schedule": float(max(5, settings.EXAM_EXPIRY_SWEEP_INTERVAL_SECONDS)),
+        },
+    },
 )
 
 # Windows: billiard prefork pools can crash with WinError 5/6. Use solo worker pool.
@@ -47,4 +81,7 @@ celery_app.autodiscover_tasks([
     "backend.workers.quiz_creation_task",
     "backend.workers.result_processing_task",
     "backend.workers.export_task",
+    "backend.workers.answer_flush_task",
+    "backend.workers.attempt_expiry_task",
+    "backend.workers.regrade_task",
 ])
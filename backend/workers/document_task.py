@@ -4,8 +4,13 @@ import sys
 import time
 from backend.workers.task_db import get_task_sessionmaker
 from backend.workers.celery_app import celery_app
+from backend.core.llm import close_llm_clients
+from backend.core.redis import reset_redis_connections
 from backend.models.document import Document
-from backend.services.document_service import extract_text_from_file
+from backend.services.document_service import extract_document
+from backend.services.document_store import replace_document_chunks
+from backend.services.extraction_cache import lookup_extraction, store_extraction
+from backend.workers.quiz_creation_task import build_source_entry, is_current_source_summary
 
 
 logger = logging.getLogger(__name__)
@@ -19,6 +24,31 @@ if sys.platform.startswith("win"):
     )
 
 
+# --------------------------------------------------
+# Extraction cache (failures never fail the document)
+# --------------------------------------------------
+
+async def _cached_extraction(session_factory, content_hash: str | None, file_type: str) -> dict | None:
+    if not content_hash:
+        return None
+    try:
+        async with session_factory() as cache_db:
+            return await lookup_extraction(cache_db, content_hash, file_type)
+    except Exception:
+        logger.warning("Extraction cache lookup failed for %s", content_hash, exc_info=True)
+        return None
+
+
+async def _cache_extraction(session_factory, content_hash: str | None, file_type: str, payload: dict) -> None:
+    if not content_hash:
+        return
+    try:
+        async with session_factory() as cache_db:
+            await store_extraction(cache_db, content_hash, file_type, payload)
+    except Exception:
+        logger.warning("Could not cache extraction for %s", content_hash, exc_info=True)
+
+
 # --------------------------------------------------
 # Celery Task
 # --------------------------------------------------
@@ -47,15 +77,24 @@ def process_document(document_id: str):
 
             try:
                 # -----------------------------------
-                # Extract text from file
+                # Reuse an earlier extraction of the same bytes,
+                # otherwise extract text from file
                 # -----------------------------------
-                logger.info(f"Extracting text from {doc.storage_path}")
+                content_hash = doc.content_hash
+                file_type = doc.file_type
                 parse_started_at = time.perf_counter()
-                extracted_text = await asyncio.to_thread(
-                    extract_text_from_file,
-                    doc.storage_path,
-                    doc.file_type,
-                )
+                cached = await _cached_extraction(SessionLocal, content_hash, file_type)
+                if cached is not None:
+                    logger.info(f"Reusing cached extraction {content_hash} for document {document_id}")
+                    extracted_text = cached["extracted_text"]
+                    extraction_timings = {}
+                else:
+                    logger.info(f"Extracting text from {doc.storage_path}")
+                    extracted_text, extraction_timings = await asyncio.to_thread(
+                        extract_document,
+                        doc.storage_path,
+                        file_type,
+                    )
                 parsing_time = time.perf_counter() - parse_started_at
 
                 if not extracted_text or len(extracted_text.strip()) == 0:
@@ -69,23 +108,44 @@ def process_document(document_id: str):
                     len(extracted_text),
                 )
 
+                # Pre-process once for quiz generation (signals, parsed questions).
+                # Only the small summary is kept in metadata; chunk tokens are
+                # derived from document_chunks at generation time.
+                index_started_at = time.perf_counter()
+                source_index = cached.get("source_index") if cached else None
+                if not is_current_source_summary(source_index, extracted_text):
+                    source_index = await asyncio.to_thread(build_source_entry, extracted_text, with_chunks=False)
+                indexing_time = time.perf_counter() - index_started_at
 
                 # -----------------------------------
                 # Store structured metadata
                 # -----------------------------------
+                # Text goes to document_chunks; metadata stays small enough to list.
                 db_started_at = time.perf_counter()
+                chunk_count = await replace_document_chunks(db, doc.id, extracted_text)
                 doc.extracted_metadata = {
-                    "extracted_text": extracted_text,
                     "summary": None,
                     "text_length": len(extracted_text),
+                    "chunk_count": chunk_count,
+                    "source_index": source_index,
+                    "extraction_cache": "hit" if cached is not None else "miss",
                     "timings": {
                         "parsing": round(parsing_time, 3),
+                        "indexing": round(indexing_time, 3),
+                        **extraction_timings,
                     },
                 }
 
                 doc.extraction_status = "COMPLETED"
                 await db.commit()
                 db_time = time.perf_counter() - db_started_at
+                if cached is None:
+                    await _cache_extraction(
+                        SessionLocal,
+                        content_hash,
+                        file_type,
+                        {"extracted_text": extracted_text, "source_index": source_index},
+                    )
                 total_time = time.perf_counter() - total_started_at
                 logger.info(
                     "document_processing_timing document_id=%s stage=db_write elapsed_s=%.3f",
@@ -102,15 +162,24 @@ def process_document(document_id: str):
             except Exception as e:
                 # Failure handling
                 logger.error(f"[FAILED] Document {document_id} processing failed: {e}")
+                await db.rollback()
                 doc.extraction_status = "FAILED"
                 doc.extracted_metadata = {
                     "error": str(e),
                 }
                 await db.commit()
 
+    async def _run_and_release():
+        try:
+            await _run()
+        finally:
+            # Pooled clients are bound to this loop; the next task gets a new one.
+            await close_llm_clients()
+            await reset_redis_connections()
+
     # Run async workflow inside Celery worker
     try:
-        asyncio.run(_run())
+        asyncio.run(_run_and_release())
     except Exception as e:
         logger.error(f"[FAILED] Fatal error processing document {document_id}: {e}")
         # Try to mark as failed even on fatal error
@@ -1,10 +1,14 @@
 import asyncio
+import hashlib
 import json
 import logging
 import re
 import sys
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from types import SimpleNamespace
 
 from sqlalchemy import delete, insert, select
@@ -18,8 +22,12 @@ from backend.models.quiz import Quiz
 from backend.models.quiz_section import QuizSection
 from backend.models.question import Question
 from backend.models.ai_job import AIJob
-from backend.core.llm import structured_llm_call
-from backend.ai.schemas.generation import QuizGenerationOutput
+from backend.core.config import settings
+from backend.core.llm import close_llm_clients, stream_structured_items, structured_llm_call
+from backend.core.llm_cache import track_llm_cache
+from backend.core.llm_governor import LLM_PRIORITY_BULK, llm_priority
+from backend.core.redis import cache_get_json, cache_set_json, reset_redis_connections
+from backend.ai.schemas.generation import GeneratedQuestion, QuizGenerationOutput
 
 logger = logging.getLogger(__name__)
 
@@ -64,10 +72,15 @@ def _truncate_source_text(text: str, limit: int) -> str:
     return f"{normalized[:head]}\n...\n{normalized[-tail:]}"
 
 
+def question_text_key(question: object) -> str:
+    """Case- and whitespace-insensitive stem used to spot repeated questions."""
+    return re.sub(r"\s+", " ", str(getattr(question, "question_text", "")).strip().lower())
+
+
 def _dedupe_questions_by_text(questions: list[object]) -> list[object]:
     by_text: dict[str, object] = {}
     for question in questions:
-        key = re.sub(r"\s+", " ", str(getattr(question, "question_text", "")).strip().lower())
+        key = question_text_key(question)
         if key and key not in by_text:
             by_text[key] = question
     return list(by_text.values())
@@ -86,21 +99,33 @@ def _build_question_signals(source_questions: list[SimpleNamespace], limit: int
     return signals
 
 
-def detect_content_type(extracted_text: str) -> str:
-    text = (extracted_text or "").strip()
-    if not text:
-        return "notes"
+_CONTENT_SIGNALS = ("question_hits", "option_hits", "answer_hits", "qmark_hits", "notes_hits", "chars")
 
-    question_hits = len(re.findall(r"(?im)(?:^|\n)\s*(?:q(?:uestion)?\s*\d+|[0-9]{1,3}[.)])", text))
-    option_hits = len(re.findall(r"(?im)(?:^|\n)\s*(?:\(?[a-d]\)|[a-d][.)]|[1-4][.)])\s+\S+", text))
-    answer_hits = len(re.findall(r"(?im)\b(?:answer|correct\s*answer|correct)\s*[:\-]", text))
-    qmark_hits = text.count("?")
 
-    qa_score = question_hits * 3 + option_hits * 2 + answer_hits * 3 + min(qmark_hits, 20)
-    notes_score = len(re.findall(r"(?im)\b(?:introduction|overview|chapter|definition|concept|theory|example)\b", text))
+def _content_signals(text: str) -> dict[str, int]:
+    text = (text or "").strip()
+    return {
+        "question_hits": len(re.findall(r"(?im)(?:^|\n)\s*(?:q(?:uestion)?\s*\d+|[0-9]{1,3}[.)])", text)),
+        "option_hits": len(re.findall(r"(?im)(?:^|\n)\s*(?:\(?[a-d]\)|[a-d][.)]|[1-4][.)])\s+\S+", text)),
+        "answer_hits": len(re.findall(r"(?im)\b(?:answer|correct\s*answer|correct)\s*[:\-]", text)),
+        "qmark_hits": text.count("?"),
+        "notes_hits": len(re.findall(r"(?im)\b(?:introduction|overview|chapter|definition|concept|theory|example)\b", text)),
+        "chars": len(text),
+    }
+
+
+def _content_type_from_signals(signals: dict[str, int]) -> str:
+    if not signals.get("chars"):
+        return "notes"
+    question_hits = signals["question_hits"]
+    option_hits = signals["option_hits"]
+    answer_hits = signals["answer_hits"]
+
+    qa_score = question_hits * 3 + option_hits * 2 + answer_hits * 3 + min(signals["qmark_hits"], 20)
+    notes_score = signals["notes_hits"]
 
     has_qa = question_hits > 0 or (option_hits >= 2 and answer_hits > 0) or qa_score >= 12
-    has_notes = notes_score >= 4 or (len(text) > 2500 and question_hits <= 1 and answer_hits == 0)
+    has_notes = notes_score >= 4 or (signals["chars"] > 2500 and question_hits <= 1 and answer_hits == 0)
 
     if has_qa and has_notes:
         return "mixed"
@@ -109,8 +134,11 @@ def detect_content_type(extracted_text: str) -> str:
     return "notes"
 
 
-def extract_qa_payload(extracted_text: str) -> dict:
-    parsed = parse_questions_from_source(extracted_text)
+def detect_content_type(extracted_text: str) -> str:
+    return _content_type_from_signals(_content_signals(extracted_text))
+
+
+def _qa_payload(parsed: list) -> dict:
     questions = []
     for q in parsed:
         qtype = normalize_question_type(getattr(q, "question_type", None))
@@ -141,13 +169,16 @@ def extract_qa_payload(extracted_text: str) -> dict:
     return {"questions": questions}
 
 
+def extract_qa_payload(extracted_text: str) -> dict:
+    return _qa_payload(parse_questions_from_source(extracted_text))
+
+
 def _keyword_set(text: str) -> set[str]:
     return {token for token in re.findall(r"[a-z0-9]{3,}", (text or "").lower())}
 
 
-def _score_chunk(chunk: str, keywords: set[str]) -> int:
-    tokens = _keyword_set(chunk)
-    overlap = len(tokens & keywords)
+def _score_chunk(chunk: str, keywords: set[str], tokens: list[str] | None = None) -> int:
+    overlap = len(keywords.intersection(_keyword_set(chunk) if tokens is None else tokens))
     signal_bonus = 3 if re.search(r"(?i)\b(question|answer|option|define|explain|true|false)\b", chunk) else 0
     return overlap * 5 + signal_bonus + min(len(chunk), 800) // 120
 
@@ -175,6 +206,153 @@ def _chunk_text(extracted_text: str, chunk_size: int = 1200) -> list[str]:
     return chunks
 
 
+def _chunk_fingerprint(text: str) -> str:
+    return re.sub(r"\W+", "", text.lower())
+
+
+def source_text_digest(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+SOURCE_INDEX_VERSION = 1
+SOURCE_INDEX_TTL_SECONDS = 6 * 60 * 60
+_SOURCE_INDEX_MEMO_SIZE = 8
+_source_indexes: OrderedDict[str, dict] = OrderedDict()
+_source_indexes_lock = threading.Lock()
+
+
+def source_index_key(quiz_id: object) -> str:
+    return f"ai:quiz:source_index:{quiz_id}"
+
+
+_CHUNK_INDEX_FIELDS = ("chunks", "tokens", "fingerprints")
+
+
+def _chunk_index(text: str) -> dict:
+    chunks = _chunk_text(text)
+    return {
+        "chunks": chunks,
+        "tokens": [sorted(_keyword_set(chunk)) for chunk in chunks],
+        "fingerprints": [_chunk_fingerprint(chunk)[:160] for chunk in chunks],
+    }
+
+
+def build_source_entry(text: str, *, with_chunks: bool = True) -> dict:
+    """
+    Pre-processes one source for generation: content-type signals, chunks
+    with their keyword tokens and fingerprints, and the questions parsed from
+    it. Entries of several sources combine with assemble_source_index.
+    ``with_chunks=False`` returns only the small summary fields that are
+    stored with a document; its chunks are derived from document_chunks.
+    """
+    entry = {
+        "version": SOURCE_INDEX_VERSION,
+        "digest": source_text_digest(text),
+        "signals": _content_signals(text),
+        "questions": [vars(q) for q in parse_questions_from_source(text or "")],
+    }
+    if with_chunks:
+        entry.update(_chunk_index(text))
+    return entry
+
+
+def complete_source_entry(summary: dict, text: str) -> dict:
+    """
+    Source entry from a stored summary plus chunk fields derived from text.
+    text may be cut to the generation budget; signals and parsed questions
+    still describe the whole source, so nothing is parsed again.
+    """
+    fields = {name: value for name, value in summary.items() if name not in _CHUNK_INDEX_FIELDS}
+    return {**fields, **_chunk_index(text)}
+
+
+def is_current_source_entry(entry: object, text: str) -> bool:
+    return (
+        isinstance(entry, dict)
+        and entry.get("version") == SOURCE_INDEX_VERSION
+        and entry.get("digest") == source_text_digest(text)
+        and all(name in entry for name in _CHUNK_INDEX_FIELDS)
+    )
+
+
+def is_current_source_summary(entry: object, text: str | None = None) -> bool:
+    """True for a summary of the current version (of text, when given)."""
+    return (
+        isinstance(entry, dict)
+        and entry.get("version") == SOURCE_INDEX_VERSION
+        and isinstance(entry.get("signals"), dict)
+        and isinstance(entry.get("questions"), list)
+        and (text is None or entry.get("digest") == source_text_digest(text))
+    )
+
+
+def assemble_source_index(entries: list[dict], text_digest: str) -> dict:
+    """Joins per-source entries, in source order, into the index of the combined text with that digest."""
+    return {
+        "version": SOURCE_INDEX_VERSION,
+        "digest": text_digest,
+        "signals": {name: sum(entry["signals"].get(name, 0) for entry in entries) for name in _CONTENT_SIGNALS},
+        "chunks": [chunk for entry in entries for chunk in entry["chunks"]],
+        "tokens": [tokens for entry in entries for tokens in entry["tokens"]],
+        "fingerprints": [fingerprint for entry in entries for fingerprint in entry["fingerprints"]],
+        "questions": [question for entry in entries for question in entry["questions"]],
+    }
+
+
+def remember_source_index(index: dict) -> None:
+    with _source_indexes_lock:
+        _source_indexes[index["digest"]] = index
+        _source_indexes.move_to_end(index["digest"])
+        while len(_source_indexes) > _SOURCE_INDEX_MEMO_SIZE:
+            _source_indexes.popitem(last=False)
+
+
+def source_index_for(extracted_text: str) -> dict:
+    """Index of extracted_text, built once per process unless a stored one was loaded."""
+    digest = source_text_digest(extracted_text)
+    with _source_indexes_lock:
+        index = _source_indexes.get(digest)
+    if index is None:
+        index = {**build_source_entry(extracted_text), "digest": digest}
+    remember_source_index(index)
+    return index
+
+
+def source_questions_from_index(index: dict) -> list[SimpleNamespace]:
+    return [SimpleNamespace(**question) for question in index["questions"]]
+
+
+def source_index_content_type(index: dict) -> str:
+    return _content_type_from_signals(index["signals"])
+
+
+async def store_source_index(quiz_id: object, index: dict) -> None:
+    remember_source_index(index)
+    try:
+        await cache_set_json(source_index_key(quiz_id), index, ttl_seconds=SOURCE_INDEX_TTL_SECONDS)
+    except Exception:
+        logger.warning("Could not store source index for quiz %s", quiz_id, exc_info=True)
+
+
+async def get_source_index(quiz_id: object, extracted_text: str) -> dict:
+    """
+    Source index of the quiz, loaded from Redis when it matches
+    extracted_text; otherwise built once and stored for later attempts,
+    streams and regenerations.
+    """
+    try:
+        index = await cache_get_json(source_index_key(quiz_id))
+    except Exception:
+        logger.warning("Could not load source index for quiz %s", quiz_id, exc_info=True)
+        index = None
+    if isinstance(index, dict) and is_current_source_entry(index, extracted_text):
+        remember_source_index(index)
+        return index
+    index = await asyncio.to_thread(source_index_for, extracted_text)
+    await store_source_index(quiz_id, index)
+    return index
+
+
 def build_filtered_content(
     extracted_text: str,
     blueprint_sections: list[dict],
@@ -182,8 +360,9 @@ def build_filtered_content(
     *,
     max_chars: int = LLM_SOURCE_LIMIT,
 ) -> tuple[str, str, dict]:
-    content_type = detect_content_type(extracted_text)
-    qa_payload = extract_qa_payload(extracted_text)
+    index = source_index_for(extracted_text)
+    content_type = source_index_content_type(index)
+    qa_payload = _qa_payload(source_questions_from_index(index))
     qa_questions = qa_payload.get("questions", [])
 
     if content_type == "question_bank" and qa_questions:
@@ -198,17 +377,19 @@ def build_filtered_content(
             ]
         )
     )
-    chunks = _chunk_text(extracted_text)
     scored = sorted(
-        [(_score_chunk(chunk, keywords), idx, chunk) for idx, chunk in enumerate(chunks)],
+        [
+            (_score_chunk(chunk, keywords, tokens), idx, chunk, fingerprint)
+            for idx, (chunk, tokens, fingerprint) in enumerate(zip(index["chunks"], index["tokens"], index["fingerprints"]))
+        ],
         key=lambda x: (-x[0], x[1]),
     )
 
     picked: list[str] = []
+    picked_fingerprints: list[str] = []
     used = 0
-    for _, _, chunk in scored:
-        fingerprint = re.sub(r"\W+", "", chunk.lower())[:160]
-        if any(fingerprint and fingerprint in re.sub(r"\W+", "", p.lower()) for p in picked):
+    for _, _, chunk, fingerprint in scored:
+        if any(fingerprint and fingerprint in p for p in picked_fingerprints):
             continue
         if used >= max_chars:
             break
@@ -217,6 +398,7 @@ def build_filtered_content(
         if not part.strip():
             continue
         picked.append(part.strip())
+        picked_fingerprints.append(_chunk_fingerprint(part))
         used += len(part) + 2
 
     notes_content = "\n\n".join(picked).strip()[:max_chars]
@@ -424,6 +606,30 @@ def enforce_blueprint(generated_questions: list, blueprint_sections: list[dict])
     return selected, feedback
 
 
+def compute_blueprint_deficit(
+    base_pairs: list[tuple[dict, object]],
+    questions: list,
+    blueprint_sections: list[dict],
+) -> list[dict]:
+    """
+    Sections that base_pairs plus type-matching questions cannot fill yet,
+    each with number_of_questions set to its shortfall. Questions are
+    consumed in section order, as enforce_blueprint does.
+    """
+    pool = list(questions)
+    deficit: list[dict] = []
+    for section in blueprint_sections:
+        have = sum(1 for picked, _ in base_pairs if picked["index"] == section["index"])
+        need = max(0, section["number_of_questions"] - have)
+        qtype = section["question_type"]
+        take = [q for q in pool if normalize_question_type(getattr(q, "question_type", None)) == qtype][:need]
+        for q in take:
+            pool.remove(q)
+        if len(take) < need:
+            deficit.append({**section, "number_of_questions": need - len(take)})
+    return deficit
+
+
 def missing_answers_count(pairs: list[tuple[dict, object]]) -> int:
     return sum(
         1
@@ -769,13 +975,13 @@ async def extract_all_questions_with_llm(extracted_text: str) -> list:
     return parse_questions_from_source(extracted_text)
 
 
-async def generate_quiz_questions_batched(
+def _build_batched_generation_prompt(
     extracted_text: str,
     blueprint_sections: list[dict],
     professor_note: str | None,
-    source_questions: list[SimpleNamespace],
     retry_feedback: str = "",
-) -> list:
+) -> tuple[str, str, str, str]:
+    """Returns (prompt, content_type, prompt content, resolved professor note)."""
     answer_strictness_note = "You MUST include correct_answer for every question. Never leave it blank."
     resolved_professor_note = (
         f"{professor_note.strip()} {answer_strictness_note}".strip()
@@ -796,6 +1002,32 @@ async def generate_quiz_questions_batched(
         blueprint=blueprint_sections,
         professor_note=resolved_professor_note,
     )
+    return prompt, content_type, summary_or_filtered_content, resolved_professor_note
+
+
+def stream_quiz_questions(
+    extracted_text: str,
+    blueprint_sections: list[dict],
+    professor_note: str | None,
+    retry_feedback: str = "",
+) -> AsyncIterator[GeneratedQuestion]:
+    """Same generation as generate_quiz_questions_batched, yielding each question as the model emits it."""
+    prompt, _content_type, _content, _note = _build_batched_generation_prompt(
+        extracted_text, blueprint_sections, professor_note, retry_feedback
+    )
+    return stream_structured_items(prompt, QuizGenerationOutput, GeneratedQuestion)
+
+
+async def generate_quiz_questions_batched(
+    extracted_text: str,
+    blueprint_sections: list[dict],
+    professor_note: str | None,
+    source_questions: list[SimpleNamespace],
+    retry_feedback: str = "",
+) -> list:
+    prompt, content_type, summary_or_filtered_content, resolved_professor_note = _build_batched_generation_prompt(
+        extracted_text, blueprint_sections, professor_note, retry_feedback
+    )
     result = await structured_llm_call(prompt, QuizGenerationOutput)
     questions = result.questions
     if not questions:
@@ -809,6 +1041,95 @@ async def generate_quiz_questions_batched(
     return questions
 
 
+def should_fan_out_generation(blueprint_sections: list[dict]) -> bool:
+    total = sum(section["number_of_questions"] for section in blueprint_sections)
+    return len(blueprint_sections) > 1 or total > settings.QUIZ_GENERATION_FANOUT_MIN_QUESTIONS
+
+
+def _split_generation_chunks(section: dict, count: int) -> list[dict]:
+    chunk_size = max(1, settings.QUIZ_GENERATION_CHUNK_SIZE)
+    sizes = [chunk_size] * (count // chunk_size)
+    if count % chunk_size:
+        sizes.append(count % chunk_size)
+    return [{**section, "number_of_questions": size} for size in sizes]
+
+
+def _avoid_repeats_note(questions: list[object], limit: int = 20) -> str:
+    stems = [str(getattr(q, "question_text", ""))[:80] for q in questions[-limit:]]
+    return " Do not repeat these questions: " + " | ".join(stems) if stems else ""
+
+
+async def generate_quiz_questions_fanout(
+    extracted_text: str,
+    blueprint_sections: list[dict],
+    professor_note: str | None,
+    source_questions: list[SimpleNamespace],
+    retry_feedback: str = "",
+) -> list:
+    """
+    Generates each blueprint section, in chunks of QUIZ_GENERATION_CHUNK_SIZE
+    questions, as concurrent calls bounded by QUIZ_GENERATION_CONCURRENCY.
+    Results are sanitized, deduplicated by text and counted per section; only
+    sections that came up short are asked again, for their deficit. Returns
+    the questions grouped in blueprint order.
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.QUIZ_GENERATION_CONCURRENCY))
+    accepted: dict[int, list[object]] = {section["index"]: [] for section in blueprint_sections}
+    seen: list[object] = []
+
+    async def _generate_chunk(chunk: dict, part: int, parts: int, note: str) -> list[object]:
+        if parts > 1:
+            note = f"{note} Batch {part} of {parts} for this section: cover different subtopics than the other batches."
+        async with semaphore:
+            try:
+                return await generate_quiz_questions_batched(
+                    extracted_text=extracted_text,
+                    blueprint_sections=[chunk],
+                    professor_note=note.strip(),
+                    source_questions=source_questions,
+                    retry_feedback=retry_feedback,
+                )
+            except Exception as exc:
+                logger.warning("Section chunk generation failed for '%s': %s", chunk.get("title"), exc)
+                return []
+
+    for round_index in range(max(0, settings.QUIZ_GENERATION_SECTION_RETRIES) + 1):
+        short_sections = [
+            (section, section["number_of_questions"] - len(accepted[section["index"]]))
+            for section in blueprint_sections
+            if len(accepted[section["index"]]) < section["number_of_questions"]
+        ]
+        if not short_sections:
+            break
+        note = (professor_note or "") + (_avoid_repeats_note(seen) if round_index else "")
+        calls = []
+        for section, deficit in short_sections:
+            chunks = _split_generation_chunks(section, deficit)
+            calls.extend(
+                (section, _generate_chunk(chunk, part, len(chunks), note))
+                for part, chunk in enumerate(chunks, start=1)
+            )
+        results = await asyncio.gather(*(call for _, call in calls))
+
+        for (section, _), questions in zip(calls, results):
+            bucket = accepted[section["index"]]
+            for question in _dedupe_questions_by_text(seen + sanitize_generated_questions(questions))[len(seen):]:
+                if len(bucket) >= section["number_of_questions"]:
+                    break
+                if normalize_question_type(getattr(question, "question_type", None)) != section["question_type"]:
+                    continue
+                bucket.append(question)
+                seen.append(question)
+        logger.info(
+            "Fan-out generation round %s: requested sections=%s, still short=%s",
+            round_index + 1,
+            len(short_sections),
+            sum(1 for section in blueprint_sections if len(accepted[section["index"]]) < section["number_of_questions"]),
+        )
+
+    return [question for section in blueprint_sections for question in accepted[section["index"]]]
+
+
 @celery_app.task(name="create_quiz_ai")
 def create_quiz_ai(
     job_id: str,
@@ -822,6 +1143,7 @@ def create_quiz_ai(
     async def _run():
         total_started_at = time.perf_counter()
         stage_timings: dict[str, float] = {}
+        llm_cache_stats = track_llm_cache()
 
         SessionLocal = get_task_sessionmaker()
         async with SessionLocal() as db:
@@ -869,7 +1191,8 @@ def create_quiz_ai(
                     and blueprint_sections[0]["question_type"] == "MCQ"
                 )
                 parse_started_at = time.perf_counter()
-                source_questions = await asyncio.to_thread(parse_questions_from_source, extracted_text)
+                source_index = await get_source_index(quiz_id, extracted_text)
+                source_questions = source_questions_from_index(source_index)
 
                 stage_timings["parsing"] = _log_stage_timing(job_id, quiz_id, "parsing", parse_started_at)
                 await _set_job_stage(job, db, stage="topic_detection", progress=25, timings=stage_timings)
@@ -906,46 +1229,58 @@ def create_quiz_ai(
                 if from_source and len(from_source) == counts_needed:
                     selected_pairs = from_source
                 else:
+                    # Accepted questions are kept across attempts; each call asks
+                    # only for what the blueprint is still missing.
+                    accepted_questions: list[object] = []
                     for attempt in range(2):
-                        if selected_pairs:
-                            break
-
-                        llm_generated_started_at = time.perf_counter()
-                        cleaned_questions = sanitize_generated_questions(
-                            await generate_quiz_questions_batched(
-                                extracted_text=extracted_text,
-                                blueprint_sections=blueprint_sections,
-                                professor_note=retry_note,
-                                source_questions=source_questions,
-                                retry_feedback=last_feedback,
+                        missing_sections = compute_blueprint_deficit(from_source, accepted_questions, blueprint_sections)
+                        if missing_sections:
+                            generation_note = retry_note
+                            if accepted_questions:
+                                generation_note = (
+                                    (retry_note or "")
+                                    + _avoid_repeats_note([q for _, q in from_source] + accepted_questions)
+                                ).strip()
+                            generate_questions = (
+                                generate_quiz_questions_fanout
+                                if should_fan_out_generation(missing_sections)
+                                else generate_quiz_questions_batched
+                            )
+                            llm_generated_started_at = time.perf_counter()
+                            generated_questions = sanitize_generated_questions(
+                                await generate_questions(
+                                    extracted_text=extracted_text,
+                                    blueprint_sections=missing_sections,
+                                    professor_note=generation_note,
+                                    source_questions=source_questions,
+                                    retry_feedback=last_feedback,
+                                )
+                            )
+                            accepted_questions = _dedupe_questions_by_text(accepted_questions + generated_questions)
+                            stage_timings[f"question_generation_attempt_{attempt + 1}"] = _log_stage_timing(
+                                job_id,
+                                quiz_id,
+                                f"question_generation_attempt_{attempt + 1}",
+                                llm_generated_started_at,
                             )
-                        )
-                        stage_timings[f"question_generation_attempt_{attempt + 1}"] = _log_stage_timing(
-                            job_id,
-                            quiz_id,
-                            f"question_generation_attempt_{attempt + 1}",
-                            llm_generated_started_at,
-                        )
 
                         if pending_source_completion:
                             from_source = pick_from_source(source_questions, blueprint_sections)
                             pending_source_completion = len(from_source) < counts_needed
 
                         if from_source:
-                            selected_pairs, feedback = fill_missing_from_ai(from_source, cleaned_questions, blueprint_sections)
+                            selected_pairs, feedback = fill_missing_from_ai(from_source, accepted_questions, blueprint_sections)
                         else:
-                            selected_pairs, feedback = enforce_blueprint(cleaned_questions, blueprint_sections)
+                            selected_pairs, feedback = enforce_blueprint(accepted_questions, blueprint_sections)
 
-                        if not selected_pairs:
-                            last_feedback = feedback or "Failed blueprint enforcement."
-                            retry_note = (
-                                (professor_note or "")
-                                + " STRICT RETRY: Generate EXACTLY according to blueprint counts/types/marks. "
-                                + last_feedback
-                            ).strip()
-                            continue
-
-                        break
+                        if selected_pairs:
+                            break
+                        last_feedback = feedback or "Failed blueprint enforcement."
+                        retry_note = (
+                            (professor_note or "")
+                            + " TOP-UP: Generate ONLY the questions in this blueprint; they complete questions already accepted. "
+                            + last_feedback
+                        ).strip()
 
                 stage_timings["question_generation"] = _log_stage_timing(
                     job_id,
@@ -1025,6 +1360,8 @@ def create_quiz_ai(
                 job.status = "COMPLETED"
                 stage_timings["db_write"] = _log_stage_timing(job_id, quiz_id, "db_write", db_persist_started_at)
                 stage_timings["total"] = _log_stage_timing(job_id, quiz_id, "total", total_started_at)
+                stage_timings["llm_cache_hits"] = llm_cache_stats["hits"]
+                stage_timings["llm_cache_misses"] = llm_cache_stats["misses"]
                 job.meta = {
                     **(job.meta or {}),
                     "generated_count": len(selected_pairs),
@@ -1044,8 +1381,17 @@ def create_quiz_ai(
                 await db.commit()
                 raise
 
+    async def _run_bulk():
+        try:
+            with llm_priority(LLM_PRIORITY_BULK):
+                await _run()
+        finally:
+            # Pooled clients are bound to this loop; the next task gets a new one.
+            await close_llm_clients()
+            await reset_redis_connections()
+
     try:
-        asyncio.run(_run())
+        asyncio.run(_run_bulk())
     except Exception as e:
         logger.error(f"[FAILED] Fatal error in quiz generation: job_id={job_id}, error={e}")
         # Try to mark as failed even on fatal error
@@ -0,0 +1,27 @@
+import asyncio
+import logging
+import sys
+
+from backend.workers.celery_app import celery_app
+from backend.workers.task_db import get_task_sessionmaker
+from backend.core.redis import reset_redis_connections
+from backend.services.regrade_service import regrade_quiz_results
+
+logger = logging.getLogger(__name__)
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+@celery_app.task(name="regrade_quiz")
+def regrade_quiz(job_id: str, quiz_id: str):
+
+    async def _run():
+        try:
+            return await regrade_quiz_results(get_task_sessionmaker(), job_id, quiz_id)
+        finally:
+            await reset_redis_connections()
+
+    processed = asyncio.run(_run())
+    logger.info(f"[SUCCESS] Regraded quiz: quiz_id={quiz_id}, attempts={processed}")
+    return processed
@@ -1,29 +1,84 @@
 import asyncio
+import logging
+import sys
+
 from backend.workers.celery_app import celery_app
 from backend.workers.task_db import get_task_sessionmaker
-from backend.ai.graphs.result_processing_graph import build_result_processing_graph
+from backend.core.config import settings
+from backend.core.llm import close_llm_clients
+from backend.core.redis import drain_grading_attempts, reset_redis_connections
+from backend.services.grading import run_grading_job
+
+logger = logging.getLogger(__name__)
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
 @celery_app.task(name="process_result")
 def process_result(attempt_id: str):
 
     async def _run():
-        graph = build_result_processing_graph()
-
-        SessionLocal = get_task_sessionmaker()
-        async with SessionLocal() as db:
-
-            await graph.ainvoke(
-                {
-                    "db": db,
-                    "attempt_id": attempt_id,
-                    "objective_score": 0,
-                    "short_answer_payload": [],
-                    "short_answer_scores": [],
-                    "violation_count": 0,
-                    "final_score": 0,
-                    "review_required": False,
-                }
-            )
-
-    asyncio.run(_run())
+        try:
+            return await run_grading_job(get_task_sessionmaker(), attempt_id)
+        finally:
+            await close_llm_clients()
+            await reset_redis_connections()
+
+    graded = asyncio.run(_run())
+    if graded:
+        logger.info(f"[SUCCESS] Graded attempt: attempt_id={attempt_id}")
+    return graded
+
+
+async def _grade_batch(attempt_ids: list[str]) -> int:
+    session_factory = get_task_sessionmaker()
+    results = await asyncio.gather(
+        *(run_grading_job(session_factory, attempt_id) for attempt_id in attempt_ids)
+    )
+    return sum(1 for ok in results if ok)
+
+
+@celery_app.task(name="process_result_batch")
+def process_result_batch(attempt_ids: list[str]):
+    """Grades several attempts on one loop so their short answers share LLM batches."""
+
+    async def _run():
+        try:
+            return await _grade_batch(attempt_ids)
+        finally:
+            await close_llm_clients()
+            await reset_redis_connections()
+
+    graded = asyncio.run(_run())
+    logger.info(f"[SUCCESS] Graded attempt batch: graded={graded}/{len(attempt_ids)}")
+    return graded
+
+
+@celery_app.task(name="drain_grading_buffer")
+def drain_grading_buffer():
+    """
+    Grades live submits coalesced in Redis during the dispatch window as one
+    batch. A chunk that leaves attempts behind hands them to another drain
+    right away, so a submit wave spreads across grading workers.
+    """
+
+    async def _run():
+        try:
+            attempt_ids, remaining = await drain_grading_attempts(settings.GRADING_TASK_CHUNK_SIZE)
+            if remaining:
+                drain_grading_buffer.apply_async(
+                    queue=settings.GRADING_QUEUE_NAME,
+                    priority=settings.GRADING_TASK_PRIORITY,
+                )
+            if not attempt_ids:
+                return 0, 0
+            return await _grade_batch(attempt_ids), len(attempt_ids)
+        finally:
+            await close_llm_clients()
+            await reset_redis_connections()
+
+    graded, drained = asyncio.run(_run())
+    if drained:
+        logger.info(f"[SUCCESS] Graded coalesced submits: graded={graded}/{drained}")
+    return graded
@@ -1,5 +1,6 @@
 import { examAxiosClient } from "@/api/axiosClient";
 import type {
+  AdmissionQueuedResponse,
   AttemptStatusResponse,
   ExamEntryConfigResponse,
   ExamQuestion,
@@ -13,9 +14,38 @@ function attemptHeaders(attemptToken?: string) {
   return attemptToken ? { "X-Attempt-Token": attemptToken } : undefined;
 }
 
+const MAX_ADMISSION_WAIT_MS = 10 * 60 * 1000;
+
+function sleep(ms: number) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+// Exam starts are rate limited per quiz: a 202 carries a queue ticket, and the
+// same request is retried with that ticket until the server admits it.
+async function postStartWithAdmission(path: string, body: object) {
+  const deadline = Date.now() + MAX_ADMISSION_WAIT_MS;
+  let admissionTicket: string | undefined;
+
+  for (;;) {
+    const response = await examAxiosClient.post<StartAttemptResponse | AdmissionQueuedResponse>(path, {
+      ...body,
+      ...(admissionTicket ? { admission_ticket: admissionTicket } : {}),
+    });
+    if (response.status !== 202) {
+      return response.data as StartAttemptResponse;
+    }
+
+    const queued = response.data as AdmissionQueuedResponse;
+    admissionTicket = queued.admission_ticket;
+    if (Date.now() >= deadline) {
+      throw new Error("The exam is busy right now. Please try again in a moment.");
+    }
+    await sleep(Math.max(1, queued.retry_after_seconds) * 1000);
+  }
+}
+
 export async function startExamAttempt(quizId: string, payload: StartExamPayload) {
-  const { data } = await examAxiosClient.post<StartAttemptResponse>(`/attempts/${quizId}/start`, payload);
-  return data;
+  return postStartWithAdmission(`/attempts/${quizId}/start`, payload);
 }
 
 export async function fetchExamEntryConfig(quizId: string, isPublicExam = false) {
@@ -25,18 +55,16 @@ export async function fetchExamEntryConfig(quizId: string, isPublicExam = false)
 }
 
 export async function startPublishedExamAttempt(publicExamId: string) {
-  const { data } = await examAxiosClient.post<StartAttemptResponse>("/attempts/start", {
+  return postStartWithAdmission("/attempts/start", {
     public_exam_id: publicExamId,
   });
-  return data;
 }
 
 export async function startPublishedVerifiedExamAttempt(publicExamId: string, payload: StartExamPayload) {
-  const { data } = await examAxiosClient.post<StartAttemptResponse>("/attempts/start", {
+  return postStartWithAdmission("/attempts/start", {
     public_exam_id: publicExamId,
     ...payload,
   });
-  return data;
 }
 
 export async function fetchExamQuestions(quizId: string) {
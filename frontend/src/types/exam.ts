@@ -41,6 +41,13 @@ export interface StartAttemptResponse {
   mark_deduction_per_violation?: number;
 }
 
+export interface AdmissionQueuedResponse {
+  status: "QUEUED";
+  admission_ticket: string;
+  queue_position: number;
+  retry_after_seconds: number;
+}
+
 export interface ExamEntryConfigResponse {
   quiz_id: string
   quiz_title: string